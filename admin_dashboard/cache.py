@@ -0,0 +1,108 @@
+"""
+Stale-while-revalidate cache for the dashboard statistics.
+
+The computed payload is cached together with the time it was computed. Once
+it is older than ``DASHBOARD_STATS_SOFT_TTL`` the cached copy is still served,
+and a single background refresh is started; a short-lived cache lock stops
+concurrent admins from all recomputing at once. Entries are dropped after
+``DASHBOARD_STATS_HARD_TTL`` so a stalled refresh never serves very old data.
+
+The same lock covers cold misses: one request computes inline while the
+others wait up to ``DASHBOARD_STATS_MISS_WAIT`` seconds for its result. The
+lock is only released by the request or thread that acquired it.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .stats import build_dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_KEY = 'admin_dashboard:stats'
+STATS_LOCK_KEY = 'admin_dashboard:stats:refresh-lock'
+
+# Seconds between cache checks while another request computes a cold miss
+MISS_POLL_INTERVAL = 0.1
+
+
+def _acquire_lock():
+    return cache.add(STATS_LOCK_KEY, True, settings.DASHBOARD_STATS_LOCK_TIMEOUT)
+
+
+def refresh_dashboard_stats():
+    """Recompute the statistics and store them in the cache."""
+    data = build_dashboard_stats()
+    cache.set(
+        STATS_CACHE_KEY,
+        {'data': data, 'computed_at': time.time()},
+        settings.DASHBOARD_STATS_HARD_TTL
+    )
+    return data
+
+
+def _refresh_in_background():
+    # Runs with the lock held by the request that started the thread
+    try:
+        refresh_dashboard_stats()
+    except Exception:
+        logger.exception('Background dashboard stats refresh failed')
+    finally:
+        cache.delete(STATS_LOCK_KEY)
+        # The thread opened its own database connections
+        connections.close_all()
+
+
+def _refresh_on_miss():
+    """
+    Compute the statistics for an empty cache. Only the lock winner
+    recomputes; the other requests poll the cache for its result and only
+    compute themselves if it does not arrive in time.
+    """
+    deadline = time.monotonic() + settings.DASHBOARD_STATS_MISS_WAIT
+    while not _acquire_lock():
+        if time.monotonic() >= deadline:
+            return refresh_dashboard_stats()
+        time.sleep(MISS_POLL_INTERVAL)
+        entry = cache.get(STATS_CACHE_KEY)
+        if entry is not None:
+            return entry['data']
+
+    try:
+        # The previous lock holder may have filled the cache before releasing it
+        entry = cache.get(STATS_CACHE_KEY)
+        if entry is not None:
+            return entry['data']
+        return refresh_dashboard_stats()
+    finally:
+        cache.delete(STATS_LOCK_KEY)
+
+
+def get_dashboard_stats(fresh=False):
+    """
+    Return ``(data, cache_status)`` for the dashboard.
+
+    cache_status is one of ``bypass`` (fresh recompute requested), ``miss``
+    (nothing cached, computed inline), ``hit`` or ``stale`` (served from cache,
+    background refresh triggered).
+    """
+    if fresh:
+        return refresh_dashboard_stats(), 'bypass'
+
+    entry = cache.get(STATS_CACHE_KEY)
+    if entry is None:
+        return _refresh_on_miss(), 'miss'
+
+    age = time.time() - entry['computed_at']
+    if age < settings.DASHBOARD_STATS_SOFT_TTL:
+        return entry['data'], 'hit'
+
+    # Only the request that wins the lock starts a refresh
+    if _acquire_lock():
+        threading.Thread(target=_refresh_in_background, daemon=True).start()
+    return entry['data'], 'stale'
@@ -0,0 +1,218 @@
+"""
+Streaming data exports for finance.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` so neither
+model instances nor the full result set are held in memory. CSV is streamed
+straight to the client; XLSX is written row by row through openpyxl's
+write-only workbook into a temporary file and then streamed from disk.
+A worksheet holds at most ``XLSX_MAX_ROWS`` rows, so larger exports continue
+on further sheets, each starting with the header row.
+
+Because nothing of an XLSX export is sent until the whole workbook is on
+disk, the request holds a worker (and a database cursor) for the full build.
+XLSX exports are therefore refused above ``settings.EXPORT_XLSX_MAX_ROWS``
+rows; larger ranges have to be exported as CSV.
+"""
+
+import csv
+import tempfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from payments.models import Payment
+
+
+class ExportError(ValueError):
+    """Raised for invalid export parameters."""
+
+
+# dataset -> (queryset factory, date field, status field, status choices, [(header, field), ...])
+EXPORTS = {
+    'orders': (
+        lambda: Order.objects.all(),
+        'created_at',
+        'status',
+        Order.STATUS_CHOICES,
+        [
+            ('order_id', 'id'),
+            ('customer_email', 'user__email'),
+            ('status', 'status'),
+            ('total', 'total'),
+            ('city', 'address__city'),
+            ('state', 'address__state'),
+            ('postal_code', 'address__postal_code'),
+            ('created_at', 'created_at'),
+            ('updated_at', 'updated_at'),
+        ],
+    ),
+    'order-items': (
+        lambda: OrderItem.objects.all(),
+        'order__created_at',
+        'order__status',
+        Order.STATUS_CHOICES,
+        [
+            ('order_item_id', 'id'),
+            ('order_id', 'order_id'),
+            ('order_status', 'order__status'),
+            ('product_id', 'product_id'),
+            ('product_title', 'product__title'),
+            ('category', 'product__category__name'),
+            ('quantity', 'quantity'),
+            ('price', 'price'),
+            ('order_created_at', 'order__created_at'),
+        ],
+    ),
+    'payments': (
+        lambda: Payment.objects.all(),
+        'created_at',
+        'status',
+        Payment.PAYMENT_STATUS_CHOICES,
+        [
+            ('payment_id', 'id'),
+            ('razorpay_order_id', 'razorpay_order_id'),
+            ('razorpay_payment_id', 'razorpay_payment_id'),
+            ('order_id', 'order_id'),
+            ('customer_email', 'user__email'),
+            ('amount', 'amount'),
+            ('currency', 'currency'),
+            ('status', 'status'),
+            ('created_at', 'created_at'),
+            ('updated_at', 'updated_at'),
+        ],
+    ),
+}
+
+FILE_TYPES = ['csv', 'xlsx']
+
+# Excel's row limit per worksheet, header row included
+XLSX_MAX_ROWS = 1048576
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ExportError(f"Invalid '{name}' date, expected YYYY-MM-DD.")
+
+
+def build_export_rows(dataset, params, max_rows=None):
+    """
+    Validate the request parameters and return ``(headers, rows)`` where rows
+    is a lazily evaluated iterator over value tuples.
+
+    Supported params: ``from`` / ``to`` (inclusive dates, YYYY-MM-DD) and
+    ``status`` (comma-separated). With ``max_rows``, exports matching more
+    rows than that are refused.
+    """
+    if dataset not in EXPORTS:
+        raise ExportError(f"Unknown export '{dataset}'. Choose from: {', '.join(EXPORTS)}.")
+
+    queryset_factory, date_field, status_field, status_choices, columns = EXPORTS[dataset]
+    queryset = queryset_factory()
+    tz = timezone.get_current_timezone()
+
+    date_from = _parse_date(params['from'], 'from') if params.get('from') else None
+    date_to = _parse_date(params['to'], 'to') if params.get('to') else None
+    if date_from and date_to and date_from > date_to:
+        raise ExportError("'from' must not be after 'to'.")
+
+    if date_from:
+        start = datetime.combine(date_from, time.min)
+        queryset = queryset.filter(**{f'{date_field}__gte': timezone.make_aware(start, tz)})
+    if date_to:
+        end = datetime.combine(date_to + timedelta(days=1), time.min)
+        queryset = queryset.filter(**{f'{date_field}__lt': timezone.make_aware(end, tz)})
+
+    statuses = [value.strip() for value in params.get('status', '').split(',') if value.strip()]
+    if statuses:
+        valid = {choice for choice, _ in status_choices}
+        invalid = [value for value in statuses if value not in valid]
+        if invalid:
+            raise ExportError(f"Invalid status: {', '.join(invalid)}.")
+        queryset = queryset.filter(**{f'{status_field}__in': statuses})
+
+    if max_rows is not None and queryset.count() > max_rows:
+        raise ExportError(
+            f'This export has more than {max_rows} rows; download it as CSV or narrow the date range.'
+        )
+
+    headers = [header for header, _ in columns]
+    rows = queryset.order_by(date_field, 'id').values_list(
+        *[field for _, field in columns]
+    ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    return headers, rows
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    return value
+
+
+def _xlsx_value(value):
+    if isinstance(value, datetime):
+        # Excel has no notion of time zones
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def csv_response(filename, headers, rows):
+    response = StreamingHttpResponse(stream_csv(headers, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def _xlsx_sheet(workbook, filename, index, headers):
+    # Sheet titles are limited to 31 characters
+    suffix = f' ({index + 1})' if index else ''
+    sheet = workbook.create_sheet(title=filename[:31 - len(suffix)] + suffix)
+    sheet.append(headers)
+    return sheet
+
+
+def xlsx_response(filename, headers, rows):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportError('XLSX exports require the openpyxl package.')
+
+    workbook = Workbook(write_only=True)
+    sheet_count = 0
+    sheet_rows = XLSX_MAX_ROWS
+    for row in rows:
+        if sheet_rows == XLSX_MAX_ROWS:
+            sheet = _xlsx_sheet(workbook, filename, sheet_count, headers)
+            sheet_count += 1
+            sheet_rows = 1
+        sheet.append([_xlsx_value(value) for value in row])
+        sheet_rows += 1
+    if not sheet_count:
+        _xlsx_sheet(workbook, filename, 0, headers)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
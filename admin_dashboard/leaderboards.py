@@ -0,0 +1,157 @@
+"""
+Sliding-window leaderboards: top products by quantity and revenue, and top
+customers by spend, over the last ``LEADERBOARD_WINDOW_DAYS`` days.
+
+Scores are incremented when an order enters a paid state (or is created in
+one, item by item) and decremented when it leaves one (e.g. cancelled). Orders
+that age out of the window are dropped by ``rebuild_leaderboards``, which the
+nightly task runs; it also corrects any drift from updates that bypassed
+signals.
+
+The window is whole days in the current timezone, since the product boards
+are summed from the daily rollups: orders placed on or after the first day
+count on every board.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import DailySalesRollup, LeaderboardEntry
+from .rollups import PAID_ORDER_STATUSES, _local_date, increment_row
+
+PRODUCTS_QUANTITY = LeaderboardEntry.BOARD_PRODUCTS_QUANTITY
+PRODUCTS_REVENUE = LeaderboardEntry.BOARD_PRODUCTS_REVENUE
+CUSTOMERS_SPEND = LeaderboardEntry.BOARD_CUSTOMERS_SPEND
+
+
+def _window_start():
+    """First day of the window."""
+    return timezone.localdate() - timedelta(days=settings.LEADERBOARD_WINDOW_DAYS)
+
+
+def _in_window(order):
+    return _local_date(order.created_at) >= _window_start()
+
+
+def _increment(board, member_id, label, score):
+    increment_row(
+        LeaderboardEntry,
+        {'board': board, 'member_id': member_id},
+        {'label': label},
+        score=score,
+    )
+
+
+def _increment_item(item, sign=1):
+    _increment(PRODUCTS_QUANTITY, item.product_id, item.product.title, sign * item.quantity)
+    _increment(PRODUCTS_REVENUE, item.product_id, item.product.title, sign * item.subtotal)
+
+
+def record_order_created(order):
+    """Count the spend of an order created already paid; its items follow one by one."""
+    if order.status in PAID_ORDER_STATUSES and _in_window(order):
+        _increment(CUSTOMERS_SPEND, order.user_id, order.user.email, order.total)
+
+
+def record_order_item_created(item):
+    order = item.order
+    if order.status in PAID_ORDER_STATUSES and _in_window(order):
+        _increment_item(item)
+
+
+def record_order_status_change(order, previous_status):
+    """Add or remove an order's contribution when it enters or leaves a paid state."""
+    was_paid = previous_status in PAID_ORDER_STATUSES
+    is_paid = order.status in PAID_ORDER_STATUSES
+    if was_paid == is_paid or not _in_window(order):
+        return
+
+    sign = 1 if is_paid else -1
+    for item in order.order_items.select_related('product'):
+        _increment_item(item, sign)
+
+    _increment(CUSTOMERS_SPEND, order.user_id, order.user.email, sign * order.total)
+
+
+def top(board, limit=10):
+    """Return the top entries of a board, highest score first."""
+    return list(
+        LeaderboardEntry.objects.filter(board=board, score__gt=0).order_by('-score')[:limit]
+    )
+
+
+def scores(board, member_ids):
+    """Return {member_id: score} for the given members of a board."""
+    return dict(
+        LeaderboardEntry.objects.filter(board=board, member_id__in=member_ids).values_list('member_id', 'score')
+    )
+
+
+def _lock_entries():
+    """
+    Hold back leaderboard increments until the current transaction ends.
+    SQLite already serialises writers; PostgreSQL needs an explicit lock.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {LeaderboardEntry._meta.db_table} IN EXCLUSIVE MODE')
+
+
+def rebuild_leaderboards():
+    """
+    Recompute every board for the current window.
+
+    Product boards are summed from the per-product daily rollups; the
+    customer board is grouped over paid orders inside the window. The table
+    is locked before the sources are read, so an increment committed during
+    the rebuild is either included or applied on top of the new rows.
+    Returns the number of entries written.
+    """
+    from orders.models import Order
+
+    window_start = _window_start()
+    window_start_at = timezone.make_aware(datetime.combine(window_start, time.min), timezone.get_current_timezone())
+
+    with transaction.atomic():
+        _lock_entries()
+        entries = []
+
+        products = DailySalesRollup.objects.filter(
+            dimension=DailySalesRollup.DIMENSION_PRODUCT,
+            date__gte=window_start,
+        ).values('dimension_id').annotate(
+            label=Max('label'),
+            quantity=Sum('paid_items_sold'),
+            revenue=Sum('paid_sales'),
+        ).order_by()
+        for row in products:
+            if row['quantity']:
+                entries.append(LeaderboardEntry(
+                    board=PRODUCTS_QUANTITY, member_id=row['dimension_id'],
+                    label=row['label'], score=row['quantity'],
+                ))
+            if row['revenue']:
+                entries.append(LeaderboardEntry(
+                    board=PRODUCTS_REVENUE, member_id=row['dimension_id'],
+                    label=row['label'], score=row['revenue'],
+                ))
+
+        customers = Order.objects.filter(
+            created_at__gte=window_start_at,
+            status__in=PAID_ORDER_STATUSES,
+        ).values('user_id', 'user__email').annotate(spent=Sum('total')).order_by()
+        for row in customers:
+            if row['spent']:
+                entries.append(LeaderboardEntry(
+                    board=CUSTOMERS_SPEND, member_id=row['user_id'],
+                    label=row['user__email'], score=row['spent'],
+                ))
+
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+    return len(entries)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from admin_dashboard.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the bestseller and top-customer leaderboards for the current window'
+
+    def handle(self, *args, **options):
+        count = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {count} leaderboard entries'))
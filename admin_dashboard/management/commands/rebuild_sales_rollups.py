@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from admin_dashboard.rollups import rebuild_rollups
+from orders.models import Order
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the admin dashboard daily sales rollups from the raw tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Number of trailing days to rebuild (default: 7)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild the full history (use after the initial deploy)',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Number of days rebuilt per transaction (default: 31)',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+
+        if options['all']:
+            first_order = Order.objects.order_by('created_at').values_list('created_at', flat=True).first()
+            first_user = User.objects.order_by('date_joined').values_list('date_joined', flat=True).first()
+            candidates = [timezone.localtime(value).date() for value in (first_order, first_user) if value]
+            start_date = min(candidates) if candidates else today
+        else:
+            if options['days'] < 1:
+                raise CommandError('--days must be at least 1')
+            start_date = today - timedelta(days=options['days'] - 1)
+
+        chunk = timedelta(days=max(1, options['chunk_days']))
+        total = 0
+        chunk_start = start_date
+        while chunk_start <= today:
+            chunk_end = min(chunk_start + chunk - timedelta(days=1), today)
+            total += rebuild_rollups(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt {total} rollup rows from {start_date} to {today}'
+        ))
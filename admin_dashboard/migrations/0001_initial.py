@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('dimension', models.CharField(choices=[('all', 'All'), ('category', 'Category'), ('product', 'Product')], default='all', max_length=10)),
+                ('dimension_id', models.PositiveIntegerField(default=0)),
+                ('label', models.CharField(blank=True, help_text='Category name or product title at rollup time', max_length=255)),
+                ('orders', models.IntegerField(default=0)),
+                ('items_sold', models.IntegerField(default=0)),
+                ('paid_items_sold', models.IntegerField(default=0)),
+                ('paid_sales', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('new_users', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'daily_sales_rollups',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['dimension', 'date'], name='rollup_dimension_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysalesrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'dimension', 'dimension_id'), name='unique_daily_sales_rollup'),
+        ),
+    ]
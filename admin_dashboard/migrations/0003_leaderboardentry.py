@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_dashboard', '0002_hourlysalesrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('products_quantity', 'Top products by quantity'), ('products_revenue', 'Top products by revenue'), ('customers_spend', 'Top customers by spend')], max_length=30)),
+                ('member_id', models.PositiveIntegerField()),
+                ('label', models.CharField(blank=True, max_length=255)),
+                ('score', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'leaderboard_entries',
+                'ordering': ['board', '-score'],
+                'indexes': [models.Index(fields=['board', '-score'], name='leaderboard_board_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'member_id'), name='unique_leaderboard_member'),
+        ),
+    ]
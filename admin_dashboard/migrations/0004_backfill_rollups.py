@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-19 06:30
+
+import io
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """
+    Fill the rollups and leaderboards from the existing orders, payments and
+    users, so the dashboard totals include history from before they existed.
+    Uses the current rebuild code (the same as `rebuild_sales_rollups --all`);
+    on an empty database it writes nothing.
+    """
+    from admin_dashboard.leaderboards import rebuild_leaderboards
+
+    call_command('rebuild_sales_rollups', all=True, stdout=io.StringIO())
+    rebuild_leaderboards()
+
+
+class Migration(migrations.Migration):
+    # Commit the backfill one chunk of days at a time
+    atomic = False
+
+    dependencies = [
+        ('admin_dashboard', '0003_leaderboardentry'),
+        ('orders', '0004_orderitem_subtotal'),
+        ('payments', '0003_paymentwebhookevent'),
+        ('products', '0010_product_is_in_stock'),
+        ('users', '0007_remove_user_wishlist'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
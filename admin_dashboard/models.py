@@ -0,0 +1,113 @@
+from django.db import models
+
+
+class DailySalesRollup(models.Model):
+    """
+    Pre-aggregated daily sales figures for the admin dashboard.
+
+    One row per (date, dimension, dimension_id). The ``all`` dimension holds
+    store-wide totals (dimension_id is always 0), while ``category`` and
+    ``product`` rows break item sales down per category / product.
+    """
+    DIMENSION_ALL = 'all'
+    DIMENSION_CATEGORY = 'category'
+    DIMENSION_PRODUCT = 'product'
+    DIMENSION_CHOICES = [
+        (DIMENSION_ALL, 'All'),
+        (DIMENSION_CATEGORY, 'Category'),
+        (DIMENSION_PRODUCT, 'Product'),
+    ]
+
+    date = models.DateField()
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES, default=DIMENSION_ALL)
+    dimension_id = models.PositiveIntegerField(default=0)
+    label = models.CharField(max_length=255, blank=True, help_text="Category name or product title at rollup time")
+
+    # Orders placed and items ordered on this date (any status)
+    orders = models.IntegerField(default=0)
+    items_sold = models.IntegerField(default=0)
+
+    # Items belonging to orders in a paid state (paid, shipped, delivered)
+    paid_items_sold = models.IntegerField(default=0)
+    paid_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Completed payments and new registrations (``all`` dimension only)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    new_users = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_sales_rollups'
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'dimension', 'dimension_id'], name='unique_daily_sales_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'date'], name='rollup_dimension_date_idx'),
+        ]
+
+    def __str__(self):
+        if self.dimension == self.DIMENSION_ALL:
+            return f"Sales rollup {self.date}"
+        return f"Sales rollup {self.date} - {self.dimension} {self.label or self.dimension_id}"
+
+
+class HourlySalesRollup(models.Model):
+    """
+    Store-wide sales figures per hour, used for hour-granularity time series.
+    Same metrics as the ``all`` dimension of DailySalesRollup.
+    """
+    hour = models.DateTimeField(unique=True)
+
+    orders = models.IntegerField(default=0)
+    items_sold = models.IntegerField(default=0)
+    paid_items_sold = models.IntegerField(default=0)
+    paid_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    new_users = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'hourly_sales_rollups'
+        ordering = ['hour']
+
+    def __str__(self):
+        return f"Hourly sales rollup {self.hour:%Y-%m-%d %H:00}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    One member (product or customer) of a sliding-window leaderboard.
+
+    The (board, -score) index keeps each board sorted, so reading the top k
+    entries is an index range scan of k rows.
+    """
+    BOARD_PRODUCTS_QUANTITY = 'products_quantity'
+    BOARD_PRODUCTS_REVENUE = 'products_revenue'
+    BOARD_CUSTOMERS_SPEND = 'customers_spend'
+    BOARD_CHOICES = [
+        (BOARD_PRODUCTS_QUANTITY, 'Top products by quantity'),
+        (BOARD_PRODUCTS_REVENUE, 'Top products by revenue'),
+        (BOARD_CUSTOMERS_SPEND, 'Top customers by spend'),
+    ]
+
+    board = models.CharField(max_length=30, choices=BOARD_CHOICES)
+    member_id = models.PositiveIntegerField()
+    label = models.CharField(max_length=255, blank=True)
+    score = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'leaderboard_entries'
+        ordering = ['board', '-score']
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'member_id'], name='unique_leaderboard_member'),
+        ]
+        indexes = [
+            models.Index(fields=['board', '-score'], name='leaderboard_board_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.board}: {self.label or self.member_id} ({self.score})"
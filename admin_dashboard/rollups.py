@@ -0,0 +1,271 @@
+"""
+Daily and hourly sales rollups for the admin dashboard.
+
+Rollup rows are maintained incrementally from model signals (see signals.py)
+and rebuilt from the raw tables by ``rebuild_rollups``, which the nightly
+reconciliation task runs over a trailing window to correct any drift
+(deleted orders, bulk updates that bypass signals, etc.).
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import DailySalesRollup, HourlySalesRollup
+
+# Order statuses whose items count as sold for category / product figures
+PAID_ORDER_STATUSES = ['paid', 'shipped', 'delivered']
+ALL = DailySalesRollup.DIMENSION_ALL
+CATEGORY = DailySalesRollup.DIMENSION_CATEGORY
+PRODUCT = DailySalesRollup.DIMENSION_PRODUCT
+
+
+def _local_date(value):
+    """Return the dashboard date for a datetime (current timezone)."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def _local_hour(value):
+    """Return the start of the hour containing a datetime (current timezone)."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def increment_row(model, lookup, defaults=None, **deltas):
+    """
+    Add the given deltas to the row matching lookup with F() expressions,
+    creating the row if needed. The model must have an ``updated_at`` field.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    updates['updated_at'] = timezone.now()
+
+    if model.objects.filter(**lookup).update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **deltas)
+    except IntegrityError:
+        # Another request created the row in the meantime
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _bump(day, dimension, dimension_id=0, label='', **deltas):
+    lookup = {'date': day, 'dimension': dimension, 'dimension_id': dimension_id}
+    increment_row(DailySalesRollup, lookup, {'label': label}, **deltas)
+
+
+def _bump_totals(moment, **deltas):
+    """Apply store-wide deltas to both the daily and the hourly rollups."""
+    _bump(_local_date(moment), ALL, **deltas)
+    increment_row(HourlySalesRollup, {'hour': _local_hour(moment)}, **deltas)
+
+
+def _bump_item(moment, product, all_dimension=True, **deltas):
+    """Apply item-level deltas to the product, category and store-wide rows."""
+    day = _local_date(moment)
+    category = product.category
+    _bump(day, PRODUCT, product.id, product.title, **deltas)
+    _bump(day, CATEGORY, category.id if category else 0, category.name if category else '', **deltas)
+    if all_dimension:
+        _bump_totals(moment, **deltas)
+
+
+def record_order_created(order):
+    _bump_totals(order.created_at, orders=1)
+
+
+def record_order_item_created(item):
+    order = item.order
+    quantity = item.quantity
+    deltas = {'items_sold': quantity}
+    if order.status in PAID_ORDER_STATUSES:
+        deltas['paid_items_sold'] = quantity
+        deltas['paid_sales'] = item.subtotal
+    _bump_item(order.created_at, item.product, **deltas)
+
+
+def record_order_status_change(order, previous_status):
+    """Move an order's items in or out of the paid figures."""
+    was_paid = previous_status in PAID_ORDER_STATUSES
+    is_paid = order.status in PAID_ORDER_STATUSES
+    if was_paid == is_paid:
+        return
+
+    sign = 1 if is_paid else -1
+    total_items = 0
+    total_sales = Decimal('0')
+
+    for item in order.order_items.select_related('product__category'):
+        _bump_item(
+            order.created_at, item.product, all_dimension=False,
+            paid_items_sold=sign * item.quantity,
+            paid_sales=sign * item.subtotal,
+        )
+        total_items += item.quantity
+        total_sales += item.subtotal
+
+    _bump_totals(order.created_at, paid_items_sold=sign * total_items, paid_sales=sign * total_sales)
+
+
+def record_payment_status_change(payment, previous_status):
+    was_completed = previous_status == 'completed'
+    is_completed = payment.status == 'completed'
+    if was_completed == is_completed:
+        return
+
+    sign = 1 if is_completed else -1
+    _bump_totals(payment.created_at, revenue=sign * payment.amount)
+
+
+def record_user_created(user):
+    _bump_totals(user.date_joined, new_users=1)
+
+
+def _day_bounds(start_date, end_date):
+    """Aware datetimes covering [start_date, end_date] in the current timezone."""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def rebuild_rollups(start_date, end_date):
+    """
+    Recompute every daily and hourly rollup row between start_date and
+    end_date (inclusive) from the raw order, payment and user tables.
+
+    Runs a fixed number of grouped queries regardless of the range size and
+    replaces the existing rows in a single transaction.
+    Returns the number of rollup rows written.
+    """
+    from orders.models import Order, OrderItem
+    from payments.models import Payment
+    from users.models import User
+
+    start, end = _day_bounds(start_date, end_date)
+    rows = defaultdict(lambda: defaultdict(int))
+    hours = defaultdict(lambda: defaultdict(int))
+    labels = {}
+
+    def add(key, **values):
+        for field, value in values.items():
+            rows[key][field] += value or 0
+
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end).annotate(
+        day=TruncDate('created_at')
+    ).values('day').annotate(count=Count('id')).order_by()
+    for row in orders:
+        add((row['day'], ALL, 0), orders=row['count'])
+
+    paid = Q(order__status__in=PAID_ORDER_STATUSES)
+    items = OrderItem.objects.filter(
+        order__created_at__gte=start, order__created_at__lt=end
+    ).annotate(
+        day=TruncDate('order__created_at')
+    ).values(
+        'day', 'product_id', 'product__title', 'product__category_id', 'product__category__name'
+    ).annotate(
+        items_sold=Sum('quantity'),
+        paid_items_sold=Sum('quantity', filter=paid),
+        paid_sales=Sum('subtotal', filter=paid),
+    ).order_by()
+    for row in items:
+        values = {
+            'items_sold': row['items_sold'],
+            'paid_items_sold': row['paid_items_sold'],
+            'paid_sales': row['paid_sales'],
+        }
+        category_id = row['product__category_id'] or 0
+        add((row['day'], PRODUCT, row['product_id']), **values)
+        add((row['day'], CATEGORY, category_id), **values)
+        add((row['day'], ALL, 0), **values)
+        labels[(PRODUCT, row['product_id'])] = row['product__title']
+        labels[(CATEGORY, category_id)] = row['product__category__name'] or ''
+
+    payments = Payment.objects.filter(
+        status='completed', created_at__gte=start, created_at__lt=end
+    ).annotate(day=TruncDate('created_at')).values('day').annotate(total=Sum('amount')).order_by()
+    for row in payments:
+        add((row['day'], ALL, 0), revenue=row['total'])
+
+    users = User.objects.filter(date_joined__gte=start, date_joined__lt=end).annotate(
+        day=TruncDate('date_joined')
+    ).values('day').annotate(count=Count('id')).order_by()
+    for row in users:
+        add((row['day'], ALL, 0), new_users=row['count'])
+
+    rollups = [
+        DailySalesRollup(
+            date=day,
+            dimension=dimension,
+            dimension_id=dimension_id,
+            label=labels.get((dimension, dimension_id), ''),
+            **values
+        )
+        for (day, dimension, dimension_id), values in rows.items()
+    ]
+
+    _collect_hourly(hours, start, end)
+    hourly_rollups = [HourlySalesRollup(hour=hour, **values) for hour, values in hours.items()]
+
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+        DailySalesRollup.objects.bulk_create(rollups, batch_size=1000)
+        HourlySalesRollup.objects.filter(hour__gte=start, hour__lt=end).delete()
+        HourlySalesRollup.objects.bulk_create(hourly_rollups, batch_size=1000)
+
+    return len(rollups) + len(hourly_rollups)
+
+
+def _collect_hourly(hours, start, end):
+    """Accumulate store-wide totals per hour between two datetimes."""
+    from orders.models import Order, OrderItem
+    from payments.models import Payment
+    from users.models import User
+
+    def add(hour, **values):
+        for field, value in values.items():
+            hours[hour][field] += value or 0
+
+    for row in Order.objects.filter(created_at__gte=start, created_at__lt=end).annotate(
+        bucket=TruncHour('created_at')
+    ).values('bucket').annotate(count=Count('id')).order_by():
+        add(row['bucket'], orders=row['count'])
+
+    paid = Q(order__status__in=PAID_ORDER_STATUSES)
+    for row in OrderItem.objects.filter(order__created_at__gte=start, order__created_at__lt=end).annotate(
+        bucket=TruncHour('order__created_at')
+    ).values('bucket').annotate(
+        items_sold=Sum('quantity'),
+        paid_items_sold=Sum('quantity', filter=paid),
+        paid_sales=Sum('subtotal', filter=paid),
+    ).order_by():
+        add(
+            row['bucket'],
+            items_sold=row['items_sold'],
+            paid_items_sold=row['paid_items_sold'],
+            paid_sales=row['paid_sales'],
+        )
+
+    for row in Payment.objects.filter(status='completed', created_at__gte=start, created_at__lt=end).annotate(
+        bucket=TruncHour('created_at')
+    ).values('bucket').annotate(total=Sum('amount')).order_by():
+        add(row['bucket'], revenue=row['total'])
+
+    for row in User.objects.filter(date_joined__gte=start, date_joined__lt=end).annotate(
+        bucket=TruncHour('date_joined')
+    ).values('bucket').annotate(count=Count('id')).order_by():
+        add(row['bucket'], new_users=row['count'])
@@ -0,0 +1,61 @@
+"""
+Signal handlers keeping the dashboard rollups and leaderboards up to date.
+
+The previously loaded ``status`` of orders and payments is remembered on the
+instance (post_init) so that a save only touches the rollups when the status
+actually changes.
+"""
+
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from users.models import User
+from . import leaderboards, rollups
+
+
+def _remember_status(instance):
+    # Read from __dict__ so deferred status fields are not loaded
+    instance._rollup_status = instance.__dict__.get('status')
+
+
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=Payment)
+def remember_loaded_status(sender, instance, **kwargs):
+    _remember_status(instance)
+
+
+@receiver(post_save, sender=Order)
+def update_rollups_for_order(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.record_order_created(instance)
+        leaderboards.record_order_created(instance)
+    previous_status = getattr(instance, '_rollup_status', None)
+    rollups.record_order_status_change(instance, previous_status)
+    leaderboards.record_order_status_change(instance, previous_status)
+    _remember_status(instance)
+
+
+@receiver(post_save, sender=OrderItem)
+def update_rollups_for_order_item(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record_order_item_created(instance)
+        leaderboards.record_order_item_created(instance)
+
+
+@receiver(post_save, sender=Payment)
+def update_rollups_for_payment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_status = None if created else getattr(instance, '_rollup_status', None)
+    rollups.record_payment_status_change(instance, previous_status)
+    _remember_status(instance)
+
+
+@receiver(post_save, sender=User)
+def update_rollups_for_user(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record_user_created(instance)
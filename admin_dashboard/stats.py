@@ -0,0 +1,244 @@
+"""
+Dashboard statistics computed from the daily sales rollups.
+"""
+
+from django.db.models import Sum, Max, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from datetime import timedelta
+from orders.models import Order
+from users.models import User
+from . import leaderboards
+from .models import DailySalesRollup
+
+
+def calculate_trend(current_value, previous_value):
+    """
+    Calculate percentage trend between current and previous values.
+    Returns percentage change rounded to 1 decimal place.
+    """
+    if previous_value == 0:
+        return 100.0 if current_value > 0 else 0.0
+    
+    trend = ((current_value - previous_value) / previous_value) * 100
+    return round(trend, 1)
+
+
+def get_monthly_comparison_data():
+    """
+    Get data for current month vs previous month comparison.
+    Returns dict with current and previous month data.
+    """
+    now = timezone.now()
+    
+    # Current month start and end
+    current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if current_month_start.month == 12:
+        next_month_start = current_month_start.replace(year=current_month_start.year + 1, month=1)
+    else:
+        next_month_start = current_month_start.replace(month=current_month_start.month + 1)
+    current_month_end = next_month_start - timedelta(microseconds=1)
+    
+    # Previous month start and end
+    if current_month_start.month == 1:
+        previous_month_start = current_month_start.replace(year=current_month_start.year - 1, month=12)
+    else:
+        previous_month_start = current_month_start.replace(month=current_month_start.month - 1)
+    previous_month_end = current_month_start - timedelta(microseconds=1)
+    
+    return {
+        'current_month_start': current_month_start,
+        'current_month_end': current_month_end,
+        'previous_month_start': previous_month_start,
+        'previous_month_end': previous_month_end
+    }
+
+
+def build_dashboard_stats():
+    """
+    Compute the full admin dashboard payload.
+    Reads the pre-aggregated daily sales rollups rather than the raw order tables,
+    except for the all-time order and user counts: rollups outside the nightly
+    rebuild window never see deletions, so those are counted directly.
+    """
+    # Get current date and calculate date ranges
+    now = timezone.now()
+    thirty_days_ago = now - timedelta(days=30)
+
+    # Get monthly comparison data for trends
+    month_data = get_monthly_comparison_data()
+
+    month_range = {
+        'current': (month_data['current_month_start'].date(), month_data['current_month_end'].date()),
+        'previous': (month_data['previous_month_start'].date(), month_data['previous_month_end'].date()),
+    }
+
+    # Totals and month-over-month figures from the store-wide rollups
+    totals_query = {
+        'total_products_sold': Sum('items_sold'),
+        'total_revenue': Sum('revenue'),
+    }
+    for period, (start, end) in month_range.items():
+        in_period = Q(date__gte=start, date__lte=end)
+        totals_query[f'{period}_month_orders'] = Sum('orders', filter=in_period)
+        totals_query[f'{period}_month_products_sold'] = Sum('items_sold', filter=in_period)
+        totals_query[f'{period}_month_users'] = Sum('new_users', filter=in_period)
+        totals_query[f'{period}_month_revenue'] = Sum('revenue', filter=in_period)
+
+    totals = {
+        key: value or 0
+        for key, value in DailySalesRollup.objects.filter(
+            dimension=DailySalesRollup.DIMENSION_ALL
+        ).aggregate(**totals_query).items()
+    }
+
+    total_orders = Order.objects.count()
+    total_products_sold = totals['total_products_sold']
+    total_users = User.objects.count()
+    total_revenue = totals['total_revenue']
+
+    current_month_orders = totals['current_month_orders']
+    previous_month_orders = totals['previous_month_orders']
+    current_month_products_sold = totals['current_month_products_sold']
+    previous_month_products_sold = totals['previous_month_products_sold']
+    current_month_users = totals['current_month_users']
+    previous_month_users = totals['previous_month_users']
+    current_month_revenue = totals['current_month_revenue']
+    previous_month_revenue = totals['previous_month_revenue']
+
+    # Calculate trends (current month vs previous month)
+    orders_trend = calculate_trend(current_month_orders, previous_month_orders)
+    products_sold_trend = calculate_trend(current_month_products_sold, previous_month_products_sold)
+    users_trend = calculate_trend(current_month_users, previous_month_users)
+    revenue_trend = calculate_trend(current_month_revenue, previous_month_revenue)
+
+    # Orders per day (last 30 days)
+    orders_per_day = DailySalesRollup.objects.filter(
+        dimension=DailySalesRollup.DIMENSION_ALL,
+        date__gte=thirty_days_ago.date(),
+        orders__gt=0
+    ).values('date', 'orders').order_by('date')
+
+    # Format dates for frontend
+    orders_per_day_formatted = []
+    for item in orders_per_day:
+        orders_per_day_formatted.append({
+            'date': item['date'].strftime('%Y-%m-%d'),
+            'count': item['orders']
+        })
+
+    # Sales by category (last 30 days)
+    sales_by_category = DailySalesRollup.objects.filter(
+        dimension=DailySalesRollup.DIMENSION_CATEGORY,
+        date__gte=thirty_days_ago.date()
+    ).values('dimension_id').annotate(
+        name=Max('label'),
+        items=Sum('paid_items_sold'),
+        value=Sum('paid_sales')
+    ).filter(items__gt=0).order_by('-value')
+
+    # Format category data
+    sales_by_category_formatted = []
+    for item in sales_by_category:
+        category_name = item['name'] or 'Uncategorized'
+        sales_by_category_formatted.append({
+            'category': category_name,
+            'value': float(item['value'])
+        })
+
+    # Monthly revenue trends (last 12 months)
+    monthly_revenue = DailySalesRollup.objects.filter(
+        dimension=DailySalesRollup.DIMENSION_ALL,
+        date__gte=(now - timedelta(days=365)).date(),
+        revenue__gt=0
+    ).annotate(
+        month=TruncMonth('date')
+    ).values('month').annotate(
+        value=Sum('revenue')
+    ).order_by('month')
+
+    # Format monthly revenue data
+    monthly_revenue_formatted = []
+    month_names = {
+        '01': 'Jan', '02': 'Feb', '03': 'Mar', '04': 'Apr',
+        '05': 'May', '06': 'Jun', '07': 'Jul', '08': 'Aug',
+        '09': 'Sep', '10': 'Oct', '11': 'Nov', '12': 'Dec'
+    }
+
+    for item in monthly_revenue:
+        month_date = item['month']
+        year_month = month_date.strftime('%Y-%m')
+        year, month = year_month.split('-')
+        month_name = month_names.get(month, month)
+        monthly_revenue_formatted.append({
+            'month': f"{month_name} {year}",
+            'value': float(item['value'])
+        })
+
+    # Recent orders (last 10)
+    recent_orders = Order.objects.select_related('user').order_by('-created_at')[:10]
+    recent_orders_data = []
+    for order in recent_orders:
+        recent_orders_data.append({
+            'id': order.id,
+            'user_email': order.user.email,
+            'status': order.status,
+            'total': float(order.total),
+            'created_at': order.created_at.strftime('%Y-%m-%d %H:%M')
+        })
+
+    # Top selling products (leaderboard window)
+    top_products = leaderboards.top(leaderboards.PRODUCTS_QUANTITY, 10)
+    product_revenue = leaderboards.scores(
+        leaderboards.PRODUCTS_REVENUE, [entry.member_id for entry in top_products]
+    )
+
+    top_products_data = []
+    for entry in top_products:
+        top_products_data.append({
+            'title': entry.label,
+            'quantity_sold': int(entry.score),
+            'revenue': float(product_revenue.get(entry.member_id, 0))
+        })
+
+    # Top customers by spend (leaderboard window)
+    top_customers_data = []
+    for entry in leaderboards.top(leaderboards.CUSTOMERS_SPEND, 10):
+        top_customers_data.append({
+            'user_email': entry.label,
+            'total_spent': float(entry.score)
+        })
+
+    return {
+        'total_orders': total_orders,
+        'total_products_sold': total_products_sold,
+        'total_users': total_users,
+        'total_revenue': float(total_revenue),
+        'orders_per_day': orders_per_day_formatted,
+        'sales_by_category': sales_by_category_formatted,
+        'monthly_revenue': monthly_revenue_formatted,
+        'recent_orders': recent_orders_data,
+        'top_products': top_products_data,
+        'top_customers': top_customers_data,
+        'last_updated': now.strftime('%Y-%m-%d %H:%M:%S'),
+        'trends': {
+            'orders_trend': orders_trend,
+            'products_sold_trend': products_sold_trend,
+            'users_trend': users_trend,
+            'revenue_trend': revenue_trend,
+        },
+        'monthly_comparison': {
+            'current_month': {
+                'orders': current_month_orders,
+                'products_sold': current_month_products_sold,
+                'users': current_month_users,
+                'revenue': float(current_month_revenue),
+            },
+            'previous_month': {
+                'orders': previous_month_orders,
+                'products_sold': previous_month_products_sold,
+                'users': previous_month_users,
+                'revenue': float(previous_month_revenue),
+            }
+        }
+    }
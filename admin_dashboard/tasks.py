@@ -0,0 +1,20 @@
+from celery import shared_task
+from django.utils import timezone
+from datetime import timedelta
+from .leaderboards import rebuild_leaderboards
+from .rollups import rebuild_rollups
+
+
+@shared_task
+def reconcile_sales_rollups(days=7):
+    """Rebuild the last few days of dashboard rollups from the raw tables"""
+    today = timezone.localdate()
+    count = rebuild_rollups(today - timedelta(days=days - 1), today)
+    return f'Rebuilt {count} rollup rows for the last {days} days'
+
+
+@shared_task
+def refresh_leaderboards():
+    """Slide the leaderboard window forward and correct any drift"""
+    count = rebuild_leaderboards()
+    return f'Rebuilt {count} leaderboard entries'
@@ -0,0 +1,416 @@
+import csv
+import importlib
+import io
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+from users.models import Address, User
+from openpyxl import load_workbook
+
+from . import cache as stats_cache, exports, leaderboards
+from .models import DailySalesRollup, HourlySalesRollup, LeaderboardEntry
+from .rollups import rebuild_rollups
+from .stats import build_dashboard_stats
+from .tasks import reconcile_sales_rollups
+
+
+class DashboardTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.customer = User.objects.create_user(email='shopper@example.com', name='Shopper', password='password')
+        self.address = Address.objects.create(
+            user=self.customer, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+        self.category = Category.objects.create(name='Fruits')
+        self.apple = Product.objects.create(
+            title='Apple', description='Red', price=Decimal('2.50'), stock=100, category=self.category
+        )
+        self.pear = Product.objects.create(
+            title='Pear', description='Green', price=Decimal('4.00'), stock=100, category=self.category
+        )
+
+    def place(self, *lines, status='pending', user=None):
+        """Create an order of (product, quantity) lines charged at the product price."""
+        order = Order.objects.create(
+            user=user or self.customer,
+            address=self.address,
+            status=status,
+            total=sum(product.price * quantity for product, quantity in lines),
+        )
+        for product, quantity in lines:
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, price=product.price)
+        return order
+
+    def admin_client(self):
+        admin = User.objects.create_user(email='admin@example.com', name='Admin', password='password', role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        return client
+
+    def rollup(self, dimension=DailySalesRollup.DIMENSION_ALL, dimension_id=0, day=None):
+        return DailySalesRollup.objects.get(
+            date=day or timezone.localdate(), dimension=dimension, dimension_id=dimension_id
+        )
+
+
+class SalesRollupTests(DashboardTestMixin, TestCase):
+    """Incremental rollups, their rebuild and the dashboard totals."""
+
+    def test_paid_sales_are_line_totals(self):
+        self.place((self.apple, 3), (self.pear, 2), status='paid')
+
+        totals = self.rollup()
+        self.assertEqual(totals.orders, 1)
+        self.assertEqual(totals.items_sold, 5)
+        self.assertEqual(totals.paid_items_sold, 5)
+        self.assertEqual(totals.paid_sales, Decimal('15.50'))
+        self.assertEqual(self.rollup(DailySalesRollup.DIMENSION_PRODUCT, self.apple.id).paid_sales, Decimal('7.50'))
+        self.assertEqual(self.rollup(DailySalesRollup.DIMENSION_CATEGORY, self.category.id).paid_sales, Decimal('15.50'))
+        self.assertEqual(HourlySalesRollup.objects.get().paid_sales, Decimal('15.50'))
+
+    def test_status_changes_move_line_totals(self):
+        order = self.place((self.apple, 4))
+        self.assertEqual(self.rollup().paid_sales, 0)
+
+        order.status = 'paid'
+        order.save()
+        self.assertEqual(self.rollup().paid_sales, Decimal('10.00'))
+        self.assertEqual(self.rollup(DailySalesRollup.DIMENSION_PRODUCT, self.apple.id).paid_items_sold, 4)
+
+        order.status = 'cancelled'
+        order.save()
+        self.assertEqual(self.rollup().paid_sales, 0)
+        self.assertEqual(HourlySalesRollup.objects.get().paid_sales, 0)
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.place((self.apple, 3), (self.pear, 2), status='paid')
+        self.place((self.pear, 1))
+        fields = ['date', 'dimension', 'dimension_id', 'orders', 'items_sold', 'paid_items_sold', 'paid_sales']
+        incremental = sorted(DailySalesRollup.objects.values_list(*fields))
+        hourly = list(HourlySalesRollup.objects.values_list('paid_sales', 'items_sold'))
+
+        today = timezone.localdate()
+        rebuild_rollups(today, today)
+
+        self.assertEqual(sorted(DailySalesRollup.objects.values_list(*fields)), incremental)
+        self.assertEqual(list(HourlySalesRollup.objects.values_list('paid_sales', 'items_sold')), hourly)
+
+    def test_reconcile_rebuilds_exactly_the_requested_days(self):
+        today = timezone.localdate()
+        DailySalesRollup.objects.all().delete()
+        for days_ago in range(3):
+            DailySalesRollup.objects.create(date=today - timedelta(days=days_ago), orders=9)
+
+        # The customer's registration today, daily and hourly
+        self.assertEqual(reconcile_sales_rollups(days=2), 'Rebuilt 2 rollup rows for the last 2 days')
+
+        remaining = DailySalesRollup.objects.values_list('date', 'orders', 'new_users')
+        self.assertEqual(list(remaining), [(today - timedelta(days=2), 9, 0), (today, 0, 1)])
+
+    def test_dashboard_totals_follow_deletions(self):
+        self.place((self.apple, 1), status='paid')
+        doomed = self.place((self.pear, 1))
+        User.objects.create_user(email='gone@example.com', name='Gone', password='password').delete()
+        # Bypasses the signals, like deletions older than the rebuild window
+        Order.objects.filter(pk=doomed.pk).delete()
+
+        stats = build_dashboard_stats()
+        self.assertEqual(stats['total_orders'], 1)
+        self.assertEqual(stats['total_users'], 1)
+        self.assertEqual(stats['total_products_sold'], 2)
+        self.assertEqual(stats['sales_by_category'], [{'category': 'Fruits', 'value': 2.5}])
+
+    def test_migration_backfills_history(self):
+        self.place((self.apple, 2), (self.pear, 1), status='delivered')
+        # Orders from before the rollups existed
+        DailySalesRollup.objects.all().delete()
+        HourlySalesRollup.objects.all().delete()
+        LeaderboardEntry.objects.all().delete()
+
+        migration = importlib.import_module('admin_dashboard.migrations.0004_backfill_rollups')
+        migration.backfill(apps, None)
+        stats = build_dashboard_stats()
+        self.assertEqual(stats['total_products_sold'], 3)
+        self.assertEqual(leaderboards.top(leaderboards.PRODUCTS_QUANTITY)[0].label, 'Apple')
+
+
+class LeaderboardTests(DashboardTestMixin, TestCase):
+    """Sliding-window product and customer leaderboards."""
+
+    def scores(self, board):
+        return [(entry.label, entry.score) for entry in leaderboards.top(board)]
+
+    def test_paid_orders_enter_and_leave_the_boards(self):
+        order = self.place((self.apple, 3), (self.pear, 1))
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_REVENUE), [])
+
+        order.status = 'paid'
+        order.save()
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_QUANTITY), [('Apple', 3), ('Pear', 1)])
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_REVENUE), [('Apple', Decimal('7.50')), ('Pear', Decimal('4.00'))])
+        self.assertEqual(self.scores(leaderboards.CUSTOMERS_SPEND), [('shopper@example.com', Decimal('11.50'))])
+
+        order.status = 'cancelled'
+        order.save()
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_QUANTITY), [])
+        self.assertEqual(self.scores(leaderboards.CUSTOMERS_SPEND), [])
+
+    def test_rebuild_matches_incremental_scores(self):
+        order = self.place((self.apple, 3), (self.pear, 1))
+        order.status = 'paid'
+        order.save()
+        self.place((self.pear, 2), status='delivered')
+        self.place((self.apple, 5))
+        incremental = sorted(LeaderboardEntry.objects.values_list('board', 'member_id', 'score'))
+
+        self.assertEqual(leaderboards.rebuild_leaderboards(), 5)
+        self.assertEqual(sorted(LeaderboardEntry.objects.values_list('board', 'member_id', 'score')), incremental)
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_REVENUE), [('Pear', Decimal('12.00')), ('Apple', Decimal('7.50'))])
+
+    def test_orders_created_paid_are_counted(self):
+        self.place((self.apple, 2), (self.pear, 1), status='paid')
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_QUANTITY), [('Apple', 2), ('Pear', 1)])
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_REVENUE), [('Apple', Decimal('5.00')), ('Pear', Decimal('4.00'))])
+        self.assertEqual(self.scores(leaderboards.CUSTOMERS_SPEND), [('shopper@example.com', Decimal('9.00'))])
+
+    def test_boards_share_the_window(self):
+        order = self.place((self.apple, 2), status='paid')
+        first_day = timezone.localdate() - timedelta(days=settings.LEADERBOARD_WINDOW_DAYS)
+        placed_at = timezone.make_aware(datetime.combine(first_day, datetime.min.time()) + timedelta(minutes=30))
+        Order.objects.filter(pk=order.pk).update(created_at=placed_at)
+        DailySalesRollup.objects.all().delete()
+        rebuild_rollups(first_day, timezone.localdate())
+
+        leaderboards.rebuild_leaderboards()
+        self.assertEqual(self.scores(leaderboards.PRODUCTS_QUANTITY), [('Apple', 2)])
+        self.assertEqual(self.scores(leaderboards.CUSTOMERS_SPEND), [('shopper@example.com', Decimal('5.00'))])
+
+    def test_orders_outside_the_window_are_dropped(self):
+        order = self.place((self.apple, 2), status='paid')
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=60))
+        today = timezone.localdate()
+        rebuild_rollups(today - timedelta(days=60), today)
+
+        leaderboards.rebuild_leaderboards()
+        self.assertFalse(LeaderboardEntry.objects.exists())
+
+        # Status changes of old orders no longer touch the boards
+        order.refresh_from_db()
+        order.status = 'cancelled'
+        order.save()
+        self.assertFalse(LeaderboardEntry.objects.exists())
+
+
+class TimeSeriesTests(DashboardTestMixin, TestCase):
+    """Zero-filled time series read from the rollups."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.admin_client()
+        self.url = reverse('admin_dashboard:timeseries')
+
+    def test_daily_series_is_zero_filled(self):
+        today = timezone.localdate()
+        self.place((self.apple, 3), status='paid')
+        DailySalesRollup.objects.create(date=today - timedelta(days=2), orders=4, paid_sales=Decimal('1.25'))
+
+        response = self.client.get(self.url, {
+            'metric': 'orders,paid_sales', 'from': (today - timedelta(days=3)).isoformat(), 'to': today.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['buckets'], [(today - timedelta(days=n)).isoformat() for n in range(3, -1, -1)])
+        self.assertEqual(response.data['series'], {'orders': [0, 4, 0, 1], 'paid_sales': [0.0, 1.25, 0.0, 7.5]})
+
+    def test_hourly_series(self):
+        self.place((self.apple, 2), (self.pear, 3), status='paid')
+        today = timezone.localdate().isoformat()
+
+        response = self.client.get(self.url, {'metric': 'paid_sales', 'granularity': 'hour', 'from': today, 'to': today})
+        self.assertEqual(len(response.data['buckets']), 24)
+        hour = timezone.localtime().hour
+        self.assertEqual(response.data['buckets'][hour], f'{today}T{hour:02d}')
+        self.assertEqual(response.data['series']['paid_sales'][hour], 17.0)
+        self.assertEqual(sum(response.data['series']['paid_sales']), 17.0)
+
+    def test_weekly_and_monthly_buckets(self):
+        monday = timezone.localdate() - timedelta(days=timezone.localdate().weekday() + 14)
+        DailySalesRollup.objects.create(date=monday + timedelta(days=1), orders=2)
+        DailySalesRollup.objects.create(date=monday + timedelta(days=3), orders=3)
+        params = {'metric': 'orders', 'from': monday.isoformat(), 'to': (monday + timedelta(days=13)).isoformat()}
+
+        response = self.client.get(self.url, {**params, 'granularity': 'week'})
+        self.assertEqual(response.data['buckets'], [monday.isoformat(), (monday + timedelta(days=7)).isoformat()])
+        self.assertEqual(response.data['series']['orders'], [5, 0])
+
+        response = self.client.get(self.url, {**params, 'granularity': 'month'})
+        self.assertEqual(sum(response.data['series']['orders']), 5)
+
+    def test_invalid_parameters(self):
+        for params in [{'metric': 'profit'}, {'granularity': 'year'}, {'from': '2024-02-30'},
+                       {'from': '2024-03-02', 'to': '2024-03-01'}, {'granularity': 'hour', 'from': '2000-01-01'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
+
+    def test_requires_an_admin(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        self.assertEqual(client.get(self.url).status_code, 403)
+
+
+@override_settings(DASHBOARD_STATS_SOFT_TTL=60, DASHBOARD_STATS_MISS_WAIT=1)
+class DashboardStatsCacheTests(DashboardTestMixin, TestCase):
+    """Stale-while-revalidate caching of the dashboard statistics."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.admin_client()
+        self.url = reverse('admin_dashboard:dashboard_stats')
+
+    def get_stats(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def age_entry(self, seconds):
+        entry = cache.get(stats_cache.STATS_CACHE_KEY)
+        entry['computed_at'] -= seconds
+        cache.set(stats_cache.STATS_CACHE_KEY, entry)
+
+    def test_miss_hit_and_bypass(self):
+        self.assertEqual(self.get_stats()['cache_status'], 'miss')
+        self.assertIsNone(cache.get(stats_cache.STATS_LOCK_KEY))
+
+        self.place((self.apple, 1))
+        data = self.get_stats()
+        self.assertEqual((data['cache_status'], data['total_orders']), ('hit', 0))
+
+        data = self.get_stats(fresh=1)
+        self.assertEqual((data['cache_status'], data['total_orders']), ('bypass', 1))
+        self.assertEqual(self.get_stats()['total_orders'], 1)
+
+    @mock.patch('admin_dashboard.cache.threading.Thread')
+    def test_stale_entry_starts_one_refresh(self, thread):
+        self.get_stats()
+        self.age_entry(120)
+
+        self.assertEqual(self.get_stats()['cache_status'], 'stale')
+        self.assertEqual(self.get_stats()['cache_status'], 'stale')
+        thread.assert_called_once_with(target=stats_cache._refresh_in_background, daemon=True)
+        self.assertTrue(cache.get(stats_cache.STATS_LOCK_KEY))
+
+        # The refresh releases the lock it was started with
+        self.place((self.apple, 1))
+        stats_cache._refresh_in_background()
+        self.assertIsNone(cache.get(stats_cache.STATS_LOCK_KEY))
+        data = self.get_stats()
+        self.assertEqual((data['cache_status'], data['total_orders']), ('hit', 1))
+
+    def test_bypass_keeps_a_lock_it_does_not_hold(self):
+        cache.add(stats_cache.STATS_LOCK_KEY, True)
+        self.get_stats(fresh=1)
+        self.assertTrue(cache.get(stats_cache.STATS_LOCK_KEY))
+
+    def test_cold_miss_waits_for_the_lock_holder(self):
+        cache.add(stats_cache.STATS_LOCK_KEY, True)
+        computed = {'data': {'total_orders': 42}, 'computed_at': time.time()}
+
+        with mock.patch('admin_dashboard.cache.time.sleep', lambda _: cache.set(stats_cache.STATS_CACHE_KEY, computed)), \
+                mock.patch('admin_dashboard.cache.build_dashboard_stats') as build:
+            data, status = stats_cache.get_dashboard_stats()
+
+        build.assert_not_called()
+        self.assertEqual((data, status), ({'total_orders': 42}, 'miss'))
+        self.assertTrue(cache.get(stats_cache.STATS_LOCK_KEY))
+
+    def test_cold_miss_computes_after_waiting_too_long(self):
+        cache.add(stats_cache.STATS_LOCK_KEY, True)
+        with mock.patch('admin_dashboard.cache.time.monotonic', side_effect=[0, 0, 5]), \
+                mock.patch('admin_dashboard.cache.time.sleep'):
+            data, status = stats_cache.get_dashboard_stats()
+
+        self.assertEqual((data['total_orders'], status), (0, 'miss'))
+        self.assertTrue(cache.get(stats_cache.STATS_LOCK_KEY))
+
+
+class ExportTests(DashboardTestMixin, TestCase):
+    """Streaming CSV and XLSX exports."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.admin_client()
+        self.paid = self.place((self.apple, 3), (self.pear, 1), status='paid')
+        self.pending = self.place((self.pear, 2))
+
+    def export(self, name, **params):
+        response = self.client.get(reverse('admin_dashboard:export_data', args=name.split('.')), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def read_csv(self, name, **params):
+        response = self.export(name, **params)
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def read_xlsx(self, name, **params):
+        response = self.export(name, **params)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        return {sheet.title: list(sheet.values) for sheet in workbook.worksheets}
+
+    def test_csv_with_filters(self):
+        rows = self.read_csv('orders.csv')
+        self.assertEqual(rows[0][:4], ['order_id', 'customer_email', 'status', 'total'])
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.paid.id), str(self.pending.id)])
+
+        rows = self.read_csv('order-items.csv', status='pending')
+        self.assertEqual([(row[4], row[6], row[7]) for row in rows[1:]], [('Pear', '2', '4.00')])
+
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        self.assertEqual(len(self.read_csv('orders.csv', **{'from': tomorrow})), 1)
+
+    def test_xlsx(self):
+        sheets = self.read_xlsx('order-items.xlsx')
+        name = f"order-items-{timezone.localdate():%Y%m%d}"
+        self.assertEqual(list(sheets), [name])
+        self.assertEqual(sheets[name][0][:2], ('order_item_id', 'order_id'))
+        self.assertEqual(len(sheets[name]), 4)
+
+    @mock.patch.object(exports, 'XLSX_MAX_ROWS', 2)
+    def test_xlsx_splits_at_the_row_limit(self):
+        sheets = self.read_xlsx('order-items.xlsx')
+        self.assertEqual(len(sheets), 3)
+        for rows in sheets.values():
+            self.assertEqual(len(rows), 2)
+            self.assertEqual(rows[0][0], 'order_item_id')
+        self.assertTrue(list(sheets)[2].endswith(' (3)'))
+        self.assertLessEqual(max(len(title) for title in sheets), 31)
+
+    @override_settings(EXPORT_XLSX_MAX_ROWS=2)
+    def test_large_xlsx_is_refused(self):
+        response = self.client.get(reverse('admin_dashboard:export_data', args=['order-items', 'xlsx']))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('CSV', response.data['error'])
+        self.assertEqual(len(self.read_csv('order-items.csv')), 4)
+        self.assertEqual(len(self.read_xlsx('order-items.xlsx', status='pending')), 1)
+
+    def test_invalid_requests(self):
+        today = timezone.localdate()
+        reversed_range = {'from': today.isoformat(), 'to': (today - timedelta(days=1)).isoformat()}
+        for name, params in [('refunds.csv', {}), ('orders.pdf', {}), ('orders.csv', {'status': 'lost'}),
+                             ('payments.csv', {'to': 'yesterday'}), ('orders.csv', reversed_range)]:
+            url = reverse('admin_dashboard:export_data', args=name.split('.'))
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, name)
@@ -0,0 +1,152 @@
+"""
+Time-series analytics served from the sales rollups.
+
+Hourly series read HourlySalesRollup; daily, weekly and monthly series read
+the store-wide DailySalesRollup rows (grouped with TruncWeek / TruncMonth).
+Buckets without activity are zero-filled with NumPy: the full bucket axis is
+built with ``np.arange`` and the stored rows are scattered into it with
+``np.searchsorted``.
+"""
+
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import DailySalesRollup, HourlySalesRollup
+
+
+class TimeSeriesError(ValueError):
+    """Raised for invalid time-series parameters."""
+
+
+# metric -> whether it is a money amount (float) rather than a count (int)
+METRICS = {
+    'orders': False,
+    'items_sold': False,
+    'paid_items_sold': False,
+    'paid_sales': True,
+    'revenue': True,
+    'new_users': False,
+}
+
+# granularity -> (NumPy unit, bucket step, default span in days)
+GRANULARITIES = {
+    'hour': ('h', 1, 2),
+    'day': ('D', 1, 30),
+    'week': ('D', 7, 7 * 12),
+    'month': ('M', 1, 365),
+}
+
+MAX_BUCKETS = 5000
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise TimeSeriesError(f"Invalid '{name}' date, expected YYYY-MM-DD.")
+
+
+def parse_params(params):
+    """Validate query params and return (metrics, granularity, date_from, date_to)."""
+    metrics = []
+    for value in params.getlist('metric') or ['revenue']:
+        metrics.extend(metric.strip() for metric in value.split(',') if metric.strip())
+    metrics = list(dict.fromkeys(metrics))
+    invalid = [metric for metric in metrics if metric not in METRICS]
+    if invalid or not metrics:
+        raise TimeSeriesError(
+            f"Invalid metric: {', '.join(invalid) or '(none)'}. Choose from: {', '.join(METRICS)}."
+        )
+
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise TimeSeriesError(f"Invalid granularity. Choose from: {', '.join(GRANULARITIES)}.")
+
+    date_to = _parse_date(params['to'], 'to') if params.get('to') else timezone.localdate()
+    if params.get('from'):
+        date_from = _parse_date(params['from'], 'from')
+    else:
+        date_from = date_to - timedelta(days=GRANULARITIES[granularity][2] - 1)
+    if date_from > date_to:
+        raise TimeSeriesError("'from' must not be after 'to'.")
+
+    return metrics, granularity, date_from, date_to
+
+
+def bucket_axis(granularity, date_from, date_to):
+    """Every bucket start between the two dates as a datetime64 array."""
+    unit, step, _ = GRANULARITIES[granularity]
+    if granularity == 'hour':
+        start = np.datetime64(date_from, 'h')
+        stop = np.datetime64(date_to + timedelta(days=1), 'h')
+    elif granularity == 'week':
+        # ISO weeks start on Monday, matching TruncWeek
+        start = np.datetime64(date_from - timedelta(days=date_from.weekday()), 'D')
+        stop = np.datetime64(date_to, 'D') + 1
+    else:
+        start = np.datetime64(date_from, unit)
+        stop = np.datetime64(date_to, unit) + 1
+    return np.arange(start, stop, step)
+
+
+def _fetch_rows(metrics, granularity, date_from, date_to):
+    """Return (bucket keys, values) as lists straight from the rollups."""
+    sums = {metric: Sum(metric) for metric in metrics}
+
+    if granularity == 'hour':
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(date_from, time.min), tz)
+        end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min), tz)
+        rows = list(HourlySalesRollup.objects.filter(hour__gte=start, hour__lt=end).values_list('hour', *metrics))
+        keys = [timezone.localtime(row[0]).replace(tzinfo=None) for row in rows]
+        return keys, [row[1:] for row in rows]
+
+    daily = DailySalesRollup.objects.filter(
+        dimension=DailySalesRollup.DIMENSION_ALL,
+        date__gte=date_from,
+        date__lte=date_to,
+    )
+    if granularity == 'day':
+        rows = list(daily.values_list('date', *metrics))
+    else:
+        trunc = TruncWeek if granularity == 'week' else TruncMonth
+        rows = list(
+            daily.annotate(bucket=trunc('date')).values('bucket').annotate(**sums)
+            .order_by('bucket').values_list('bucket', *metrics)
+        )
+    return [row[0] for row in rows], [row[1:] for row in rows]
+
+
+def build_timeseries(metrics, granularity, date_from, date_to):
+    """Build a zero-filled, column-oriented series for each metric."""
+    unit = GRANULARITIES[granularity][0]
+    axis = bucket_axis(granularity, date_from, date_to)
+    if len(axis) > MAX_BUCKETS:
+        raise TimeSeriesError(f'Range too large: at most {MAX_BUCKETS} buckets per request.')
+
+    keys, values = _fetch_rows(metrics, granularity, date_from, date_to)
+    series = np.zeros((len(axis), len(metrics)), dtype=np.float64)
+    if keys:
+        positions = np.searchsorted(axis, np.array(keys, dtype=f'datetime64[{unit}]'))
+        series[positions] = np.array(values, dtype=np.float64)
+
+    result = {}
+    for index, metric in enumerate(metrics):
+        column = series[:, index]
+        if METRICS[metric]:
+            result[metric] = np.round(column, 2).tolist()
+        else:
+            result[metric] = column.astype(np.int64).tolist()
+
+    return {
+        'granularity': granularity,
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'metrics': metrics,
+        'buckets': np.datetime_as_string(axis, unit=unit).tolist(),
+        'series': result,
+    }
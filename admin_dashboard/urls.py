@@ -5,4 +5,6 @@ app_name = 'admin_dashboard'
 
 urlpatterns = [
     path('stats/', views.dashboard_stats, name='dashboard_stats'),
+    path('timeseries/', views.timeseries, name='timeseries'),
+    path('exports/<str:dataset>.<str:file_type>', views.export_data, name='export_data'),
 ]
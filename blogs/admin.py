@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .comments import refresh_approved_comment_counts
 from .models import Blog, BlogCategory, BlogTag, BlogComment
 
 @admin.register(BlogCategory)
@@ -54,11 +55,15 @@ class BlogCommentAdmin(admin.ModelAdmin):
     actions = ['approve_comments', 'disapprove_comments']
     
     def approve_comments(self, request, queryset):
-        queryset.update(approved=True)
-        self.message_user(request, f'{queryset.count()} comments approved.')
+        blog_ids = set(queryset.values_list('blog_id', flat=True))
+        count = queryset.update(approved=True)
+        refresh_approved_comment_counts(blog_ids)
+        self.message_user(request, f'{count} comments approved.')
     approve_comments.short_description = "Approve selected comments"
     
     def disapprove_comments(self, request, queryset):
-        queryset.update(approved=False)
-        self.message_user(request, f'{queryset.count()} comments disapproved.')
+        blog_ids = set(queryset.values_list('blog_id', flat=True))
+        count = queryset.update(approved=False)
+        refresh_approved_comment_counts(blog_ids)
+        self.message_user(request, f'{count} comments disapproved.')
     disapprove_comments.short_description = "Disapprove selected comments"
\ No newline at end of file
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class BlogsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blogs'
-    verbose_name = 'Blog Management'
\ No newline at end of file
+    verbose_name = 'Blog Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
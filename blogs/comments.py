@@ -0,0 +1,37 @@
+"""
+Denormalized ``Blog.approved_comment_count``.
+
+Single comment saves and deletes adjust the count in place (see signals.py).
+Bulk changes that bypass signals, like the admin approve / disapprove
+actions, recount the affected posts with ``refresh_approved_comment_counts``.
+Either way the pre-rendered detail documents of those posts are refreshed.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Blog, BlogComment
+from .prerender import schedule_prerender
+
+
+def adjust_approved_comment_count(blog_id, delta):
+    # Clamped so a drifted count can't break the delete cascade of a post
+    Blog.objects.filter(pk=blog_id).update(
+        approved_comment_count=Greatest(F('approved_comment_count') + delta, 0)
+    )
+    schedule_prerender([blog_id])
+
+
+def refresh_approved_comment_counts(blog_ids=None):
+    """Recount approved comments for the given posts (all posts when None)."""
+    approved = (
+        BlogComment.objects.filter(blog=OuterRef('pk'), approved=True)
+        .order_by()
+        .values('blog')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    blogs = Blog.objects.all() if blog_ids is None else Blog.objects.filter(pk__in=blog_ids)
+    count = blogs.update(approved_comment_count=Coalesce(Subquery(approved), 0))
+    schedule_prerender(blogs.values_list('pk', flat=True))
+    return count
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blogs.models import Blog, calculate_reading_time, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored reading time and excerpt of every blog post from its content'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of posts loaded and updated at a time (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        updated = 0
+        last_pk = None
+
+        while True:
+            # Keyset pagination so only one chunk of content is in memory
+            queryset = Blog.objects.only('id', 'content', 'reading_time', 'excerpt').order_by('pk')
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            chunk = list(queryset[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+
+            changed = []
+            for blog in chunk:
+                reading_time = calculate_reading_time(blog.content)
+                excerpt = make_excerpt(blog.content)
+                if (blog.reading_time, blog.excerpt) != (reading_time, excerpt):
+                    blog.reading_time, blog.excerpt = reading_time, excerpt
+                    changed.append(blog)
+
+            Blog.objects.bulk_update(changed, ['reading_time', 'excerpt'])
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Updated reading time and excerpt of {updated} blog posts'))
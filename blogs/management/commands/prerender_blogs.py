@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blogs.prerender import prerender_all
+
+
+class Command(BaseCommand):
+    help = 'Re-render the cached detail documents (and static files, if enabled) of every published blog post'
+
+    def handle(self, *args, **options):
+        count = prerender_all()
+        self.stdout.write(self.style.SUCCESS(f'✅ Pre-rendered {count} blog posts'))
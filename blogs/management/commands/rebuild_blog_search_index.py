@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blogs.search import backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the blog full-text search index from the blogs table'
+
+    def handle(self, *args, **options):
+        if backend() is None:
+            self.stdout.write(self.style.WARNING('⚠️ This database has no blog search index, nothing to rebuild'))
+            return
+
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {count} blog posts'))
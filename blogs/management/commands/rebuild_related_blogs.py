@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blogs.recommendations import rebuild_related_blogs
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-post recommendations of every published blog post'
+
+    def handle(self, *args, **options):
+        count = rebuild_related_blogs()
+        self.stdout.write(self.style.SUCCESS(f'✅ Stored {count} related-post entries'))
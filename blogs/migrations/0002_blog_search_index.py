@@ -0,0 +1,63 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:40
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_blog_fts USING fts5("
+            "blog_id UNINDEXED, title, summary, content, tags, tokenize='porter unicode61')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS blogs_blog_search ("
+            "blog_id uuid PRIMARY KEY REFERENCES blogs_blog (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS blogs_blog_search_document_idx "
+            "ON blogs_blog_search USING GIN (document)"
+        )
+    else:
+        return
+
+    # Index existing posts
+    Blog = apps.get_model('blogs', 'Blog')
+    with schema_editor.connection.cursor() as cursor:
+        for blog in Blog.objects.prefetch_related('tags').iterator(chunk_size=200):
+            tags = ' '.join(tag.name for tag in blog.tags.all())
+            if vendor == 'sqlite':
+                cursor.execute(
+                    "INSERT INTO blogs_blog_fts (blog_id, title, summary, content, tags) VALUES (%s, %s, %s, %s, %s)",
+                    [blog.pk.hex, blog.title, blog.summary, blog.content, tags]
+                )
+            else:
+                cursor.execute(
+                    "INSERT INTO blogs_blog_search (blog_id, document) VALUES (%s, "
+                    "setweight(to_tsvector('english', %s), 'A') || "
+                    "setweight(to_tsvector('english', %s), 'B') || "
+                    "setweight(to_tsvector('english', %s), 'B') || "
+                    "setweight(to_tsvector('english', %s), 'C'))",
+                    [blog.pk, blog.title, tags, blog.summary, blog.content]
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS blogs_blog_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS blogs_blog_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
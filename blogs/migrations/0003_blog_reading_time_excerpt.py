@@ -0,0 +1,41 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+from blogs.models import calculate_reading_time, make_excerpt
+
+
+def fill_reading_time_and_excerpt(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    blogs = Blog.objects.only('pk', 'content').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(blogs.filter(pk__gt=last_pk)[:500])
+        if not batch:
+            break
+        for blog in batch:
+            blog.reading_time = calculate_reading_time(blog.content)
+            blog.excerpt = make_excerpt(blog.content)
+        Blog.objects.bulk_update(batch, ['reading_time', 'excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0002_blog_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='First 150 characters of content', max_length=153),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Estimated reading time in minutes'),
+        ),
+        migrations.RunPython(fill_reading_time_and_excerpt, migrations.RunPython.noop),
+    ]
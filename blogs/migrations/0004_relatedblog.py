@@ -0,0 +1,32 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0003_blog_reading_time_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedBlog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='blogs.blog')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_in', to='blogs.blog')),
+            ],
+            options={
+                'ordering': ['blog', 'rank'],
+                'indexes': [models.Index(fields=['blog', 'rank'], name='related_blog_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedblog',
+            constraint=models.UniqueConstraint(fields=('blog', 'related'), name='unique_related_blog'),
+        ),
+    ]
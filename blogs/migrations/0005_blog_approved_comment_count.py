@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_approved_comments(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    BlogComment = apps.get_model('blogs', 'BlogComment')
+    approved = (
+        BlogComment.objects.filter(blog=OuterRef('pk'), approved=True)
+        .order_by()
+        .values('blog')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    Blog.objects.update(approved_comment_count=Coalesce(Subquery(approved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0004_relatedblog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='approved_comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_approved_comments, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(fields=['blog', 'approved', '-created_at'], name='blogcomment_approved_idx'),
+        ),
+    ]
@@ -42,6 +42,15 @@ class BlogTag(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+def calculate_reading_time(content, words_per_minute=200):
+    """Calculate estimated reading time in minutes"""
+    word_count = len(content.split())
+    return max(1, round(word_count / words_per_minute))
+
+def make_excerpt(content):
+    """Get first 150 characters of content"""
+    return content[:150] + "..." if len(content) > 150 else content
+
 class Blog(models.Model):
     """Blog post model"""
     STATUS_CHOICES = [
@@ -72,6 +81,11 @@ class Blog(models.Model):
     meta_title = models.CharField(max_length=200, blank=True)
     meta_description = models.TextField(max_length=300, blank=True)
     
+    # Derived from content on save, so listings don't need to load it
+    reading_time = models.PositiveIntegerField(default=1, editable=False, help_text="Estimated reading time in minutes")
+    excerpt = models.CharField(max_length=153, blank=True, editable=False, help_text="First 150 characters of content")
+    approved_comment_count = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         ordering = ['-published_date', '-created_at']
         verbose_name = "Blog Post"
@@ -90,20 +104,16 @@ class Blog(models.Model):
         if not self.meta_description:
             self.meta_description = self.summary[:300]
         
+        # Skip when content was deferred and so can't have changed
+        if 'content' not in self.get_deferred_fields():
+            self.reading_time = calculate_reading_time(self.content)
+            self.excerpt = make_excerpt(self.content)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'reading_time', 'excerpt'}
+        
         super().save(*args, **kwargs)
     
-    @property
-    def reading_time(self):
-        """Calculate estimated reading time in minutes"""
-        words_per_minute = 200
-        word_count = len(self.content.split())
-        return max(1, round(word_count / words_per_minute))
-    
-    @property
-    def excerpt(self):
-        """Get first 150 characters of content"""
-        return self.content[:150] + "..." if len(self.content) > 150 else self.content
-    
     def get_absolute_url(self):
         return reverse('blog-detail', kwargs={'slug': self.slug})
 
@@ -118,6 +128,34 @@ class BlogComment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Approved comments of a post, newest first (comment list cursor)
+            models.Index(fields=['blog', 'approved', '-created_at'], name='blogcomment_approved_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Comment by {self.author_name} on {self.blog.title}"
+
+class RelatedBlog(models.Model):
+    """
+    Precomputed "related posts" entry (see recommendations.py).
+
+    The (blog, rank) index lets the related-posts endpoint read a post's
+    recommendations in order with one index range scan.
+    """
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='recommended_in')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['blog', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'related'], name='unique_related_blog'),
+        ]
+        indexes = [
+            models.Index(fields=['blog', 'rank'], name='related_blog_rank_idx'),
+        ]
     
     def __str__(self):
-        return f"Comment by {self.author_name} on {self.blog.title}"
\ No newline at end of file
+        return f"{self.related_id} related to {self.blog_id} (#{self.rank})"
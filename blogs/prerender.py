@@ -0,0 +1,134 @@
+"""
+Pre-rendered blog detail documents.
+
+The detail JSON of a published post is rendered once, when the post is
+published or updated (see signals.py), and stored in the cache under its
+slug. ``BlogDetailView`` serves those bytes as is and only falls back to the
+ORM and serializer on a miss, storing the result for the next reader.
+
+Every re-render or removal also purges the post's ``blog-<slug>`` surrogate
+key, so a CDN in front of the API drops its copies (ecommerce/surrogate.py).
+
+When ``BLOG_PRERENDER_DIR`` is set the JSON is also written there as
+``<slug>.json``, next to a ``<slug>.html`` page with the SEO metadata, so a
+web server or CDN can serve both without reaching Django.
+
+Media URLs are made absolute with ``BLOG_PUBLIC_BASE_URL``, since there is no
+request to build them from at render time. Without it posts are not
+pre-rendered: the detail view renders them on a miss and builds the URLs
+from that request instead. The HTML page links to ``BLOG_PAGE_URL`` as its
+canonical URL.
+"""
+
+import os
+from functools import partial
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from rest_framework.renderers import JSONRenderer
+
+from ecommerce import surrogate
+from .models import Blog
+from .serializers import BlogDetailSerializer
+
+MEDIA_FIELDS = ('thumbnail', 'hero_image')
+
+
+def cache_key(slug):
+    return f'blogs:detail:{slug}'
+
+
+def detail_queryset():
+    return Blog.objects.filter(status='published').select_related('author', 'category').prefetch_related('tags')
+
+
+def render_detail(blog, request=None):
+    """
+    Render the detail JSON of a post to bytes. Media URLs are joined to
+    ``BLOG_PUBLIC_BASE_URL``, or to the origin of ``request`` when it is unset.
+    """
+    base_url = settings.BLOG_PUBLIC_BASE_URL or request.build_absolute_uri('/')
+    data = BlogDetailSerializer(blog).data
+    for field in MEDIA_FIELDS:
+        if data.get(field):
+            data[field] = urljoin(base_url, data[field])
+    return JSONRenderer().render(data)
+
+
+def _write_files(blog, content):
+    directory = settings.BLOG_PRERENDER_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    html = render_to_string('blogs/seo.html', {
+        'blog': blog,
+        'canonical_url': settings.BLOG_PAGE_URL.format(slug=blog.slug) if settings.BLOG_PAGE_URL else '',
+        'thumbnail_url': (
+            urljoin(settings.BLOG_PUBLIC_BASE_URL, blog.thumbnail.url) if blog.thumbnail else ''
+        ),
+    })
+    for extension, payload in (('json', content), ('html', html.encode())):
+        path = os.path.join(directory, f'{blog.slug}.{extension}')
+        # Write then rename, so a reader never sees a half-written file
+        with open(f'{path}.tmp', 'wb') as handle:
+            handle.write(payload)
+        os.replace(f'{path}.tmp', path)
+
+
+def _remove_files(slug):
+    for extension in ('json', 'html'):
+        try:
+            os.remove(os.path.join(settings.BLOG_PRERENDER_DIR, f'{slug}.{extension}'))
+        except FileNotFoundError:
+            pass
+
+
+def prerender_blog(blog_id):
+    """
+    Render and store the detail document of a post, or drop it when the
+    post is not (or no longer) published. Returns the bytes or None.
+
+    Without ``BLOG_PUBLIC_BASE_URL`` the stored document is only dropped, so
+    the next reader renders it with absolute URLs from their request.
+    """
+    blog = detail_queryset().filter(pk=blog_id).first()
+    if blog is None:
+        slug = Blog.objects.filter(pk=blog_id).values_list('slug', flat=True).first()
+        if slug:
+            invalidate(slug)
+        return None
+    if not settings.BLOG_PUBLIC_BASE_URL:
+        invalidate(blog.slug)
+        return None
+
+    content = render_detail(blog)
+    cache.set(cache_key(blog.slug), content, settings.BLOG_DETAIL_CACHE_TTL)
+    if settings.BLOG_PRERENDER_DIR:
+        _write_files(blog, content)
+    surrogate.purge([surrogate.blog_key(blog.slug)])
+    return content
+
+
+def invalidate(slug):
+    """Drop the stored detail document of a slug."""
+    cache.delete(cache_key(slug))
+    if settings.BLOG_PRERENDER_DIR:
+        _remove_files(slug)
+    surrogate.purge([surrogate.blog_key(slug)])
+
+
+def schedule_prerender(blog_ids):
+    """Re-render the given posts once the current transaction commits."""
+    for blog_id in set(blog_ids):
+        transaction.on_commit(partial(prerender_blog, blog_id))
+
+
+def prerender_all():
+    """Re-render every published post. Returns the number rendered."""
+    count = 0
+    for blog_id in Blog.objects.filter(status='published').values_list('pk', flat=True).iterator():
+        if prerender_blog(blog_id) is not None:
+            count += 1
+    return count
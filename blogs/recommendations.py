@@ -0,0 +1,131 @@
+"""
+Precomputed related-post recommendations.
+
+Every published post is scored against every other one and the best
+``RELATED_BLOGS_PER_POST`` are stored in ``RelatedBlog``. The score blends:
+
+- text similarity: cosine of TF-IDF vectors over title, summary and content,
+- tag overlap: Jaccard index of the two posts' tag sets,
+- category: 1 when both posts share a category.
+
+All pairs are scored at once with NumPy matrix products. The whole table is
+rebuilt when a post is published (via a Celery task) and nightly by the beat
+schedule, so the related-posts endpoint only has to read it.
+"""
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Blog, RelatedBlog
+
+TEXT_WEIGHT = 0.5
+TAG_WEIGHT = 0.35
+CATEGORY_WEIGHT = 0.15
+
+# Vocabulary cap, bounds the TF-IDF matrix at (posts x MAX_FEATURES)
+MAX_FEATURES = 5000
+
+STOP_WORDS = frozenset("""
+    about after again also and are because been before being but can could did does doing down each for from
+    further had has have having her here hers him his how into its just more most not now off once only other
+    our ours out over own same she should some such than that the their theirs them then there these they this
+    those through too under until very was were what when where which while who whom why will with would you
+    your yours
+""".split())
+
+
+def _tokens(text):
+    return [word for word in re.findall(r'[a-z]{3,}', text.lower()) if word not in STOP_WORDS]
+
+
+def tfidf_matrix(documents):
+    """
+    Return the L2-normalised TF-IDF matrix (documents x terms) of a list of
+    strings, using sublinear term frequencies and smoothed IDF.
+    """
+    counts = [Counter(_tokens(document)) for document in documents]
+
+    document_frequency = Counter()
+    for count in counts:
+        document_frequency.update(count.keys())
+    # Terms found in a single post can't relate two posts
+    vocabulary = [term for term, df in document_frequency.most_common(MAX_FEATURES) if df > 1]
+    columns = {term: column for column, term in enumerate(vocabulary)}
+
+    matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    for row, count in enumerate(counts):
+        for term, n in count.items():
+            column = columns.get(term)
+            if column is not None:
+                matrix[row, column] = 1 + math.log(n)
+
+    df = np.array([document_frequency[term] for term in vocabulary], dtype=np.float32)
+    matrix *= np.log((1 + len(documents)) / (1 + df)) + 1
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def score_matrix(blogs):
+    """Pairwise relatedness scores of the given posts (diagonal set to -inf)."""
+    n = len(blogs)
+
+    vectors = tfidf_matrix([f'{blog.title} {blog.summary} {blog.content}' for blog in blogs])
+    text = vectors @ vectors.T
+
+    tag_ids = sorted({tag.pk for blog in blogs for tag in blog.tags.all()})
+    tag_columns = {tag_id: column for column, tag_id in enumerate(tag_ids)}
+    tags = np.zeros((n, len(tag_ids)), dtype=np.float32)
+    for row, blog in enumerate(blogs):
+        for tag in blog.tags.all():
+            tags[row, tag_columns[tag.pk]] = 1
+    shared = tags @ tags.T
+    tag_counts = tags.sum(axis=1)
+    union = tag_counts[:, None] + tag_counts[None, :] - shared
+    jaccard = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+    categories = np.array([blog.category_id or 0 for blog in blogs])
+    same_category = (categories[:, None] == categories[None, :]) & (categories[:, None] != 0)
+
+    scores = TEXT_WEIGHT * text + TAG_WEIGHT * jaccard + CATEGORY_WEIGHT * same_category
+    np.fill_diagonal(scores, -np.inf)
+    return scores
+
+
+def rebuild_related_blogs():
+    """Recompute the related posts of every published post. Returns the row count."""
+    blogs = list(
+        Blog.objects.filter(status='published')
+        .only('id', 'title', 'summary', 'content', 'category')
+        .prefetch_related('tags')
+        .order_by('pk')
+    )
+    per_post = settings.RELATED_BLOGS_PER_POST
+
+    entries = []
+    if len(blogs) > 1:
+        scores = score_matrix(blogs)
+        k = min(per_post, len(blogs) - 1)
+        # Top k per row without a full sort, then order those k
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for row, columns in enumerate(top):
+            columns = columns[np.argsort(-scores[row, columns], kind='stable')]
+            rank = 0
+            for column in columns:
+                score = float(scores[row, column])
+                if score <= 0:
+                    break
+                rank += 1
+                entries.append(RelatedBlog(blog=blogs[row], related=blogs[column], rank=rank, score=score))
+
+    with transaction.atomic():
+        RelatedBlog.objects.all().delete()
+        RelatedBlog.objects.bulk_create(entries, batch_size=1000)
+
+    return len(entries)
@@ -0,0 +1,225 @@
+"""
+Full-text search over blog posts.
+
+Each post has one row in a search index table holding its title, summary,
+content and tag names. The row is rewritten whenever the post or its tags
+change (see signals.py) and the whole table can be rebuilt with the
+``rebuild_blog_search_index`` command.
+
+- SQLite: an FTS5 virtual table (``blogs_blog_fts``), ranked with bm25()
+  and highlighted with snippet().
+- PostgreSQL: a weighted tsvector per post (``blogs_blog_search``) behind a
+  GIN index, ranked with ts_rank_cd() and highlighted with ts_headline().
+
+Other databases fall back to the old ``icontains`` filter without ranking or
+snippets.
+
+Snippets are HTML: the post text is escaped and only the <mark> tags around
+matched terms are markup.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+FTS_TABLE = 'blogs_blog_fts'
+TSVECTOR_TABLE = 'blogs_blog_search'
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Private-use characters the database wraps matches in; they become the
+# highlight tags once the rest of the snippet has been escaped
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+# bm25() weights for (blog_id, title, summary, content, tags)
+FTS_WEIGHTS = '0.0, 10.0, 4.0, 1.0, 6.0'
+
+
+def backend():
+    """Return 'sqlite' or 'postgresql' if the database has a search index, else None."""
+    if connection.vendor in ('sqlite', 'postgresql'):
+        return connection.vendor
+    return None
+
+
+def _fts_query(text):
+    """
+    Turn user input into an FTS5 query: every word quoted (so operators and
+    punctuation in the input can't break the syntax) and all of them required.
+    """
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def _tag_names(blog):
+    # .all() so a prefetched tag list is reused
+    return ' '.join(tag.name for tag in blog.tags.all())
+
+
+def index_blog(blog):
+    """Write (or rewrite) the search index row of a blog post."""
+    vendor = backend()
+    if vendor is None:
+        return
+
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE blog_id = %s', [blog.pk.hex])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (blog_id, title, summary, content, tags) VALUES (%s, %s, %s, %s, %s)',
+                [blog.pk.hex, blog.title, blog.summary, blog.content, _tag_names(blog)]
+            )
+        else:
+            cursor.execute(
+                f"""
+                INSERT INTO {TSVECTOR_TABLE} (blog_id, document)
+                VALUES (
+                    %s,
+                    setweight(to_tsvector('english', %s), 'A') ||
+                    setweight(to_tsvector('english', %s), 'B') ||
+                    setweight(to_tsvector('english', %s), 'B') ||
+                    setweight(to_tsvector('english', %s), 'C')
+                )
+                ON CONFLICT (blog_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                [blog.pk, blog.title, _tag_names(blog), blog.summary, blog.content]
+            )
+
+
+def unindex_blog(blog_id):
+    """Remove a blog post from the search index."""
+    vendor = backend()
+    if vendor is None:
+        return
+
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE blog_id = %s', [blog_id.hex])
+        else:
+            cursor.execute(f'DELETE FROM {TSVECTOR_TABLE} WHERE blog_id = %s', [blog_id])
+
+
+def rebuild_index():
+    """Rebuild the whole search index from the blogs table. Returns the row count."""
+    from .models import Blog
+
+    vendor = backend()
+    if vendor is None:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE if vendor == "sqlite" else TSVECTOR_TABLE}')
+
+    count = 0
+    for blog in Blog.objects.prefetch_related('tags').iterator(chunk_size=200):
+        index_blog(blog)
+        count += 1
+    return count
+
+
+def search_blogs(queryset, text):
+    """
+    Restrict a Blog queryset to posts matching ``text``, best matches first.
+
+    The match and the rank come from the index in the same query, joined to
+    the blogs table, so the queryset can still be filtered and paginated.
+    """
+    vendor = backend()
+
+    if vendor == 'sqlite':
+        query = _fts_query(text)
+        if not query:
+            return queryset.none()
+        matches = RawSQL(f'SELECT blog_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [query])
+        # bm25() is lower for better matches
+        rank = RawSQL(
+            f'SELECT bm25({FTS_TABLE}, {FTS_WEIGHTS}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.blog_id = blogs_blog.id',
+            [query],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('search_rank', '-published_date')
+
+    if vendor == 'postgresql':
+        if not text.strip():
+            return queryset.none()
+        matches = RawSQL(
+            f"SELECT blog_id FROM {TSVECTOR_TABLE} WHERE document @@ websearch_to_tsquery('english', %s)",
+            [text],
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank_cd(document, websearch_to_tsquery('english', %s)) FROM {TSVECTOR_TABLE} "
+            f'WHERE {TSVECTOR_TABLE}.blog_id = blogs_blog.id',
+            [text],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('-search_rank', '-published_date')
+
+    return queryset.filter(
+        Q(title__icontains=text) |
+        Q(summary__icontains=text) |
+        Q(content__icontains=text) |
+        Q(tags__name__icontains=text)
+    ).distinct()
+
+
+def _highlight(snippet):
+    """Escape a snippet from the database and turn its match markers into tags."""
+    return str(escape(snippet)).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+
+
+def attach_snippets(blogs, text):
+    """
+    Set ``search_snippet`` on each blog of a result page: a short excerpt
+    of escaped text with the matched terms wrapped in <mark> tags. Only the given posts are
+    highlighted, so call this after pagination.
+    """
+    vendor = backend()
+    ids = [blog.pk for blog in blogs]
+    if vendor is None or not ids:
+        return blogs
+
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            query = _fts_query(text)
+            if not query:
+                return blogs
+            cursor.execute(
+                f"""
+                SELECT blog_id, snippet({FTS_TABLE}, -1, %s, %s, '…', 32)
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH %s AND blog_id IN ({placeholders})
+                """,
+                [MATCH_START, MATCH_END, query, *[pk.hex for pk in ids]]
+            )
+            snippets = {blog_id: snippet for blog_id, snippet in cursor.fetchall()}
+            for blog in blogs:
+                blog.search_snippet = _highlight(snippets.get(blog.pk.hex, ''))
+        else:
+            cursor.execute(
+                f"""
+                SELECT id, ts_headline(
+                    'english', summary || ' ' || content, websearch_to_tsquery('english', %s),
+                    %s
+                )
+                FROM blogs_blog
+                WHERE id IN ({placeholders})
+                """,
+                [
+                    text,
+                    f'StartSel={MATCH_START}, StopSel={MATCH_END}, '
+                    'MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" … "',
+                    *ids,
+                ]
+            )
+            snippets = dict(cursor.fetchall())
+            for blog in blogs:
+                blog.search_snippet = _highlight(snippets.get(blog.pk, ''))
+
+    return blogs
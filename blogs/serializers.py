@@ -24,6 +24,8 @@ class BlogCommentSerializer(serializers.ModelSerializer):
         model = BlogComment
         fields = ['id', 'author_name', 'author_email', 'content', 'created_at', 'approved']
         read_only_fields = ['id', 'created_at', 'approved']
+        # Comments are listed publicly, so the email is accepted but never shown
+        extra_kwargs = {'author_email': {'write_only': True}}
 
 class BlogListSerializer(serializers.ModelSerializer):
     """Serializer for blog listing (shorter version)"""
@@ -32,13 +34,15 @@ class BlogListSerializer(serializers.ModelSerializer):
     tags = BlogTagSerializer(many=True, read_only=True)
     reading_time = serializers.ReadOnlyField()
     excerpt = serializers.ReadOnlyField()
+    # Only present on search results: matched text wrapped in <mark> tags
+    search_snippet = serializers.CharField(read_only=True)
     
     class Meta:
         model = Blog
         fields = [
             'id', 'title', 'slug', 'summary', 'thumbnail', 'author', 
             'category', 'tags', 'published_date', 'created_at', 
-            'reading_time', 'excerpt', 'featured'
+            'reading_time', 'excerpt', 'featured', 'search_snippet'
         ]
         read_only_fields = ['id', 'slug', 'created_at', 'published_date']
 
@@ -48,7 +52,7 @@ class BlogDetailSerializer(serializers.ModelSerializer):
     category = BlogCategorySerializer(read_only=True)
     tags = BlogTagSerializer(many=True, read_only=True)
     reading_time = serializers.ReadOnlyField()
-    comments = BlogCommentSerializer(many=True, read_only=True)
+    approved_comment_count = serializers.ReadOnlyField()
     
     class Meta:
         model = Blog
@@ -56,7 +60,7 @@ class BlogDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'summary', 'content', 'thumbnail', 
             'hero_image', 'author', 'category', 'tags', 'status', 
             'featured', 'published_date', 'created_at', 'updated_at',
-            'reading_time', 'meta_title', 'meta_description', 'comments'
+            'reading_time', 'meta_title', 'meta_description', 'approved_comment_count'
         ]
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at', 'published_date']
 
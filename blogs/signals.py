@@ -0,0 +1,132 @@
+"""
+Keep the blog full-text search index (search.py), the pre-rendered detail
+documents (prerender.py) and CDN copies (ecommerce/surrogate.py) in step with
+posts, tags and categories, recompute related posts (recommendations.py) when
+a post is published, and maintain the approved comment counts (comments.py).
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from ecommerce import surrogate
+from .comments import adjust_approved_comment_count
+from .models import Blog, BlogCategory, BlogComment, BlogTag
+from . import prerender, search
+
+
+@receiver(post_init, sender=Blog)
+def remember_loaded_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not loaded
+    instance._loaded_status = instance.__dict__.get('status')
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Blog)
+def refresh_blog_on_save(sender, instance, created, raw=False, **kwargs):
+    search.index_blog(instance)
+
+    if instance._loaded_slug and instance._loaded_slug != instance.slug:
+        prerender.invalidate(instance._loaded_slug)
+    if not raw:
+        prerender.schedule_prerender([instance.pk])
+
+    was_published = not created and instance._loaded_status == 'published'
+    is_published = instance.status == 'published'
+    if was_published != is_published:
+        # The post enters or leaves the blog listings
+        surrogate.purge([surrogate.BLOGS])
+    if is_published and not was_published and not raw:
+        from .tasks import schedule_related_refresh
+
+        # After commit, so the task sees the post and its tags
+        transaction.on_commit(schedule_related_refresh)
+
+    instance._loaded_status = instance.status
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_delete, sender=Blog)
+def unindex_blog_on_delete(sender, instance, **kwargs):
+    search.unindex_blog(instance.pk)
+    prerender.invalidate(instance.slug)
+    if instance.status == 'published':
+        surrogate.purge([surrogate.BLOGS])
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def index_blog_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        search.index_blog(instance)
+        prerender.schedule_prerender([instance.pk])
+    elif pk_set:
+        # tag.blogs.add(...) / remove(...)
+        for blog in Blog.objects.filter(pk__in=pk_set):
+            search.index_blog(blog)
+        prerender.schedule_prerender(pk_set)
+
+
+@receiver(post_save, sender=BlogTag)
+def index_blogs_on_tag_rename(sender, instance, created, **kwargs):
+    surrogate.purge([surrogate.blog_tag_key(instance.slug)] + ([surrogate.BLOG_TAGS] if created else []))
+    if not created:
+        blogs = list(instance.blogs.all())
+        for blog in blogs:
+            search.index_blog(blog)
+        prerender.schedule_prerender([blog.pk for blog in blogs])
+
+
+@receiver(pre_delete, sender=BlogTag)
+def remember_tagged_blogs(sender, instance, **kwargs):
+    # The tag's m2m rows are gone by post_delete, and no m2m_changed is sent
+    instance._search_blog_ids = list(instance.blogs.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogTag)
+def index_blogs_on_tag_delete(sender, instance, **kwargs):
+    surrogate.purge([surrogate.blog_tag_key(instance.slug), surrogate.BLOG_TAGS])
+    blog_ids = getattr(instance, '_search_blog_ids', [])
+    for blog in Blog.objects.filter(pk__in=blog_ids):
+        search.index_blog(blog)
+    prerender.schedule_prerender(blog_ids)
+
+
+@receiver(post_save, sender=BlogCategory)
+def prerender_blogs_on_category_change(sender, instance, created, **kwargs):
+    surrogate.purge(
+        [surrogate.blog_category_key(instance.slug)] + ([surrogate.BLOG_CATEGORIES] if created else [])
+    )
+    if not created:
+        prerender.schedule_prerender(instance.blogs.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=BlogCategory)
+def prerender_blogs_on_category_delete(sender, instance, **kwargs):
+    surrogate.purge([surrogate.blog_category_key(instance.slug), surrogate.BLOG_CATEGORIES])
+    # Posts are detached with a bulk SET_NULL, re-render them once that commits
+    prerender.schedule_prerender(instance.blogs.values_list('pk', flat=True))
+
+
+@receiver(post_init, sender=BlogComment)
+def remember_loaded_approval(sender, instance, **kwargs):
+    instance._loaded_approved = instance.__dict__.get('approved')
+
+
+@receiver(post_save, sender=BlogComment)
+def count_comment_on_save(sender, instance, created, **kwargs):
+    if created:
+        delta = 1 if instance.approved else 0
+    else:
+        delta = int(bool(instance.approved)) - int(bool(instance._loaded_approved))
+    if delta:
+        adjust_approved_comment_count(instance.blog_id, delta)
+    instance._loaded_approved = instance.approved
+
+
+@receiver(post_delete, sender=BlogComment)
+def count_comment_on_delete(sender, instance, **kwargs):
+    if instance._loaded_approved:
+        adjust_approved_comment_count(instance.blog_id, -1)
@@ -0,0 +1,26 @@
+import logging
+
+from celery import shared_task
+
+from .recommendations import rebuild_related_blogs
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def refresh_related_blogs():
+    """Recompute the related-post recommendations of every published post"""
+    count = rebuild_related_blogs()
+    return f'Stored {count} related-post entries'
+
+
+def schedule_related_refresh():
+    """
+    Queue refresh_related_blogs without retrying the broker connection. When
+    the broker is down the error is logged and the nightly beat run catches
+    up, so the save that asked for it still succeeds.
+    """
+    try:
+        refresh_related_blogs.apply_async(retry=False)
+    except Exception:
+        logger.exception('Could not queue the related-posts refresh')
@@ -1,3 +1,498 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.sites import AdminSite
+from django.core.cache import cache
+from django.core.management import call_command
+from kombu.exceptions import OperationalError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ecommerce import surrogate
+from products.models import Category, Product
+from users.models import User
+from . import prerender, search
+from .admin import BlogCommentAdmin
+from .models import Blog, BlogCategory, BlogComment, BlogTag, RelatedBlog
+from .recommendations import rebuild_related_blogs
+
+
+class BlogSearchTests(TestCase):
+    """Full-text search on the blog list endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='writer@example.com', name='Writer', password='password')
+        self.url = reverse('blogs:blog-list')
+
+        self.turmeric = self._blog(
+            'Turmeric milk for winter',
+            'A warm drink',
+            'Golden turmeric milk is simmered with pepper and jaggery. ' * 20,
+        )
+        self.jaggery = self._blog(
+            'Why we switched to jaggery',
+            'Cane sugar alternatives',
+            'Jaggery keeps its minerals. Some recipes also add a pinch of turmeric. ' * 20,
+        )
+        self.millets = self._blog('Cooking with millets', 'Grains', 'Foxtail and kodo millets. ' * 20)
+
+    def _blog(self, title, summary, content, status='published'):
+        return Blog.objects.create(
+            title=title, summary=summary, content=content, author=self.author,
+            status=status, published_date=timezone.now()
+        )
+
+    def _search(self, text):
+        response = self.client.get(self.url, {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_results_are_ranked_and_highlighted(self):
+        results = self._search('turmeric')
+
+        # Title matches outrank a passing mention in the content
+        self.assertEqual([r['slug'] for r in results], [self.turmeric.slug, self.jaggery.slug])
+        self.assertIn('<mark>', results[0]['search_snippet'])
+        self.assertIn('turmeric', results[0]['search_snippet'].lower())
+
+    def test_snippets_escape_post_text(self):
+        self._blog('Markup', 'Raw HTML', 'Ginger <script>alert(1)</script> & honey <b>tea</b>.')
+
+        snippet = self._search('ginger')[0]['search_snippet']
+        self.assertEqual(
+            snippet, '<mark>Ginger</mark> &lt;script&gt;alert(1)&lt;/script&gt; &amp; honey &lt;b&gt;tea&lt;/b&gt;.'
+        )
+
+    def test_stemming_and_punctuation(self):
+        self.assertEqual([r['slug'] for r in self._search('cook')], [self.millets.slug])
+        # FTS operators and quotes in the input are treated as plain words
+        self.assertEqual([r['slug'] for r in self._search('"kodo" millets* (')], [self.millets.slug])
+        self.assertEqual(self._search('!!!'), [])
+
+    def test_index_follows_edits_tags_and_deletes(self):
+        tag = BlogTag.objects.create(name='Ayurveda')
+        self.millets.tags.add(tag)
+        self.assertEqual([r['slug'] for r in self._search('ayurveda')], [self.millets.slug])
+
+        tag.name = 'Siddha'
+        tag.save()
+        self.assertEqual(self._search('ayurveda'), [])
+        self.assertEqual([r['slug'] for r in self._search('siddha')], [self.millets.slug])
+
+        tag.delete()
+        self.assertEqual(self._search('siddha'), [])
+
+        self.millets.title = 'Cooking with ragi'
+        self.millets.save()
+        self.assertEqual([r['slug'] for r in self._search('ragi')], [self.millets.slug])
+
+        self.millets.delete()
+        self.assertEqual(self._search('ragi'), [])
+
+    def test_drafts_and_filters_still_apply(self):
+        self._blog('Turmeric draft', 'Not yet', 'turmeric', status='draft')
+        tag = BlogTag.objects.create(name='Drinks')
+        self.turmeric.tags.add(tag)
+
+        self.assertEqual(len(self._search('turmeric')), 2)
+        response = self.client.get(self.url, {'search': 'turmeric', 'tag': tag.slug})
+        self.assertEqual([r['slug'] for r in response.data['results']], [self.turmeric.slug])
+
+        # No snippet key outside of search
+        response = self.client.get(self.url)
+        self.assertNotIn('search_snippet', response.data['results'][0])
+
+    def test_rebuild_index(self):
+        self.assertEqual(search.rebuild_index(), 3)
+        self.assertEqual(len(self._search('turmeric')), 2)
+
+
+class BlogReadingStatsTests(TestCase):
+    """Stored reading time and excerpt, and listings that skip the content column."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='writer@example.com', name='Writer', password='password')
+        self.blog = Blog.objects.create(
+            title='Cold pressed oils', summary='Why we press slowly', content='word ' * 450,
+            author=self.author, status='published', featured=True, published_date=timezone.now()
+        )
+
+    def test_computed_on_save(self):
+        self.assertEqual(self.blog.reading_time, 2)
+        self.assertEqual(self.blog.excerpt, ('word ' * 30) + '...')
+
+        self.blog.content = 'Short post'
+        self.blog.save(update_fields=['content'])
+        self.blog.refresh_from_db()
+        self.assertEqual((self.blog.reading_time, self.blog.excerpt), (1, 'Short post'))
+
+    def test_backfill_command(self):
+        Blog.objects.filter(pk=self.blog.pk).update(reading_time=1, excerpt='')
+        call_command('backfill_blog_reading_stats', stdout=StringIO())
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.reading_time, 2)
+
+    def test_listings_do_not_load_content(self):
+        Blog.objects.create(
+            title='More on oils', summary='Sesame', content='Sesame oil',
+            author=self.author, status='published', published_date=timezone.now()
+        )
+
+        for url in (reverse('blogs:blog-list'), reverse('blogs:featured-blogs'),
+                    reverse('blogs:related-blogs', args=[self.blog.slug])):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse([q['sql'] for q in queries if '"blogs_blog"."content"' in q['sql']], url)
+
+        response = self.client.get(reverse('blogs:blog-list'))
+        listed = {r['slug']: r for r in response.data['results']}
+        self.assertEqual(listed[self.blog.slug]['reading_time'], 2)
+        self.assertEqual(listed['more-on-oils']['excerpt'], 'Sesame oil')
+
+
+class RelatedBlogsTests(TestCase):
+    """Precomputed related posts and the related-posts endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='writer@example.com', name='Writer', password='password')
+        self.remedies = BlogCategory.objects.create(name='Home remedies')
+        self.spices = BlogTag.objects.create(name='Spices')
+
+        self.turmeric = self._blog('Turmeric milk', 'Golden milk with turmeric and pepper for colds.', self.remedies)
+        self.paste = self._blog('Turmeric paste', 'Fresh turmeric root ground with pepper.', self.remedies)
+        self.millets = self._blog('Millet porridge', 'Kodo millet cooked slowly for breakfast.', None, tag=False)
+        self.unrelated = self._blog('Farm visit', 'Directions to the farm and visiting hours.', None, tag=False)
+
+    def _blog(self, title, content, category, tag=True, status='published'):
+        blog = Blog.objects.create(
+            title=title, summary=title, content=content, author=self.author, category=category,
+            status=status, published_date=timezone.now()
+        )
+        if tag:
+            blog.tags.add(self.spices)
+        return blog
+
+    def test_scores_tags_category_and_text(self):
+        self.assertGreater(rebuild_related_blogs(), 0)
+
+        entries = list(RelatedBlog.objects.filter(blog=self.turmeric))
+        self.assertEqual(entries[0].related, self.paste)
+        self.assertEqual(entries[0].rank, 1)
+        # No shared words, tags or category: not recommended at all
+        self.assertFalse(RelatedBlog.objects.filter(blog=self.millets, related=self.unrelated).exists())
+
+    def test_endpoint_reads_precomputed_entries(self):
+        draft = self._blog('Turmeric tea draft', 'Turmeric tea with pepper.', self.remedies, status='draft')
+        rebuild_related_blogs()
+        self.assertFalse(RelatedBlog.objects.filter(related=draft).exists())
+
+        url = reverse('blogs:related-blogs', args=[self.turmeric.slug])
+        # The lookup, then the tags prefetch
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['slug'], self.paste.slug)
+
+        response = self.client.get(reverse('blogs:related-blogs', args=['no-such-post']))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('blogs:related-blogs', args=[draft.slug]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_publishing_schedules_a_refresh(self):
+        with mock.patch('blogs.tasks.refresh_related_blogs.apply_async') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                draft = self._blog('Neem', 'Neem leaves.', None, status='draft')
+            delay.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                draft.status = 'published'
+                draft.save()
+                draft.save()
+            delay.assert_called_once_with(retry=False)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self._blog('Tulsi', 'Tulsi leaves.', None)
+            self.assertEqual(delay.call_count, 2)
+
+    def test_publishing_survives_a_broker_outage(self):
+        outage = mock.patch(
+            'blogs.tasks.refresh_related_blogs.apply_async', side_effect=OperationalError('broker unreachable')
+        )
+        with outage, self.assertLogs('blogs.tasks', level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                blog = self._blog('Neem', 'Neem leaves.', None)
+        self.assertTrue(Blog.objects.filter(pk=blog.pk, status='published').exists())
+
+
+class BlogCommentTests(TestCase):
+    """Paginated approved comments and the denormalized approved count."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='writer@example.com', name='Writer', password='password')
+        self.blog = Blog.objects.create(
+            title='Seed saving', summary='Keep your seeds', content='Dry them well.',
+            author=self.author, status='published', published_date=timezone.now()
+        )
+        self.url = reverse('blogs:blog-comments', args=[self.blog.slug])
+
+    def _comment(self, approved, n=1):
+        return [
+            BlogComment.objects.create(
+                blog=self.blog, author_name=f'Reader {i}', author_email='reader@example.com',
+                content='Thanks!', approved=approved
+            )
+            for i in range(n)
+        ]
+
+    def _count(self):
+        self.blog.refresh_from_db()
+        return self.blog.approved_comment_count
+
+    def test_count_follows_creation_edits_and_deletes(self):
+        response = self.client.post(self.url, {
+            'author_name': 'Reader', 'author_email': 'reader@example.com', 'content': 'Lovely'
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('author_email', response.data)
+        self.assertEqual(self._count(), 0)
+
+        approved, = self._comment(approved=True)
+        self.assertEqual(self._count(), 1)
+
+        approved.approved = False
+        approved.save()
+        self.assertEqual(self._count(), 0)
+
+        approved.approved = True
+        approved.save()
+        approved.delete()
+        self.assertEqual(self._count(), 0)
+
+    def test_admin_actions_recount(self):
+        self._comment(approved=False, n=3)
+        admin = BlogCommentAdmin(BlogComment, AdminSite())
+        admin.message_user = mock.Mock()
+
+        admin.approve_comments(None, BlogComment.objects.all())
+        self.assertEqual(self._count(), 3)
+        admin.disapprove_comments(None, BlogComment.objects.filter(author_name='Reader 0'))
+        self.assertEqual(self._count(), 2)
+
+    def test_list_is_cursor_paginated_and_approved_only(self):
+        self._comment(approved=True, n=25)
+        self._comment(approved=False, n=2)
+
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(reverse('blogs:blog-detail', args=[self.blog.slug]))
+        self.assertEqual(response.json()['approved_comment_count'], 25)
+        self.assertNotIn('comments', response.json())
+
+
+@override_settings(BLOG_PUBLIC_BASE_URL='https://api.example.com')
+class BlogPrerenderTests(TestCase):
+    """Pre-rendered detail documents and the cached detail endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Publishing queues the related-posts refresh; keep Celery out of it
+        delay = mock.patch('blogs.tasks.refresh_related_blogs.apply_async')
+        delay.start()
+        self.addCleanup(delay.stop)
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='writer@example.com', name='Writer', password='password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog = Blog.objects.create(
+                title='Natural dyes', summary='Colours from the farm', content='Indigo and madder.',
+                author=self.author, status='published', published_date=timezone.now()
+            )
+        self.url = reverse('blogs:blog-detail', args=[self.blog.slug])
+
+    def test_published_post_is_served_without_queries(self):
+        self.assertIsNotNone(cache.get(prerender.cache_key(self.blog.slug)))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['title'], 'Natural dyes')
+
+    def test_miss_renders_live_and_caches(self):
+        cache.clear()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['slug'], self.blog.slug)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.assertEqual(self.client.get(reverse('blogs:blog-detail', args=['missing'])).status_code, 404)
+
+    def test_updates_rerender_and_unpublish_removes(self):
+        tag = BlogTag.objects.create(name='Colour')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.title = 'Natural dyes at home'
+            self.blog.save()
+            self.blog.tags.add(tag)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['title'], 'Natural dyes at home')
+        self.assertEqual([t['name'] for t in data['tags']], ['Colour'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogComment.objects.create(
+                blog=self.blog, author_name='Reader', author_email='reader@example.com',
+                content='Nice', approved=True
+            )
+        self.assertEqual(self.client.get(self.url).json()['approved_comment_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.status = 'draft'
+            self.blog.save()
+        self.assertIsNone(cache.get(prerender.cache_key(self.blog.slug)))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_media_urls_are_absolute(self):
+        Blog.objects.filter(pk=self.blog.pk).update(thumbnail='blogs/dyes.jpg')
+        prerender.prerender_blog(self.blog.pk)
+        self.assertEqual(self.client.get(self.url).json()['thumbnail'], 'https://api.example.com/media/blogs/dyes.jpg')
+
+        # Without a public origin nothing is pre-rendered; the miss uses the request's
+        with self.settings(BLOG_PUBLIC_BASE_URL=''):
+            self.assertIsNone(prerender.prerender_blog(self.blog.pk))
+            self.assertIsNone(cache.get(prerender.cache_key(self.blog.slug)))
+            response = self.client.get(self.url, HTTP_HOST='backend.pragathinaturalfarm.com')
+        self.assertEqual(response.json()['thumbnail'], 'http://backend.pragathinaturalfarm.com/media/blogs/dyes.jpg')
+
+    def test_static_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(BLOG_PRERENDER_DIR=directory, BLOG_PAGE_URL='https://example.com/blog/{slug}'):
+                self.assertEqual(prerender.prerender_all(), 1)
+                with open(os.path.join(directory, f'{self.blog.slug}.json')) as handle:
+                    self.assertEqual(json.load(handle)['title'], 'Natural dyes')
+                with open(os.path.join(directory, f'{self.blog.slug}.html')) as handle:
+                    self.assertIn('https://example.com/blog/natural-dyes', handle.read())
+
+                self.blog.delete()
+                self.assertFalse(os.path.exists(os.path.join(directory, f'{self.blog.slug}.json')))
+
+
+@override_settings(SURROGATE_PURGE_BACKEND='ecommerce.surrogate.LocalSurrogateCache')
+class SurrogateKeyTests(TestCase):
+    """Surrogate-Key tagging and targeted purges, through the local proxy stand-in."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Publishing queues the related-posts refresh; keep Celery out of it
+        delay = mock.patch('blogs.tasks.refresh_related_blogs.apply_async')
+        delay.start()
+        self.addCleanup(delay.stop)
+        self.proxy = surrogate.get_purger()
+        self.proxy.reset()
+
+        self.author = User.objects.create_user(email='writer@example.com', name='Writer', password='password')
+        self.tag = BlogTag.objects.create(name='Soil')
+        self.compost = self._publish('Composting basics')
+        self.mulch = self._publish('Mulching')
+
+    def _publish(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            blog = Blog.objects.create(
+                title=title, summary=title, content=title, author=self.author,
+                status='published', published_date=timezone.now()
+            )
+            blog.tags.add(self.tag)
+        return blog
+
+    def _detail(self, blog):
+        return reverse('blogs:blog-detail', args=[blog.slug])
+
+    def test_responses_carry_keys(self):
+        response = self.proxy.get(reverse('blogs:blog-list'))
+        keys = response[surrogate.HEADER].split()
+        self.assertEqual(keys[0], 'blogs')
+        self.assertIn('blog-composting-basics', keys)
+        self.assertIn('blog-tag-soil', keys)
+
+        self.assertEqual(self.proxy.get(self._detail(self.compost))[surrogate.HEADER], 'blog-composting-basics')
+
+        category = Category.objects.create(name='Seeds')
+        product = Product.objects.create(title='Okra seeds', description='Okra', price=50, stock=5, category=category)
+        response = self.proxy.get(reverse('product_detail', args=[product.pk]))
+        self.assertEqual(response[surrogate.HEADER], f'product-{product.pk} category-{category.pk}')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.category = None
+            product.save()
+        response = self.proxy.get(reverse('product_detail', args=[product.pk]))
+        self.assertEqual(response[surrogate.HEADER], f'product-{product.pk}')
+
+    def test_moving_a_product_purges_both_categories(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            seeds = Category.objects.create(name='Seeds')
+            tools = Category.objects.create(name='Tools')
+            product = Product.objects.create(title='Trowel', description='Steel', price=150, stock=5, category=seeds)
+        self.proxy.purged.clear()
+
+        product = Product.objects.get(pk=product.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.category = tools
+            product.save()
+        self.assertEqual(
+            set(self.proxy.purged[-1]), {f'product-{product.pk}', f'category-{seeds.pk}', f'category-{tools.pk}'}
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.stock = 4
+            product.save()
+        self.assertEqual(list(self.proxy.purged[-1]), [f'product-{product.pk}'])
+
+    def test_edit_purges_only_that_post(self):
+        list_url = reverse('blogs:blog-list')
+        for url in (list_url, self._detail(self.compost), self._detail(self.mulch)):
+            self.proxy.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.compost.title = 'Composting at home'
+            self.compost.save()
+        self.assertIn(['blog-composting-basics'], self.proxy.purged)
+
+        misses = self.proxy.misses
+        self.proxy.get(self._detail(self.mulch))
+        self.assertEqual(self.proxy.misses, misses)
+
+        self.assertEqual(self.proxy.get(self._detail(self.compost)).json()['title'], 'Composting at home')
+        self.assertEqual(self.proxy.misses, misses + 1)
+        self.proxy.get(list_url)
+        self.assertEqual(self.proxy.misses, misses + 2)
+
+    def test_publishing_and_tag_changes_purge_collections(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mulch.status = 'draft'
+            self.mulch.save()
+        self.assertIn('blogs', self.proxy.purged[-1])
+
+        self.proxy.purged.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = 'Healthy soil'
+            self.tag.save()
+        purged = {key for keys in self.proxy.purged for key in keys}
+        self.assertLessEqual({'blog-tag-soil', 'blog-composting-basics'}, purged)
+        self.assertNotIn('blogs', purged)
@@ -11,7 +11,7 @@ urlpatterns = [
     path('tags/', views.BlogTagListView.as_view(), name='tag-list'),
     path('<slug:slug>/', views.BlogDetailView.as_view(), name='blog-detail'),
     path('<slug:slug>/related/', views.related_blogs, name='related-blogs'),
-    path('<slug:slug>/comments/', views.BlogCommentCreateView.as_view(), name='blog-comments'),
+    path('<slug:slug>/comments/', views.BlogCommentListCreateView.as_view(), name='blog-comments'),
     
     # Admin blog endpoints
     path('admin/create/', views.BlogCreateView.as_view(), name='blog-create'),
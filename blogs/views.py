@@ -1,30 +1,41 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from ecommerce import surrogate
+from ecommerce.surrogate import SurrogateKeyMixin, add_surrogate_keys
+from . import prerender, search
 from .models import Blog, BlogCategory, BlogTag, BlogComment
 from .serializers import (
     BlogListSerializer, BlogDetailSerializer, BlogCreateUpdateSerializer,
     BlogCategorySerializer, BlogTagSerializer, BlogCommentSerializer
 )
 
-class BlogListView(generics.ListAPIView):
+def blog_surrogate_keys(blog):
+    """Surrogate keys of a listed blog: the post, its category and its tags"""
+    keys = [surrogate.blog_key(blog.slug)]
+    if blog.category:
+        keys.append(surrogate.blog_category_key(blog.category.slug))
+    keys.extend(surrogate.blog_tag_key(tag.slug) for tag in blog.tags.all())
+    return keys
+
+class BlogListView(SurrogateKeyMixin, generics.ListAPIView):
     """List all published blogs with filtering and search"""
     serializer_class = BlogListSerializer
     permission_classes = [permissions.AllowAny]
+    surrogate_collection_key = surrogate.BLOGS
+    
+    def object_surrogate_keys(self, obj):
+        return blog_surrogate_keys(obj)
     
     def get_queryset(self):
         queryset = Blog.objects.filter(status='published').select_related('author', 'category').prefetch_related('tags')
-        
-        # Search functionality
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(summary__icontains=search) |
-                Q(content__icontains=search)
-            )
+        # Listings use the stored reading_time / excerpt, not the full content
+        queryset = queryset.defer('content')
         
         # Category filter
         category = self.request.query_params.get('category', None)
@@ -41,16 +52,44 @@ class BlogListView(generics.ListAPIView):
         if featured and featured.lower() == 'true':
             queryset = queryset.filter(featured=True)
         
+        # Full-text search, ranked by relevance (see search.py)
+        text = self.request.query_params.get('search', None)
+        if text:
+            queryset = search.search_blogs(queryset, text)
+        
         return queryset
+    
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        text = self.request.query_params.get('search', None)
+        if text and page is not None:
+            # Highlight only the posts on this page
+            search.attach_snippets(page, text)
+        return page
 
-class BlogDetailView(generics.RetrieveAPIView):
-    """Get single blog detail"""
+class BlogDetailView(SurrogateKeyMixin, generics.RetrieveAPIView):
+    """Get single blog detail (served pre-rendered, see prerender.py)"""
     serializer_class = BlogDetailSerializer
+    # Public document, don't spend a user lookup on a bearer token
+    authentication_classes = []
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
     
     def get_queryset(self):
-        return Blog.objects.filter(status='published').select_related('author', 'category').prefetch_related('tags', 'comments')
+        return prerender.detail_queryset()
+    
+    def surrogate_keys(self):
+        # Tag and category changes re-render the document, which purges this key
+        return [surrogate.blog_key(self.kwargs['slug'])]
+    
+    def retrieve(self, request, *args, **kwargs):
+        key = prerender.cache_key(self.kwargs['slug'])
+        content = cache.get(key)
+        if content is None:
+            # Miss: render live and keep it for the next reader
+            content = prerender.render_detail(self.get_object(), request)
+            cache.set(key, content, settings.BLOG_DETAIL_CACHE_TTL)
+        return HttpResponse(content, content_type='application/json')
 
 class BlogCreateView(generics.CreateAPIView):
     """Create new blog (admin only)"""
@@ -77,22 +116,50 @@ class BlogDeleteView(generics.DestroyAPIView):
     def get_queryset(self):
         return Blog.objects.all()
 
-class BlogCategoryListView(generics.ListAPIView):
+class BlogCategoryListView(SurrogateKeyMixin, generics.ListAPIView):
     """List all blog categories"""
     serializer_class = BlogCategorySerializer
     permission_classes = [permissions.AllowAny]
     queryset = BlogCategory.objects.all()
+    surrogate_collection_key = surrogate.BLOG_CATEGORIES
+    
+    def object_surrogate_keys(self, obj):
+        return [surrogate.blog_category_key(obj.slug)]
 
-class BlogTagListView(generics.ListAPIView):
+class BlogTagListView(SurrogateKeyMixin, generics.ListAPIView):
     """List all blog tags"""
     serializer_class = BlogTagSerializer
     permission_classes = [permissions.AllowAny]
     queryset = BlogTag.objects.all()
+    surrogate_collection_key = surrogate.BLOG_TAGS
+    
+    def object_surrogate_keys(self, obj):
+        return [surrogate.blog_tag_key(obj.slug)]
+
+class BlogCommentCursorPagination(CursorPagination):
+    """Newest first; the cursor keeps deep pages as cheap as the first one"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
 
-class BlogCommentCreateView(generics.CreateAPIView):
-    """Create blog comment"""
+
+class BlogCommentListCreateView(SurrogateKeyMixin, generics.ListCreateAPIView):
+    """List approved comments of a blog, or create a comment"""
     serializer_class = BlogCommentSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = BlogCommentCursorPagination
+    # The cursor fixes the ordering, so no OrderingFilter / SearchFilter here
+    filter_backends = []
+    
+    def get_queryset(self):
+        return BlogComment.objects.filter(
+            blog__slug=self.kwargs.get('slug'),
+            blog__status='published',
+            approved=True
+        )
+    
+    def surrogate_keys(self):
+        # Approvals change the post's comment count, which purges this key
+        return [surrogate.blog_key(self.kwargs.get('slug'))]
     
     def perform_create(self, serializer):
         blog_slug = self.kwargs.get('slug')
@@ -102,37 +169,27 @@ class BlogCommentCreateView(generics.CreateAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def related_blogs(request, slug):
-    """Get related blogs based on category and tags"""
-    try:
-        blog = Blog.objects.get(slug=slug, status='published')
-        
-        # Get blogs from same category
-        category_blogs = Blog.objects.filter(
-            category=blog.category,
-            status='published'
-        ).exclude(id=blog.id)[:3]
-        
-        # If not enough category blogs, get blogs with same tags
-        if category_blogs.count() < 3:
-            tag_blogs = Blog.objects.filter(
-                tags__in=blog.tags.all(),
-                status='published'
-            ).exclude(id=blog.id).distinct()[:3]
-            
-            # Combine and deduplicate
-            related = list(category_blogs) + list(tag_blogs)
-            related = list(dict.fromkeys(related))[:3]  # Remove duplicates
-        else:
-            related = list(category_blogs)
-        
-        serializer = BlogListSerializer(related, many=True)
-        return Response(serializer.data)
+    """Get related blogs (precomputed by recommendations.py)"""
+    related = list(
+        Blog.objects.filter(
+            status='published',
+            recommended_in__blog__slug=slug,
+            recommended_in__blog__status='published'
+        ).select_related('author', 'category').prefetch_related('tags')
+        .defer('content').order_by('recommended_in__rank')[:3]
+    )
     
-    except Blog.DoesNotExist:
+    if not related and not Blog.objects.filter(slug=slug, status='published').exists():
         return Response(
             {'error': 'Blog not found'}, 
             status=status.HTTP_404_NOT_FOUND
         )
+    
+    serializer = BlogListSerializer(related, many=True)
+    keys = [surrogate.blog_key(slug), surrogate.BLOGS]
+    for blog in related:
+        keys.extend(blog_surrogate_keys(blog))
+    return add_surrogate_keys(Response(serializer.data), keys)
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
@@ -141,7 +198,10 @@ def featured_blogs(request):
     blogs = Blog.objects.filter(
         status='published',
         featured=True
-    ).select_related('author', 'category').prefetch_related('tags')[:6]
+    ).select_related('author', 'category').prefetch_related('tags').defer('content')[:6]
     
     serializer = BlogListSerializer(blogs, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    keys = [surrogate.BLOGS]
+    for blog in blogs:
+        keys.extend(blog_surrogate_keys(blog))
+    return add_surrogate_keys(Response(serializer.data), keys)
\ No newline at end of file
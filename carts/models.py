@@ -22,7 +22,8 @@ class Cart(models.Model):
     
     @property
     def total(self):
-        return sum(item.subtotal for item in self.cart_items.all())
+        from .quotes import get_cart_quote
+        return get_cart_quote(self)['total']
     
     @property
     def item_count(self):
@@ -0,0 +1,86 @@
+"""
+Priced cart quotes shared by the cart, checkout and payment creation.
+
+A quote is cached under a digest of the cart's item rows (ids, quantities,
+updated_at) and the global pricing version, so any change to the cart's
+items produces a new key, and any price change bumps the version (see
+signals.py). Stale quotes are never invalidated explicitly; they just stop
+being looked up and expire.
+"""
+
+import hashlib
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRICE_VERSION_KEY = 'carts:price-version'
+
+
+def get_price_version():
+    # Seeded from the clock so an evicted counter never restarts at an old value
+    return cache.get_or_set(PRICE_VERSION_KEY, time.time_ns, timeout=None)
+
+
+def bump_price_version():
+    """Invalidate every cached quote after a price change."""
+    try:
+        cache.incr(PRICE_VERSION_KEY)
+    except ValueError:
+        cache.set(PRICE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _cache_key(cart):
+    rows = list(
+        cart.cart_items.order_by('id').values_list(
+            'id', 'product_id', 'product_variation_id', 'quantity', 'custom_quantity', 'updated_at'
+        )
+    )
+    digest = hashlib.sha256(repr((get_price_version(), rows)).encode()).hexdigest()
+    return f'carts:quote:{cart.pk}:{digest}'
+
+
+def _price_cart(cart):
+    lines = []
+    total = Decimal('0')
+
+    for item in cart.cart_items.select_related('product', 'product_variation__product').order_by('id'):
+        # Same rules as CartItem.subtotal: variation price first, custom quantity over quantity
+        if item.product_variation:
+            product = item.product_variation.product
+            unit_price = item.product_variation.price
+        elif item.product:
+            product = item.product
+            unit_price = item.product.price
+        else:
+            continue
+
+        subtotal = unit_price * item.effective_quantity
+        total += subtotal
+        lines.append({
+            'cart_item_id': item.id,
+            'product_id': product.id,
+            'product_variation_id': item.product_variation_id,
+            'title': product.title,
+            'quantity': item.quantity,
+            'effective_quantity': item.effective_quantity,
+            'unit_price': unit_price,
+            'subtotal': subtotal,
+        })
+
+    return {'total': total, 'lines': lines}
+
+
+def get_cart_quote(cart):
+    """
+    Return the priced quote for a cart: {'key', 'total', 'lines'}.
+    Each line has cart_item_id, product_id, product_variation_id, title,
+    quantity, effective_quantity, unit_price and subtotal.
+    """
+    key = _cache_key(cart)
+    quote = cache.get(key)
+    if quote is None:
+        quote = {'key': key, **_price_cart(cart)}
+        cache.set(key, quote, settings.CART_QUOTE_TTL)
+    return quote
@@ -0,0 +1,31 @@
+"""
+Bump the cart pricing version whenever a product or variation price changes,
+so cached cart quotes are re-priced (see quotes.py).
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from products.models import Product, ProductVariation
+from .quotes import bump_price_version
+
+
+@receiver(post_init, sender=Product)
+@receiver(post_init, sender=ProductVariation)
+def remember_loaded_price(sender, instance, **kwargs):
+    # Read from __dict__ so deferred price fields are not loaded
+    instance._quote_price = instance.__dict__.get('price')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductVariation)
+def invalidate_quotes_on_price_change(sender, instance, created, raw=False, **kwargs):
+    if not created and instance.price != instance._quote_price:
+        bump_price_version()
+    instance._quote_price = instance.price
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=ProductVariation)
+def invalidate_quotes_on_delete(sender, instance, **kwargs):
+    bump_price_version()
@@ -2,6 +2,8 @@
 ASGI config for ecommerce project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Besides HTTP it answers the server's lifespan events, which open and close
+the pooled async Razorpay client (payments/async_client.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -13,4 +15,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
 
-application = get_asgi_application() 
\ No newline at end of file
+django_application = get_asgi_application()
+
+
+async def lifespan(receive, send):
+    from payments import async_client
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await async_client.open_client()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_client.close_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    else:
+        await django_application(scope, receive, send)
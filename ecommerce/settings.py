@@ -6,6 +6,7 @@ import os
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -114,6 +115,28 @@ DATABASES = {
     }
 }
 
+# Cache
+# Local memory by default for development; point CACHE_BACKEND/CACHE_LOCATION at Redis in production
+# (e.g. django.core.cache.backends.redis.RedisCache, redis://localhost:6379/1)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='pragathi-naturals'),
+    }
+}
+
+# The cache holds state every process must agree on: unread notification counters,
+# the cart price version, pre-rendered blog documents and the dashboard refresh lock.
+# A per-process cache gives each web and Celery worker its own copy. Unless it is
+# explicitly allowed (on by default in DEBUG for a single runserver process and the
+# test suite), unread counters are then counted from the database on every read and
+# a warning is logged at startup (see notifications/apps.py).
+CACHE_ALLOW_LOCAL = config('CACHE_ALLOW_LOCAL', default=DEBUG, cast=bool)
+CACHE_SHARED = CACHE_ALLOW_LOCAL or CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -205,6 +228,121 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Give up quickly when publishing to an unreachable broker, so a request that
+# queues a task doesn't hang on it (workers retry their own connection)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'max_retries': config('CELERY_BROKER_PUBLISH_RETRIES', default=1, cast=int),
+    'interval_start': 0,
+    'interval_step': 0.2,
+    'interval_max': 0.5,
+}
+
+# Periodic tasks (run with `celery -A ecommerce beat`)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-sales-rollups': {
+        'task': 'admin_dashboard.tasks.reconcile_sales_rollups',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'refresh-leaderboards': {
+        'task': 'admin_dashboard.tasks.refresh_leaderboards',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    'reconcile-pending-payments': {
+        'task': 'payments.tasks.reconcile_pending_payments',
+        'schedule': crontab(minute='*/15'),
+    },
+    'refresh-related-blogs': {
+        'task': 'blogs.tasks.refresh_related_blogs',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'reconcile-notification-counts': {
+        'task': 'notifications.tasks.reconcile_notification_counts',
+        'schedule': crontab(minute=20),
+    },
+    'prune-old-notifications': {
+        'task': 'notifications.tasks.prune_old_notifications',
+        'schedule': crontab(hour=4, minute=0),
+    },
+}
+
+# Admin dashboard statistics cache (seconds)
+DASHBOARD_STATS_SOFT_TTL = config('DASHBOARD_STATS_SOFT_TTL', default=60, cast=int)
+DASHBOARD_STATS_HARD_TTL = config('DASHBOARD_STATS_HARD_TTL', default=60 * 60, cast=int)
+DASHBOARD_STATS_LOCK_TIMEOUT = config('DASHBOARD_STATS_LOCK_TIMEOUT', default=120, cast=int)
+# How long a cold-miss request waits for another request's recompute before computing itself
+DASHBOARD_STATS_MISS_WAIT = config('DASHBOARD_STATS_MISS_WAIT', default=10, cast=int)
+
+# Lifetime (seconds) of cached cart quotes; also bounds staleness after bulk price updates
+# that bypass model signals
+CART_QUOTE_TTL = config('CART_QUOTE_TTL', default=5 * 60, cast=int)
+
+# Sliding window (days) for the bestseller and top-customer leaderboards
+LEADERBOARD_WINDOW_DAYS = config('LEADERBOARD_WINDOW_DAYS', default=30, cast=int)
+
+# Number of precomputed related posts kept per blog post (the endpoint returns the top 3)
+RELATED_BLOGS_PER_POST = config('RELATED_BLOGS_PER_POST', default=6, cast=int)
+
+# Pre-rendered blog detail documents (see blogs/prerender.py)
+BLOG_DETAIL_CACHE_TTL = config('BLOG_DETAIL_CACHE_TTL', default=24 * 60 * 60, cast=int)
+# Public origin of this API, used to make media URLs absolute; posts are only
+# pre-rendered when it is set
+BLOG_PUBLIC_BASE_URL = config('BLOG_PUBLIC_BASE_URL', default='')
+# Storefront page of a post, e.g. https://pragathinaturalfarm.com/blog/{slug} (canonical link)
+BLOG_PAGE_URL = config('BLOG_PAGE_URL', default='')
+# Also write <slug>.json / <slug>.html here for a web server or CDN (disabled when empty)
+BLOG_PRERENDER_DIR = config('BLOG_PRERENDER_DIR', default='')
+
+# CDN / reverse proxy purging by surrogate key (see ecommerce/surrogate.py)
+# e.g. ecommerce.surrogate.HTTPPurger with https://api.fastly.com/service/<id>/purge
+SURROGATE_PURGE_BACKEND = config('SURROGATE_PURGE_BACKEND', default='ecommerce.surrogate.NullPurger')
+SURROGATE_PURGE_URL = config('SURROGATE_PURGE_URL', default='')
+SURROGATE_PURGE_TOKEN = config('SURROGATE_PURGE_TOKEN', default='')
+# Proxy cache lifetime sent as Surrogate-Control on tagged responses (omitted when 0)
+SURROGATE_MAX_AGE = config('SURROGATE_MAX_AGE', default=0, cast=int)
+
+# Lifetime (seconds) of the cached unread notification counters (see notifications/counters.py)
+NOTIFICATION_UNREAD_COUNT_TTL = config('NOTIFICATION_UNREAD_COUNT_TTL', default=24 * 60 * 60, cast=int)
+
+# Read notifications older than this are deleted nightly (kept forever when 0, see notifications/retention.py)
+NOTIFICATION_RETENTION_DAYS = config('NOTIFICATION_RETENTION_DAYS', default=90, cast=int)
+NOTIFICATION_PRUNE_CHUNK_SIZE = config('NOTIFICATION_PRUNE_CHUNK_SIZE', default=1000, cast=int)
+# Copy pruned notifications to the notification_archive table first
+NOTIFICATION_ARCHIVE = config('NOTIFICATION_ARCHIVE', default=False, cast=bool)
+
+# Notification event stream (see notifications/bus.py and notifications/async_views.py)
+# notifications.bus.RedisBus when more than one process serves streams or publishes events
+NOTIFICATION_BUS_BACKEND = config(
+    'NOTIFICATION_BUS_BACKEND',
+    default='notifications.bus.InProcessBus' if DEBUG else 'notifications.bus.RedisBus'
+)
+NOTIFICATION_BUS_REDIS_URL = config('NOTIFICATION_BUS_REDIS_URL', default=CELERY_BROKER_URL)
+NOTIFICATION_STREAM_HEARTBEAT = config('NOTIFICATION_STREAM_HEARTBEAT', default=15, cast=int)
+NOTIFICATION_STREAM_RETRY_MS = config('NOTIFICATION_STREAM_RETRY_MS', default=3000, cast=int)
+
+# Number of rows fetched per database round trip by the admin exports
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+# XLSX exports are built in a temporary file before the first byte is sent;
+# larger ones are refused with a 400 pointing at the (streamed) CSV export
+EXPORT_XLSX_MAX_ROWS = config('EXPORT_XLSX_MAX_ROWS', default=100000, cast=int)
+
+# Razorpay gateway client (see payments/razorpay_client.py)
+# Point RAZORPAY_BASE_URL at the stub server (`manage.py run_razorpay_stub`) for tests and load runs
+RAZORPAY_BASE_URL = config('RAZORPAY_BASE_URL', default='https://api.razorpay.com/v1')
+RAZORPAY_CONNECT_TIMEOUT = config('RAZORPAY_CONNECT_TIMEOUT', default=3.05, cast=float)
+RAZORPAY_READ_TIMEOUT = config('RAZORPAY_READ_TIMEOUT', default=10, cast=float)
+RAZORPAY_POOL_SIZE = config('RAZORPAY_POOL_SIZE', default=10, cast=int)
+# Upper bound on concurrent gateway connections per event loop for the async views
+RAZORPAY_ASYNC_MAX_CONNECTIONS = config('RAZORPAY_ASYNC_MAX_CONNECTIONS', default=100, cast=int)
+RAZORPAY_MAX_RETRIES = config('RAZORPAY_MAX_RETRIES', default=2, cast=int)
+RAZORPAY_RETRY_BACKOFF = config('RAZORPAY_RETRY_BACKOFF', default=0.2, cast=float)
+RAZORPAY_RETRY_BACKOFF_MAX = config('RAZORPAY_RETRY_BACKOFF_MAX', default=2, cast=float)
+RAZORPAY_BREAKER_THRESHOLD = config('RAZORPAY_BREAKER_THRESHOLD', default=5, cast=int)
+RAZORPAY_BREAKER_COOLDOWN = config('RAZORPAY_BREAKER_COOLDOWN', default=30, cast=float)
+# Secret set on the webhook in the Razorpay dashboard (webhooks are rejected when empty)
+RAZORPAY_WEBHOOK_SECRET = config('RAZORPAY_WEBHOOK_SECRET', default='')
+# Pending payments older than this are checked against Razorpay by reconcile_payments
+PAYMENT_RECONCILE_AFTER_MINUTES = config('PAYMENT_RECONCILE_AFTER_MINUTES', default=30, cast=int)
+PAYMENT_RECONCILE_CONCURRENCY = config('PAYMENT_RECONCILE_CONCURRENCY', default=8, cast=int)
 
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -0,0 +1,225 @@
+"""
+Surrogate-key tagging and targeted purges for a CDN / reverse proxy.
+
+Cacheable GET responses carry a ``Surrogate-Key`` header listing what they
+were built from: one key per object (``product-42``, ``category-3``,
+``blog-<slug>``, ...) plus a collection key (``products``, ``blogs``, ...) on
+list responses. When an object changes, model signals call ``purge`` with the
+keys of that object only, so the proxy drops the responses that showed it and
+keeps everything else. Collection keys are purged only when an object enters
+or leaves a collection (created, deleted, published).
+
+Purges are collected per transaction and sent once it commits, through the
+backend named by ``SURROGATE_PURGE_BACKEND``:
+
+- ``NullPurger`` (default): no proxy, nothing to do.
+- ``HTTPPurger``: POST to ``SURROGATE_PURGE_URL`` with the keys in the
+  ``Surrogate-Key`` header, in batches (Fastly's purge-by-key API, or a
+  Varnish xkey / nginx endpoint configured to accept the same request).
+- ``LocalSurrogateCache``: an in-process caching proxy stand-in for tests
+  and local runs.
+"""
+
+import logging
+from functools import lru_cache, partial
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Surrogate-Key'
+
+# Collection keys, carried by list responses
+PRODUCTS = 'products'
+CATEGORIES = 'categories'
+VARIATIONS = 'variations'
+BLOGS = 'blogs'
+BLOG_CATEGORIES = 'blog-categories'
+BLOG_TAGS = 'blog-tags'
+
+
+def product_key(product_id):
+    return f'product-{product_id}'
+
+
+def category_key(category_id):
+    # Uncategorised products have no category key (None is dropped by callers)
+    return f'category-{category_id}' if category_id is not None else None
+
+
+def variation_key(variation_id):
+    return f'variation-{variation_id}'
+
+
+def blog_key(slug):
+    return f'blog-{slug}'
+
+
+def blog_category_key(slug):
+    return f'blog-category-{slug}'
+
+
+def blog_tag_key(slug):
+    return f'blog-tag-{slug}'
+
+
+def add_surrogate_keys(response, keys):
+    """Tag a successful GET response with surrogate keys (deduplicated, in order)."""
+    keys = list(dict.fromkeys(key for key in keys if key))
+    if keys and response.status_code == 200:
+        response[HEADER] = ' '.join(keys)
+        if settings.SURROGATE_MAX_AGE:
+            # Cache time for the proxy only; browsers keep their own rules
+            response['Surrogate-Control'] = f'max-age={settings.SURROGATE_MAX_AGE}'
+    return response
+
+
+class SurrogateKeyMixin:
+    """
+    Tag GET responses of a generic view with the keys of the objects it
+    serialized. Views set ``surrogate_collection_key`` (list views) and
+    implement ``object_surrogate_keys(obj)``.
+    """
+    surrogate_collection_key = None
+
+    def object_surrogate_keys(self, obj):
+        return []
+
+    def get_serializer(self, *args, **kwargs):
+        if args:
+            self._surrogate_objects = args[0]
+        return super().get_serializer(*args, **kwargs)
+
+    def surrogate_keys(self):
+        objects = getattr(self, '_surrogate_objects', None)
+        if objects is None:
+            return []
+        if not isinstance(objects, (list, tuple)) and not hasattr(objects, 'model'):
+            objects = [objects]
+        keys = [self.surrogate_collection_key] if self.surrogate_collection_key else []
+        for obj in objects:
+            keys.extend(self.object_surrogate_keys(obj))
+        return keys
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            add_surrogate_keys(response, self.surrogate_keys())
+        return response
+
+
+def purge(keys):
+    """Purge responses tagged with any of ``keys`` once the transaction commits."""
+    keys = {key for key in keys if key}
+    if not keys:
+        return
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        get_purger().purge(sorted(keys))
+        return
+
+    # Collected on the connection so a transaction sends one purge request
+    # however many objects it touched. Every call registers a flush and the
+    # first one to run sends everything; keys left behind by a rollback are
+    # sent with the next commit, which only over-purges.
+    pending = connection.__dict__.setdefault('_surrogate_pending', set())
+    pending.update(keys)
+    transaction.on_commit(partial(_flush, connection))
+
+
+def _flush(connection):
+    pending = connection.__dict__.get('_surrogate_pending')
+    if pending:
+        keys = sorted(pending)
+        pending.clear()
+        get_purger().purge(keys)
+
+
+@lru_cache(maxsize=None)
+def _purger(path):
+    return import_string(path)()
+
+
+def get_purger():
+    return _purger(settings.SURROGATE_PURGE_BACKEND)
+
+
+class NullPurger:
+    """No proxy in front of the API."""
+
+    def purge(self, keys):
+        pass
+
+
+class HTTPPurger:
+    """Send purge-by-key requests to ``SURROGATE_PURGE_URL``."""
+
+    # Fastly accepts up to 256 keys per request
+    batch_size = 256
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def purge(self, keys):
+        headers = {}
+        if settings.SURROGATE_PURGE_TOKEN:
+            headers['Fastly-Key'] = settings.SURROGATE_PURGE_TOKEN
+
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            try:
+                response = self.session.post(
+                    settings.SURROGATE_PURGE_URL,
+                    headers={**headers, HEADER: ' '.join(batch)},
+                    timeout=5,
+                )
+                response.raise_for_status()
+            except requests.RequestException:
+                # The edit itself succeeded; stale copies expire with Surrogate-Control
+                logger.exception('Surrogate purge failed for %d keys', len(batch))
+
+
+class LocalSurrogateCache:
+    """
+    In-process stand-in for a caching proxy: caches successful GET responses
+    of the Django app by path, indexed by their surrogate keys, and drops
+    them on purge. Use it as ``SURROGATE_PURGE_BACKEND`` and read through
+    ``get``; ``hits`` / ``misses`` / ``purged`` record what happened.
+    """
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+        self.reset()
+
+    def reset(self):
+        self.responses = {}
+        self.keys = {}
+        self.hits = 0
+        self.misses = 0
+        self.purged = []
+
+    def get(self, path):
+        if path in self.responses:
+            self.hits += 1
+            return self.responses[path]
+
+        self.misses += 1
+        response = self.client.get(path)
+        keys = response.get(HEADER, '').split()
+        if response.status_code == 200 and keys:
+            self.responses[path] = response
+            for key in keys:
+                self.keys.setdefault(key, set()).add(path)
+        return response
+
+    def purge(self, keys):
+        self.purged.append(list(keys))
+        for key in keys:
+            for path in self.keys.pop(key, set()):
+                self.responses.pop(path, None)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, NotificationArchive
 
 
 @admin.register(Notification)
@@ -8,4 +8,12 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ['read', 'created_at']
     search_fields = ['user__email', 'message']
     ordering = ['-created_at']
-    readonly_fields = ['created_at', 'updated_at'] 
\ No newline at end of file
+    readonly_fields = ['created_at', 'updated_at'] 
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ['user', 'message', 'created_at', 'archived_at']
+    list_filter = ['archived_at']
+    search_fields = ['user__email', 'message']
+    ordering = ['-created_at']
+    readonly_fields = ['notification_id', 'created_at', 'archived_at']
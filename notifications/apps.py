@@ -1,5 +1,24 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
 
 class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if not settings.CACHE_SHARED:
+            logger.warning(
+                'CACHE_BACKEND %s is not shared between processes: unread notification '
+                'counts are read from the database, and cart quotes, blog documents and '
+                'the dashboard refresh lock are per process. Point CACHE_BACKEND/'
+                'CACHE_LOCATION at a shared cache such as Redis, or set '
+                'CACHE_ALLOW_LOCAL=True for a single-process setup.',
+                settings.CACHES['default']['BACKEND'],
+            )
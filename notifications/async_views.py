@@ -0,0 +1,113 @@
+"""
+Server-Sent Events stream of a user's notifications.
+
+``GET /api/notifications/notifications/stream/`` keeps the response open and
+writes an event whenever a notification is created for the user
+(``notification``) or one of their orders changes status (``order_status``).
+The first event is the current ``unread_count``, so the client no longer
+needs to poll. Events come from the bus (bus.py), and a comment line is sent
+every ``NOTIFICATION_STREAM_HEARTBEAT`` seconds to keep proxies from closing
+the connection.
+
+EventSource can't set headers, so the access token may be passed as
+``?token=``. A reconnecting client sends ``Last-Event-ID``, and the
+notifications created after that id are replayed first. They may repeat
+events that are already on their way; clients dedupe by id.
+
+Needs an ASGI server (ecommerce.asgi). Under WSGI Django would consume the
+endless stream before sending anything and hold a worker forever, so the
+request is refused with a 503 instead.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import bus
+from .models import Notification
+from .signals import notification_data
+
+# Notifications replayed at most on reconnect
+REPLAY_LIMIT = 50
+
+
+async def _authenticate(request):
+    """Return the user of the bearer token or ``?token=``, or None."""
+    authentication = JWTAuthentication()
+    raw_token = request.GET.get('token')
+    try:
+        if raw_token:
+            token = authentication.get_validated_token(raw_token)
+            return await sync_to_async(authentication.get_user)(token)
+        result = await sync_to_async(authentication.authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def _event(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {JSONRenderer().render(data).decode()}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def _missed_notifications(user, last_event_id):
+    notifications = (
+        Notification.objects.filter(user=user, id__gt=last_event_id)
+        .prefetch_related('notifiable').order_by('id')[:REPLAY_LIMIT]
+    )
+    return [notification_data(notification) for notification in notifications]
+
+
+async def _stream(user, last_event_id):
+    # Subscribe before reading the database so nothing falls in between
+    async with bus.get_bus().subscribe(user.id) as subscription:
+        yield f'retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n'.encode()
+        count = await sync_to_async(Notification.unread_count)(user)
+        yield _event('unread_count', {'unread_count': count})
+
+        if last_event_id is not None:
+            for data in await sync_to_async(_missed_notifications)(user, last_event_id):
+                yield _event('notification', data, data['id'])
+
+        while True:
+            event = await subscription.get(settings.NOTIFICATION_STREAM_HEARTBEAT)
+            if event is None:
+                yield b': keep-alive\n\n'
+            else:
+                yield _event(event['type'], event['data'], event.get('id'))
+
+
+@require_GET
+async def notification_stream(request):
+    """Stream the user's notification events (text/event-stream)."""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'Notification streams need the ASGI server.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    response = StreamingHttpResponse(_stream(user, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,147 @@
+"""
+Publish / subscribe bus carrying notification events to open streams.
+
+Signals publish an event for a user once the transaction commits (see
+signals.py). The SSE endpoint (async_views.py) subscribes to the events of
+the connected user and writes them to the response. Events are JSON-safe
+dicts: ``{'type': ..., 'id': ..., 'data': {...}}``.
+
+The backend is named by ``NOTIFICATION_BUS_BACKEND``:
+
+- ``InProcessBus`` (default in DEBUG): subscribers of the current process
+  only. Fine for a single ASGI process and for tests; events published by
+  other processes (other workers, Celery) are not seen.
+- ``RedisBus`` (default otherwise): Redis pub/sub on
+  ``NOTIFICATION_BUS_REDIS_URL``, one channel per user, so every process sees
+  every event.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def channel(user_id):
+    return f'notifications:user:{user_id}'
+
+
+@lru_cache(maxsize=None)
+def _bus(path):
+    return import_string(path)()
+
+
+def get_bus():
+    return _bus(settings.NOTIFICATION_BUS_BACKEND)
+
+
+def publish(user_id, event_type, data, event_id=None):
+    """Send an event to the open streams of a user."""
+    get_bus().publish(user_id, {'type': event_type, 'id': event_id, 'data': data})
+
+
+class InProcessBus:
+    """Fan out to the streams served by this process."""
+
+    # Events kept for a subscriber that doesn't read; later ones are dropped
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            # Publishers run in sync code, usually another thread than the stream's loop
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                pass  # Loop closed, the subscription is going away
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning('Dropped a notification event for a slow stream')
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(entry)
+        try:
+            yield _QueueSubscription(entry[1])
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(user_id, set())
+                subscribers.discard(entry)
+                if not subscribers:
+                    self._subscribers.pop(user_id, None)
+
+    def subscriber_count(self, user_id):
+        with self._lock:
+            return len(self._subscribers.get(user_id, ()))
+
+
+class _QueueSubscription:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        """Next event, or None after ``timeout`` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBus:
+    """Fan out through Redis pub/sub, across processes."""
+
+    def __init__(self):
+        import redis
+
+        self.url = settings.NOTIFICATION_BUS_REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+        self.errors = redis.RedisError
+
+    def publish(self, user_id, event):
+        try:
+            self.client.publish(channel(user_id), json.dumps(event))
+        except self.errors:
+            # Streams are best effort; the notification itself is stored
+            logger.exception('Failed to publish a notification event')
+
+    @asynccontextmanager
+    async def subscribe(self, user_id):
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel(user_id))
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
@@ -0,0 +1,79 @@
+"""
+Per-user unread notification counters kept in the cache.
+
+``unread_count`` answers from the cache and only counts rows on a miss. The
+counter is incremented when a notification is created (signals.py, once the
+transaction commits) and lowered or reset by the read / delete paths on the
+model. Writes to a missing counter are dropped: the next read recounts.
+
+A read racing a write can leave a counter off by one until
+``reconcile_unread_counts`` (hourly beat task) recounts every user.
+
+When the cache is not shared between processes (``CACHE_SHARED``), each
+worker would keep its own counters, so reads count rows instead.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+
+def cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    """Unread notifications of a user, counted only on a cache miss."""
+    if not settings.CACHE_SHARED:
+        from .models import Notification
+
+        return Notification.objects.filter(user_id=user_id, read=False).count()
+
+    count = cache.get(cache_key(user_id))
+    if count is None:
+        from .models import Notification
+
+        count = Notification.objects.filter(user_id=user_id, read=False).count()
+        cache.add(cache_key(user_id), count, settings.NOTIFICATION_UNREAD_COUNT_TTL)
+    return max(count, 0)
+
+
+def adjust_unread_count(user_id, delta):
+    """Add ``delta`` to a user's counter, if it is cached."""
+    try:
+        count = cache.incr(cache_key(user_id), delta)
+    except ValueError:
+        return
+    if count < 0:
+        # Lost an increment somewhere; let the next read recount
+        cache.delete(cache_key(user_id))
+
+
+def set_unread_count(user_id, count):
+    cache.set(cache_key(user_id), count, settings.NOTIFICATION_UNREAD_COUNT_TTL)
+
+
+def reconcile_unread_counts(chunk_size=1000):
+    """
+    Recount the unread notifications of every user with notifications and
+    store the results. Returns the number of counters written.
+    """
+    from .models import Notification
+
+    rows = (
+        Notification.objects.order_by('user_id').values('user_id')
+        .annotate(unread=Count('id', filter=Q(read=False)))
+        .values_list('user_id', 'unread')
+    )
+    written = 0
+    batch = {}
+    for user_id, unread in rows.iterator(chunk_size=chunk_size):
+        batch[cache_key(user_id)] = unread
+        if len(batch) >= chunk_size:
+            cache.set_many(batch, settings.NOTIFICATION_UNREAD_COUNT_TTL)
+            written += len(batch)
+            batch = {}
+    if batch:
+        cache.set_many(batch, settings.NOTIFICATION_UNREAD_COUNT_TTL)
+        written += len(batch)
+    return written
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.retention import prune_notifications
+
+
+class Command(BaseCommand):
+    help = 'Delete read notifications older than the retention period, optionally archiving them first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help=f'Retention period in days (default: {settings.NOTIFICATION_RETENTION_DAYS})',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.NOTIFICATION_PRUNE_CHUNK_SIZE,
+            help=f'Rows deleted per transaction (default: {settings.NOTIFICATION_PRUNE_CHUNK_SIZE})',
+        )
+        parser.add_argument('--archive', action='store_true', help='Copy the rows to the archive table first')
+
+    def handle(self, *args, **options):
+        count = prune_notifications(
+            days=options['days'],
+            chunk_size=options['chunk_size'],
+            archive=options['archive'] or settings.NOTIFICATION_ARCHIVE,
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ Pruned {count} notifications'))
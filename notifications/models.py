@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from users.models import User
+from . import counters
 
 
 class Notification(models.Model):
@@ -21,16 +23,76 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        indexes = [
+            # Unread counts and mark-all-read
+            models.Index(fields=['user', 'read'], name='notification_user_read_idx'),
+            # Retention pruning (retention.py)
+            models.Index(fields=['read', 'created_at'], name='notification_read_created_idx'),
+        ]
     
     def __str__(self):
         return f"Notification for {self.user.email}: {self.message[:50]}..."
     
+    def notifiable_summary(self):
+        """
+        Compact ``{type, id, label}`` form of the target. Reads the content
+        type from the ContentType cache; list views prefetch ``notifiable``
+        so targets are loaded one query per type, not per row.
+        """
+        target = self.notifiable
+        label = None
+        if target is not None:
+            label = getattr(target, 'notification_label', None) or str(target)
+        return {
+            'type': ContentType.objects.get_for_id(self.content_type_id).model,
+            'id': self.object_id,
+            'label': label,
+        }
+    
+    def mark_read(self):
+        """Mark this notification as read, lowering the unread counter once"""
+        now = timezone.now()
+        if type(self).objects.filter(pk=self.pk, read=False).update(read=True, updated_at=now):
+            counters.adjust_unread_count(self.user_id, -1)
+            self.updated_at = now
+        self.read = True
+    
     @classmethod
     def mark_all_read(cls, user):
         """Mark all notifications as read for a user"""
-        return cls.objects.filter(user=user, read=False).update(read=True)
+        count = cls.objects.filter(user=user, read=False).update(read=True)
+        counters.set_unread_count(user.id, 0)
+        return count
+    
+    @classmethod
+    def delete_all(cls, user):
+        """Delete all notifications of a user"""
+        count = cls.objects.filter(user=user).delete()[0]
+        counters.set_unread_count(user.id, 0)
+        return count
     
     @classmethod
     def unread_count(cls, user):
-        """Get count of unread notifications for a user"""
-        return cls.objects.filter(user=user, read=False).count() 
\ No newline at end of file
+        """Get count of unread notifications for a user (cached, see counters.py)"""
+        return counters.unread_count(user.id)
+
+
+class NotificationArchive(models.Model):
+    """Compact copy of a pruned notification, kept when NOTIFICATION_ARCHIVE is on"""
+    notification_id = models.PositiveBigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField()
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'notification_archive'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notif_archive_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Archived notification for user {self.user_id}: {self.message[:50]}..."
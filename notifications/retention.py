@@ -0,0 +1,51 @@
+"""
+Retention of read notifications.
+
+Read notifications older than ``NOTIFICATION_RETENTION_DAYS`` are deleted by
+the nightly ``prune_old_notifications`` beat task, in chunks of
+``NOTIFICATION_PRUNE_CHUNK_SIZE`` rows with one short transaction each, so
+the job never holds long locks on the table. With ``NOTIFICATION_ARCHIVE``
+on, each chunk is first copied to ``NotificationArchive``. Unread
+notifications are kept whatever their age.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+ARCHIVED_FIELDS = ('id', 'user_id', 'message', 'content_type_id', 'object_id', 'created_at')
+
+
+def prune_notifications(days=None, chunk_size=None, archive=None):
+    """Delete (and optionally archive) expired read notifications. Returns the number pruned."""
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    chunk_size = chunk_size or settings.NOTIFICATION_PRUNE_CHUNK_SIZE
+    archive = settings.NOTIFICATION_ARCHIVE if archive is None else archive
+    if not days:
+        return 0
+
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = Notification.objects.filter(read=True, created_at__lt=cutoff).order_by('id')
+    pruned = 0
+
+    while True:
+        with transaction.atomic():
+            if archive:
+                rows = list(expired.values_list(*ARCHIVED_FIELDS)[:chunk_size])
+                ids = [row[0] for row in rows]
+                NotificationArchive.objects.bulk_create([
+                    NotificationArchive(**dict(zip(('notification_id',) + ARCHIVED_FIELDS[1:], row)))
+                    for row in rows
+                ])
+            else:
+                ids = list(expired.values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            Notification.objects.filter(id__in=ids).delete()
+        pruned += len(ids)
+
+    return pruned
@@ -4,8 +4,12 @@ from .models import Notification
 
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for Notification model"""
+    notifiable = serializers.SerializerMethodField()
     
     class Meta:
         model = Notification
         fields = ['id', 'message', 'read', 'notifiable', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'message', 'notifiable', 'created_at', 'updated_at'] 
\ No newline at end of file
+        read_only_fields = ['id', 'message', 'notifiable', 'created_at', 'updated_at']
+    
+    def get_notifiable(self, obj):
+        return obj.notifiable_summary()
@@ -0,0 +1,59 @@
+"""
+Keep the cached unread counters (counters.py) in step with new notifications,
+and push new notifications and order status changes to open streams (bus.py).
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from . import bus
+from .counters import adjust_unread_count
+from .models import Notification
+
+
+def notification_data(notification):
+    return {
+        'id': notification.id,
+        'message': notification.message,
+        'read': notification.read,
+        'notifiable': notification.notifiable_summary(),
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def _notification_created(user_id, data):
+    if not data['read']:
+        adjust_unread_count(user_id, 1)
+    bus.publish(user_id, 'notification', data, event_id=data['id'])
+
+
+@receiver(post_save, sender=Notification)
+def announce_new_notification(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(partial(_notification_created, instance.user_id, notification_data(instance)))
+
+
+@receiver(post_init, sender='orders.Order')
+def remember_loaded_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status is not loaded
+    instance._stream_status = instance.__dict__.get('status')
+
+
+def announce_order_statuses(orders):
+    """
+    Push an ``order_status`` event for each ``(order_id, user_id, status)``
+    once the transaction commits. Called by the receiver below and by bulk
+    updates that bypass it.
+    """
+    for order_id, user_id, status in orders:
+        transaction.on_commit(partial(bus.publish, user_id, 'order_status', {'order_id': order_id, 'status': status}))
+
+
+@receiver(post_save, sender='orders.Order')
+def announce_order_status(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw and instance.status != instance._stream_status:
+        announce_order_statuses([(instance.id, instance.user_id, instance.status)])
+    instance._stream_status = instance.status
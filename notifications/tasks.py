@@ -0,0 +1,18 @@
+from celery import shared_task
+
+from .counters import reconcile_unread_counts
+from .retention import prune_notifications
+
+
+@shared_task
+def reconcile_notification_counts():
+    """Recount the cached unread notification counters of every user"""
+    count = reconcile_unread_counts()
+    return f'Reconciled {count} unread counters'
+
+
+@shared_task
+def prune_old_notifications():
+    """Delete read notifications past the retention period"""
+    count = prune_notifications()
+    return f'Pruned {count} notifications'
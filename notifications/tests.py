@@ -0,0 +1,252 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orders.models import Order
+from users.models import Address, User
+from . import bus, counters
+from .models import Notification, NotificationArchive
+from .retention import prune_notifications
+from .tasks import reconcile_notification_counts
+
+
+class NotificationTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(email='shopper@example.com', name='Shopper', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, message='Your order shipped', **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(user=self.user, notifiable=self.user, message=message, **kwargs)
+
+
+class UnreadCounterTests(NotificationTestMixin, TestCase):
+    """Cached unread counters and their reconciliation."""
+
+    def unread_count(self):
+        return self.client.get(reverse('notifications_unread_count')).data['unread_count']
+
+    def test_poll_is_answered_from_the_cache(self):
+        self.notify()
+        self.assertEqual(self.unread_count(), 1)
+
+        self.notify()
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.unread_count(self.user.id), 2)
+
+    def test_increment_decrement_and_reset(self):
+        first, second, _ = [self.notify(f'Message {i}') for i in range(3)]
+        self.assertEqual(self.unread_count(), 3)
+
+        self.notify(read=True)
+        self.assertEqual(self.unread_count(), 3)
+
+        url = reverse('notification_mark_read', args=[first.id])
+        self.client.patch(url)
+        self.client.patch(url)
+        self.assertEqual(self.unread_count(), 2)
+
+        self.client.patch(reverse('notifications_mark_all_read'))
+        self.assertEqual(self.unread_count(), 0)
+
+        self.notify()
+        self.assertEqual(self.unread_count(), 1)
+        self.client.delete(reverse('notifications_destroy_all'))
+        self.assertEqual(self.unread_count(), 0)
+        self.assertFalse(Notification.objects.filter(user=self.user).exists())
+
+    def test_writes_to_a_missing_counter_are_dropped(self):
+        self.notify()
+        self.assertIsNone(cache.get(counters.cache_key(self.user.id)))
+        self.assertEqual(self.unread_count(), 1)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_counts_rows(self):
+        self.notify()
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(counters.unread_count(self.user.id), 1)
+        self.assertIsNone(cache.get(counters.cache_key(self.user.id)))
+
+    def test_reconcile_task_corrects_drift(self):
+        self.notify()
+        self.notify(read=True)
+        other = User.objects.create_user(email='other@example.com', name='Other', password='password')
+        Notification.objects.create(user=other, notifiable=other, message='Welcome', read=True)
+        cache.set(counters.cache_key(self.user.id), 7)
+        cache.set(counters.cache_key(other.id), 3)
+
+        self.assertEqual(reconcile_notification_counts(), 'Reconciled 2 unread counters')
+
+        self.assertEqual(cache.get(counters.cache_key(self.user.id)), 1)
+        self.assertEqual(cache.get(counters.cache_key(other.id)), 0)
+
+
+def parse_event(chunk):
+    """Split one SSE chunk into its fields, decoding the JSON data."""
+    fields = dict(line.split(': ', 1) for line in chunk.decode().strip().split('\n'))
+    if 'data' in fields:
+        fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+class NotificationStreamTests(NotificationTestMixin, TestCase):
+    """Server-Sent Events stream and the events published to it."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('notifications_stream')
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def open_stream(self, **kwargs):
+        response = await self.async_client.get(self.url, {'token': self.token}, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response.streaming_content.__aiter__()
+
+    async def next_event(self, stream):
+        return parse_event(await asyncio.wait_for(stream.__anext__(), 5))
+
+    async def test_requires_a_valid_token(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(self.url, {'token': 'not-a-token'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_refused_under_wsgi(self):
+        response = self.client.get(self.url, {'token': self.token})
+        self.assertEqual(response.status_code, 503)
+
+    async def test_token_in_query_string(self):
+        await sync_to_async(self.notify)()
+        stream = await self.open_stream()
+
+        self.assertEqual(await self.next_event(stream), {'retry': '3000'})
+        self.assertEqual(await self.next_event(stream), {'event': 'unread_count', 'data': {'unread_count': 1}})
+
+        # Live events from the bus
+        bus.publish(self.user.id, 'order_status', {'order_id': 5, 'status': 'shipped'})
+        event = await self.next_event(stream)
+        self.assertEqual(event, {'event': 'order_status', 'data': {'order_id': 5, 'status': 'shipped'}})
+
+    async def test_last_event_id_replays_missed_notifications(self):
+        first, second, third = [await sync_to_async(self.notify)(f'Message {i}') for i in range(3)]
+        stream = await self.open_stream(headers={'Last-Event-ID': str(first.id)})
+
+        await self.next_event(stream)
+        await self.next_event(stream)
+        replayed = [await self.next_event(stream) for _ in range(2)]
+        self.assertEqual([event['id'] for event in replayed], [str(second.id), str(third.id)])
+        self.assertEqual(replayed[0]['event'], 'notification')
+        self.assertEqual(replayed[0]['data']['message'], 'Message 1')
+
+    def test_signals_publish_notifications_and_order_status(self):
+        address = Address.objects.create(
+            user=self.user, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+        order = Order.objects.create(user=self.user, address=address)
+
+        with mock.patch('notifications.bus.publish') as publish:
+            notification = self.notify()
+            with self.captureOnCommitCallbacks(execute=True):
+                order.save()
+                order.status = 'shipped'
+                order.save()
+
+        self.assertEqual(publish.call_count, 2)
+        args, kwargs = publish.call_args_list[0]
+        self.assertEqual(args[:2], (self.user.id, 'notification'))
+        self.assertEqual(kwargs, {'event_id': notification.id})
+        publish.assert_called_with(self.user.id, 'order_status', {'order_id': order.id, 'status': 'shipped'})
+
+
+@override_settings(NOTIFICATION_RETENTION_DAYS=90, NOTIFICATION_PRUNE_CHUNK_SIZE=2, NOTIFICATION_ARCHIVE=False)
+class NotificationRetentionTests(NotificationTestMixin, TestCase):
+    """Chunked pruning of old read notifications."""
+
+    def setUp(self):
+        super().setUp()
+        self.expired = [self.notify(f'Old {i}', read=True) for i in range(5)]
+        self.old_unread = self.notify('Old unread')
+        self.recent = self.notify('Recent', read=True)
+        Notification.objects.filter(pk__in=[n.pk for n in self.expired + [self.old_unread]]).update(
+            created_at=timezone.now() - timedelta(days=120)
+        )
+
+    def test_prunes_old_read_notifications_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(prune_notifications(), 5)
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+
+        remaining = set(Notification.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {self.old_unread.pk, self.recent.pk})
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    def test_archive_before_delete(self):
+        self.assertEqual(prune_notifications(archive=True), 5)
+
+        archived = NotificationArchive.objects.order_by('notification_id')
+        self.assertEqual(
+            list(archived.values_list('notification_id', 'message')),
+            [(n.pk, n.message) for n in self.expired],
+        )
+        self.assertEqual(archived[0].user, self.user)
+
+    @override_settings(NOTIFICATION_RETENTION_DAYS=0)
+    def test_zero_days_keeps_everything(self):
+        self.assertEqual(prune_notifications(), 0)
+        self.assertEqual(Notification.objects.count(), 7)
+
+
+class NotificationListTests(NotificationTestMixin, TestCase):
+    """Batched resolution of notification targets in the list endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        address = Address.objects.create(
+            user=self.user, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+        self.orders = [Order.objects.create(user=self.user, address=address) for _ in range(3)]
+        for order in self.orders:
+            self.notify(f'Order {order.id} placed', notifiable=order)
+        self.notify('Welcome')
+
+    def notify(self, message='Your order shipped', **kwargs):
+        kwargs.setdefault('notifiable', self.user)
+        return Notification.objects.create(user=self.user, message=message, **kwargs)
+
+    def test_one_query_per_target_type(self):
+        # Page count, page rows, then the orders and users of the page
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('notifications'))
+        self.assertEqual(response.status_code, 200)
+
+        targets = [item['notifiable'] for item in response.data['results']]
+        self.assertEqual(targets[0], {'type': 'user', 'id': self.user.id, 'label': self.user.email})
+        self.assertEqual(
+            targets[1], {'type': 'order', 'id': self.orders[-1].id, 'label': f'Order #{self.orders[-1].id} (Pending)'}
+        )
+
+    def test_deleted_target_has_no_label(self):
+        order = self.orders[0]
+        Notification.objects.filter(object_id=order.id, content_type__model='order').update(object_id=999999)
+
+        response = self.client.get(reverse('notifications'))
+        summaries = [item['notifiable'] for item in response.data['results'] if item['notifiable']['id'] == 999999]
+        self.assertEqual(summaries, [{'type': 'order', 'id': 999999, 'label': None}])
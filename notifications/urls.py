@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Notification routes
@@ -8,4 +8,5 @@ urlpatterns = [
     path('notifications/mark_all_read/', views.mark_all_read_view, name='notifications_mark_all_read'),
     path('notifications/destroy_all/', views.destroy_all_view, name='notifications_destroy_all'),
     path('notifications/unread_count/', views.unread_count_view, name='notifications_unread_count'),
+    path('notifications/stream/', async_views.notification_stream, name='notifications_stream'),
 ] 
\ No newline at end of file
@@ -11,7 +11,8 @@ class NotificationViewSet(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        # One query per target type for the whole page (see Notification.notifiable_summary)
+        return Notification.objects.filter(user=self.request.user).prefetch_related('notifiable')
 
 
 @api_view(['PATCH'])
@@ -20,8 +21,7 @@ def mark_read_view(request, pk):
     """Mark notification as read equivalent to Rails NotificationsController#mark_read"""
     try:
         notification = Notification.objects.get(id=pk, user=request.user)
-        notification.read = True
-        notification.save()
+        notification.mark_read()
         return Response(NotificationSerializer(notification).data)
     except Notification.DoesNotExist:
         return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -39,7 +39,7 @@ def mark_all_read_view(request):
 @permission_classes([permissions.IsAuthenticated])
 def destroy_all_view(request):
     """Delete all notifications equivalent to Rails NotificationsController#destroy_all"""
-    count = Notification.objects.filter(user=request.user).delete()[0]
+    count = Notification.delete_all(request.user)
     return Response({'message': f'{count} notifications deleted'})
 
 
@@ -1,10 +1,17 @@
-from django.core.management.base import BaseCommand
-from django.db.models import Count, Sum, Avg
+import csv
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
-from datetime import datetime, timedelta
 from orders.models import Order, OrderItem
 from users.models import User
 
+CENT = Decimal('0.01')
+
 
 class Command(BaseCommand):
     help = 'Display comprehensive order statistics'
@@ -21,112 +28,272 @@ class Command(BaseCommand):
             default=30,
             help='Number of days to look back for recent orders (default: 30)',
         )
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            help='Only include orders created on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            help='Only include orders created on or before this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=5,
+            help='Number of top customers to show (default: 5)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['text', 'json', 'csv'],
+            default='text',
+            help='Output format (default: text). JSON renders amounts as strings (e.g. "11.50") '
+                 'so they stay exact',
+        )
+
+    def _parse_date(self, value, option):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'{option} must be a date in YYYY-MM-DD format')
+
+    def _amount(self, value):
+        """Aggregated money rounded to paise; some backends drop the scale of SUM/AVG."""
+        return (value or Decimal('0')).quantize(CENT)
+
+    def _month_starts(self, first, last):
+        """First day of every calendar month between two dates (inclusive)."""
+        months = []
+        current = first.replace(day=1)
+        while current <= last:
+            months.append(current)
+            current = (current + timedelta(days=32)).replace(day=1)
+        return months
+
+    def collect_stats(self, options):
+        """Gather every statistic with a fixed number of grouped queries."""
+        tz = timezone.get_current_timezone()
+        now = timezone.now()
+        today = timezone.localdate()
+
+        date_from = self._parse_date(options['date_from'], '--from') if options['date_from'] else None
+        date_to = self._parse_date(options['date_to'], '--to') if options['date_to'] else today
+        if date_from and date_from > date_to:
+            raise CommandError('--from must not be after --to')
+
+        orders = Order.objects.filter(
+            created_at__lt=timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min), tz)
+        )
+        if date_from:
+            orders = orders.filter(
+                created_at__gte=timezone.make_aware(datetime.combine(date_from, time.min), tz)
+            )
+        orders = orders.order_by()
+
+        # Totals and the recent window in one aggregate
+        recent = Q(created_at__gte=now - timedelta(days=options['days']))
+        totals = orders.aggregate(
+            total_orders=Count('id'),
+            total_revenue=Sum('total'),
+            avg_order_value=Avg('total'),
+            recent_orders=Count('id', filter=recent),
+            recent_revenue=Sum('total', filter=recent),
+        )
+        total_orders = totals['total_orders']
+        total_order_items = OrderItem.objects.filter(order__in=orders.values('id')).count()
+        total_users = User.objects.count()
+
+        # Orders by status
+        by_status = {
+            row['status']: row
+            for row in orders.values('status').annotate(count=Count('id'), revenue=Sum('total'))
+        }
+        status_rows = []
+        for status, label in Order.STATUS_CHOICES:
+            row = by_status.get(status, {})
+            count = row.get('count', 0)
+            status_rows.append({
+                'status': status,
+                'label': label,
+                'count': count,
+                'percentage': round(count / total_orders * 100, 1) if total_orders else 0.0,
+                'revenue': self._amount(row.get('revenue')),
+            })
+
+        # Calendar months; without --from show the last six months
+        month_first = date_from
+        if not month_first:
+            month_first = date_to.replace(day=1)
+            for _ in range(5):
+                month_first = (month_first - timedelta(days=1)).replace(day=1)
+        monthly = {
+            timezone.localtime(row['month']).date() if isinstance(row['month'], datetime) else row['month']: row
+            for row in orders.filter(
+                created_at__gte=timezone.make_aware(datetime.combine(month_first, time.min), tz)
+            ).annotate(month=TruncMonth('created_at')).values('month').annotate(
+                count=Count('id'), revenue=Sum('total')
+            )
+        }
+        monthly_rows = []
+        for month in reversed(self._month_starts(month_first, date_to)):
+            row = monthly.get(month, {})
+            monthly_rows.append({
+                'month': month.strftime('%Y-%m'),
+                'label': month.strftime('%B %Y'),
+                'orders': row.get('count', 0),
+                'revenue': self._amount(row.get('revenue')),
+            })
+
+        # Top customers grouped on the orders table rather than annotating every user
+        top_customers = [
+            {
+                'email': row['user__email'],
+                'orders': row['order_count'],
+                'total_spent': self._amount(row['total_spent']),
+            }
+            for row in orders.values('user_id', 'user__email').annotate(
+                order_count=Count('id'), total_spent=Sum('total')
+            ).order_by('-total_spent')[:options['top']]
+        ]
+
+        stats = {
+            'range': {
+                'from': date_from.isoformat() if date_from else None,
+                'to': date_to.isoformat(),
+            },
+            'totals': {
+                'orders': total_orders,
+                'order_items': total_order_items,
+                'users': total_users,
+                'revenue': self._amount(totals['total_revenue']),
+                'average_order_value': self._amount(totals['avg_order_value']),
+            },
+            'recent': {
+                'days': options['days'],
+                'orders': totals['recent_orders'],
+                'revenue': self._amount(totals['recent_revenue']),
+            },
+            'by_status': status_rows,
+            'monthly': monthly_rows,
+            'top_customers': top_customers,
+        }
+
+        if options['detailed']:
+            stats['recent_orders'] = [
+                {
+                    'id': order['id'],
+                    'email': order['user__email'],
+                    'status': order['status'],
+                    'total': order['total'],
+                    'created_at': timezone.localtime(order['created_at']).strftime('%Y-%m-%d %H:%M'),
+                }
+                for order in orders.order_by('-created_at').values(
+                    'id', 'user__email', 'status', 'total', 'created_at'
+                )[:10]
+            ]
+
+        return stats
 
     def handle(self, *args, **options):
+        stats = self.collect_stats(options)
+
+        if options['format'] == 'json':
+            # Amounts are Decimals; default=str writes them as exact strings, not floats
+            self.stdout.write(json.dumps(stats, indent=2, default=str))
+        elif options['format'] == 'csv':
+            self.write_csv(stats)
+        else:
+            self.write_text(stats)
+
+    def write_csv(self, stats):
+        """Long-format CSV: one metric per row."""
+        writer = csv.writer(self.stdout)
+        writer.writerow(['section', 'key', 'metric', 'value'])
+        for metric, value in stats['totals'].items():
+            writer.writerow(['totals', '', metric, value])
+        for metric in ['orders', 'revenue']:
+            writer.writerow(['recent', stats['recent']['days'], metric, stats['recent'][metric]])
+        for row in stats['by_status']:
+            for metric in ['count', 'percentage', 'revenue']:
+                writer.writerow(['status', row['status'], metric, row[metric]])
+        for row in stats['monthly']:
+            for metric in ['orders', 'revenue']:
+                writer.writerow(['month', row['month'], metric, row[metric]])
+        for row in stats['top_customers']:
+            for metric in ['orders', 'total_spent']:
+                writer.writerow(['customer', row['email'], metric, row[metric]])
+        for order in stats.get('recent_orders', []):
+            for metric in ['status', 'total', 'created_at']:
+                writer.writerow(['order', order['id'], metric, order[metric]])
+
+    def write_text(self, stats):
+        totals = stats['totals']
+
         self.stdout.write(self.style.SUCCESS('📊 ORDER STATISTICS'))
         self.stdout.write('=' * 60)
+        if stats['range']['from']:
+            self.stdout.write(f"📆 Range: {stats['range']['from']} to {stats['range']['to']}")
 
-        # Basic counts
-        total_orders = Order.objects.count()
-        total_order_items = OrderItem.objects.count()
-        total_users = User.objects.count()
-
-        self.stdout.write(f'📦 Total Orders: {total_orders}')
-        self.stdout.write(f'🛍️  Total Order Items: {total_order_items}')
-        self.stdout.write(f'👥 Total Users: {total_users}')
+        self.stdout.write(f"📦 Total Orders: {totals['orders']}")
+        self.stdout.write(f"🛍️  Total Order Items: {totals['order_items']}")
+        self.stdout.write(f"👥 Total Users: {totals['users']}")
 
-        if total_orders == 0:
+        if totals['orders'] == 0:
             self.stdout.write(self.style.WARNING('\n⚠️  No orders found in the database'))
             return
 
         # Revenue statistics
-        revenue_stats = Order.objects.aggregate(
-            total_revenue=Sum('total'),
-            avg_order_value=Avg('total'),
-            max_order_value=Sum('total')  # This will be the same as total for now
-        )
-
         self.stdout.write(f'\n💰 REVENUE STATISTICS')
         self.stdout.write('-' * 30)
-        self.stdout.write(f'Total Revenue: ₹{revenue_stats["total_revenue"] or 0:.2f}')
-        self.stdout.write(f'Average Order Value: ₹{revenue_stats["avg_order_value"] or 0:.2f}')
+        self.stdout.write(f"Total Revenue: ₹{totals['revenue']:.2f}")
+        self.stdout.write(f"Average Order Value: ₹{totals['average_order_value']:.2f}")
 
         # Orders by status
         self.stdout.write(f'\n📈 ORDERS BY STATUS')
         self.stdout.write('-' * 30)
-        for status, label in Order.STATUS_CHOICES:
-            count = Order.objects.filter(status=status).count()
-            percentage = (count / total_orders * 100) if total_orders > 0 else 0
-            self.stdout.write(f'{label:12}: {count:4} ({percentage:5.1f}%)')
+        for row in stats['by_status']:
+            self.stdout.write(f"{row['label']:12}: {row['count']:4} ({row['percentage']:5.1f}%)")
 
         # Time-based statistics
-        now = timezone.now()
-        days = options['days']
-        start_date = now - timedelta(days=days)
-
-        recent_orders = Order.objects.filter(created_at__gte=start_date).count()
-        recent_revenue = Order.objects.filter(created_at__gte=start_date).aggregate(
-            total=Sum('total')
-        )['total'] or 0
-
-        self.stdout.write(f'\n📅 LAST {days} DAYS')
+        recent = stats['recent']
+        self.stdout.write(f"\n📅 LAST {recent['days']} DAYS")
         self.stdout.write('-' * 30)
-        self.stdout.write(f'Orders: {recent_orders}')
-        self.stdout.write(f'Revenue: ₹{recent_revenue:.2f}')
+        self.stdout.write(f"Orders: {recent['orders']}")
+        self.stdout.write(f"Revenue: ₹{recent['revenue']:.2f}")
 
         # Monthly breakdown
         self.stdout.write(f'\n📊 MONTHLY BREAKDOWN')
         self.stdout.write('-' * 30)
-        
-        # Get orders from last 6 months
-        for i in range(6):
-            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_start = month_start - timedelta(days=30 * i)
-            month_end = month_start + timedelta(days=30)
-            
-            month_orders = Order.objects.filter(
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            ).count()
-            
-            month_revenue = Order.objects.filter(
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            ).aggregate(total=Sum('total'))['total'] or 0
-            
-            month_name = month_start.strftime('%B %Y')
-            self.stdout.write(f'{month_name:15}: {month_orders:3} orders, ₹{month_revenue:8.2f}')
+        for row in stats['monthly']:
+            self.stdout.write(f"{row['label']:15}: {row['orders']:3} orders, ₹{row['revenue']:8.2f}")
 
         # Top customers
         self.stdout.write(f'\n👑 TOP CUSTOMERS')
         self.stdout.write('-' * 30)
-        top_customers = User.objects.annotate(
-            order_count=Count('orders'),
-            total_spent=Sum('orders__total')
-        ).filter(order_count__gt=0).order_by('-total_spent')[:5]
-
-        for i, customer in enumerate(top_customers, 1):
-            self.stdout.write(f'{i}. {customer.email:30} - {customer.order_count} orders, ₹{customer.total_spent or 0:.2f}')
+        for i, customer in enumerate(stats['top_customers'], 1):
+            self.stdout.write(
+                f"{i}. {customer['email']:30} - {customer['orders']} orders, ₹{customer['total_spent']:.2f}"
+            )
 
         # Recent orders
-        if options['detailed']:
+        if 'recent_orders' in stats:
             self.stdout.write(f'\n🕒 RECENT ORDERS')
             self.stdout.write('-' * 30)
-            recent_orders = Order.objects.select_related('user').order_by('-created_at')[:10]
-            
-            for order in recent_orders:
+
+            for order in stats['recent_orders']:
                 status_emoji = {
                     'pending': '⏳',
                     'paid': '✅',
                     'shipped': '🚚',
                     'delivered': '📦',
                     'cancelled': '❌'
-                }.get(order.status, '❓')
-                
+                }.get(order['status'], '❓')
+
                 self.stdout.write(
-                    f'{status_emoji} Order #{order.id:4} - {order.user.email:25} - '
-                    f'{order.status:10} - ₹{order.total:8.2f} - '
-                    f'{order.created_at.strftime("%Y-%m-%d %H:%M")}'
+                    f"{status_emoji} Order #{order['id']:4} - {order['email']:25} - "
+                    f"{order['status']:10} - ₹{order['total']:8.2f} - "
+                    f"{order['created_at']}"
                 )
 
         self.stdout.write(f'\n✅ Statistics generated successfully!')
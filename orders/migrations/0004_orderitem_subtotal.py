@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-19 04:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_subtotals(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    OrderItem.objects.update(subtotal=F('price') * F('quantity'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_orders_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='subtotal',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=12),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_subtotals, migrations.RunPython.noop),
+    ]
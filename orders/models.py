@@ -25,10 +25,18 @@ class Order(models.Model):
     class Meta:
         db_table = 'orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='orders_created_at_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.id} - {self.user.email} - {self.status}"
     
+    @property
+    def notification_label(self):
+        """Short label for notification lists (unlike __str__, needs no user query)"""
+        return f"Order #{self.id} ({self.get_status_display()})"
+    
     @property
     def is_paid(self):
         return self.status in ['paid', 'shipped', 'delivered']
@@ -48,6 +56,9 @@ class OrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Amount charged for the line, as quoted. Differs from price * quantity when the
+    # line was priced on a custom quantity (e.g. 1.5 kg); defaults to it otherwise.
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -56,6 +67,7 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.quantity}x {self.product.title} in Order #{self.order.id}"
     
-    @property
-    def subtotal(self):
-        return self.price * self.quantity 
\ No newline at end of file
+    def save(self, *args, **kwargs):
+        if self.subtotal is None:
+            self.subtotal = self.price * self.quantity
+        super().save(*args, **kwargs)
\ No newline at end of file
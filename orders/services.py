@@ -0,0 +1,84 @@
+"""
+Order placement shared by the orders API and the one-shot checkout.
+"""
+
+from django.db import transaction
+from django.db.models import F
+
+from carts.quotes import get_cart_quote
+from ecommerce import surrogate
+from products.models import Product
+from .models import Order, OrderItem
+
+
+class CheckoutError(ValueError):
+    """Raised when a cart can't be turned into an order (empty cart, stock)."""
+
+
+@transaction.atomic
+def place_order(user, address, cart, clear_cart=True):
+    """
+    Create a pending order from the cart's quote, its items, and decrement
+    stock, all in one transaction. Product rows are locked while stock is
+    checked so concurrent checkouts can't oversell.
+    """
+    quote = get_cart_quote(cart)
+    if not quote['lines']:
+        raise CheckoutError('Cart is empty')
+
+    products = Product.objects.select_for_update().in_bulk(
+        sorted({line['product_id'] for line in quote['lines']})
+    )
+
+    for line in quote['lines']:
+        product = products[line['product_id']]
+
+        # Check stock availability
+        if product.stock < line['quantity']:
+            raise CheckoutError(f"Insufficient stock for {product.title}")
+        product.stock -= line['quantity']
+
+    order = Order.objects.create(
+        user=user,
+        address=address,
+        status='pending',
+        total=quote['total']
+    )
+
+    for line in quote['lines']:
+        # The quoted subtotal is what the line is charged, also when it was
+        # priced on a custom quantity (e.g. 1.5 kg)
+        OrderItem.objects.create(
+            order=order,
+            product=products[line['product_id']],
+            quantity=line['quantity'],
+            price=line['unit_price'],
+            subtotal=line['subtotal']
+        )
+
+    # Save the decremented stock
+    for product in products.values():
+        product.save()
+
+    if clear_cart:
+        cart.cart_items.all().delete()
+
+    return order
+
+
+@transaction.atomic
+def cancel_order(order):
+    """Cancel a pending order and put its items back in stock."""
+    order = Order.objects.select_for_update().get(pk=order.pk)
+    if order.status != 'pending':
+        return order
+
+    items = list(order.order_items.all())
+    for item in items:
+        Product.objects.filter(pk=item.product_id).update(stock=F('stock') + item.quantity)
+    # update() skips the product signals that purge cached product responses
+    surrogate.purge(surrogate.product_key(item.product_id) for item in items)
+
+    order.status = 'cancelled'
+    order.save()
+    return order
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from products.models import Category, Product
+from users.models import Address, User
+from .models import Order, OrderItem
+
+
+class OrderStatsCommandTests(TestCase):
+    """The order_stats management command in each output format."""
+
+    def setUp(self):
+        self.customer = User.objects.create_user(email='shopper@example.com', name='Shopper', password='password')
+        self.address = Address.objects.create(
+            user=self.customer, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+        category = Category.objects.create(name='Fruits')
+        self.apple = Product.objects.create(
+            title='Apple', description='Red', price=Decimal('2.50'), stock=100, category=category
+        )
+        self.paid = self.place(3, 'paid')
+        self.pending = self.place(1, 'pending')
+        self.old = self.place(2, 'delivered')
+        Order.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=40))
+
+    def place(self, quantity, status):
+        order = Order.objects.create(
+            user=self.customer, address=self.address, status=status, total=self.apple.price * quantity
+        )
+        OrderItem.objects.create(order=order, product=self.apple, quantity=quantity, price=self.apple.price)
+        return order
+
+    def stats(self, *args):
+        out = io.StringIO()
+        call_command('order_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def test_text(self):
+        output = self.stats('--detailed')
+        self.assertIn('📦 Total Orders: 3', output)
+        self.assertIn('Total Revenue: ₹15.00', output)
+        self.assertIn(f'Order #{self.paid.id:4}', output)
+        self.assertIn('shopper@example.com', output)
+
+    def test_json_renders_amounts_as_strings(self):
+        stats = json.loads(self.stats('--format', 'json'))
+        self.assertEqual(stats['totals']['orders'], 3)
+        self.assertEqual(stats['totals']['revenue'], '15.00')
+        self.assertEqual(stats['recent'], {'days': 30, 'orders': 2, 'revenue': '10.00'})
+        paid = next(row for row in stats['by_status'] if row['status'] == 'paid')
+        self.assertEqual((paid['count'], paid['revenue']), (1, '7.50'))
+        self.assertEqual(stats['top_customers'], [{'email': 'shopper@example.com', 'orders': 3, 'total_spent': '15.00'}])
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.stats('--format', 'csv'))))
+        self.assertEqual(rows[0], ['section', 'key', 'metric', 'value'])
+        self.assertIn(['totals', '', 'orders', '3'], rows)
+        self.assertIn(['totals', '', 'order_items', '3'], rows)
+        self.assertIn(['status', 'pending', 'revenue', '2.50'], rows)
+        self.assertIn(['customer', 'shopper@example.com', 'total_spent', '15.00'], rows)
+
+    def test_date_range(self):
+        today = timezone.localdate()
+        since = (today - timedelta(days=7)).isoformat()
+        stats = json.loads(self.stats('--format', 'json', '--from', since, '--to', today.isoformat()))
+        self.assertEqual(stats['range'], {'from': since, 'to': today.isoformat()})
+        self.assertEqual((stats['totals']['orders'], stats['totals']['revenue']), (2, '10.00'))
+
+        until = (today - timedelta(days=30)).isoformat()
+        stats = json.loads(self.stats('--format', 'json', '--to', until))
+        self.assertEqual((stats['totals']['orders'], stats['totals']['order_items']), (1, 1))
+
+        with self.assertRaises(CommandError):
+            self.stats('--from', today.isoformat(), '--to', until)
+        with self.assertRaises(CommandError):
+            self.stats('--from', 'last week')
@@ -7,6 +7,7 @@ from users.models import User
 from carts.models import Cart
 from .models import Order, OrderItem
 from .serializers import OrderSerializer, OrderCreateSerializer, OrderUpdateSerializer
+from .services import CheckoutError, place_order
 from notifications.models import Notification
 
 
@@ -29,7 +30,6 @@ class OrderViewSet(generics.ListCreateAPIView):
             return OrderCreateSerializer
         return OrderSerializer
     
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -41,59 +41,13 @@ class OrderViewSet(generics.ListCreateAPIView):
             except Cart.DoesNotExist:
                 cart = Cart.objects.create(user=user)
             
-            # Check if cart exists and has items
-            if not cart or not cart.cart_items.exists():
-                return Response({'error': 'Cart is empty'}, status=status.HTTP_400_BAD_REQUEST)
-            
             address_id = serializer.validated_data['address_id']
             address = user.addresses.get(id=address_id)
             
-            # Create order
-            order = Order.objects.create(
-                user=user,
-                address=address,
-                status='pending',
-                total=0
-            )
-            
-            order_total = 0
-            
-            # Process cart items
-            for cart_item in cart.cart_items.select_related('product', 'product_variation__product').all():
-                # Determine which product to use
-                if cart_item.product:
-                    product = cart_item.product
-                    price = product.price
-                elif cart_item.product_variation:
-                    product = cart_item.product_variation.product
-                    price = cart_item.product_variation.price
-                else:
-                    continue  # Skip items without product or variation
-                
-                # Check stock availability
-                if product.stock < cart_item.quantity:
-                    raise serializers.ValidationError(f"Insufficient stock for {product.title}")
-                
-                # Create order item
-                order_item = OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    quantity=cart_item.quantity,
-                    price=price
-                )
-                
-                # Update product stock
-                product.stock -= cart_item.quantity
-                product.save()
-                
-                order_total += price * cart_item.quantity
-            
-            # Update order total
-            order.total = order_total
-            order.save()
-            
-            # Clear cart
-            cart.cart_items.all().delete()
+            try:
+                order = place_order(user, address, cart)
+            except CheckoutError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
         
@@ -0,0 +1,141 @@
+"""
+Async Razorpay client for the ASGI payment views.
+
+Mirrors the gateway calls of razorpay_client on top of ``httpx.AsyncClient``,
+so a single worker process can keep many gateway requests in flight.
+Timeouts, retry policy and the circuit breaker are shared with the sync
+client.
+
+Under the ASGI server one pooled client lives as long as the app: the
+lifespan handler in ecommerce/asgi.py opens it at startup and closes it at
+shutdown. Without it (WSGI, where every request gets a fresh event loop, and
+the test client) each call opens its own client and closes it when done.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from django.conf import settings
+
+from .razorpay_client import (
+    RAZORPAY_KEY_ID,
+    RAZORPAY_KEY_SECRET,
+    GatewayUnavailable,
+    PaymentGatewayError,
+    backoff_delay,
+    get_breaker,
+)
+
+TRANSIENT_ERRORS = (httpx.TransportError, ValueError)
+
+# App-lifetime client, see open_client()
+_pooled_client = None
+
+
+class _ServerError(Exception):
+    """5xx or GATEWAY_ERROR answer from the gateway (retried like a transport error)."""
+
+
+def _new_client():
+    return httpx.AsyncClient(
+        base_url=settings.RAZORPAY_BASE_URL,
+        auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET),
+        timeout=httpx.Timeout(settings.RAZORPAY_READ_TIMEOUT, connect=settings.RAZORPAY_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.RAZORPAY_ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.RAZORPAY_POOL_SIZE,
+        ),
+    )
+
+
+async def open_client():
+    """
+    Open the pooled client shared by every call until close_client(). Must
+    be called on the event loop that serves those calls for its whole life.
+    """
+    global _pooled_client
+    if _pooled_client is None:
+        _pooled_client = _new_client()
+
+
+async def close_client():
+    """Close the pooled client, if open."""
+    global _pooled_client
+    client, _pooled_client = _pooled_client, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def _client():
+    if _pooled_client is not None:
+        yield _pooled_client
+    else:
+        async with _new_client() as client:
+            yield client
+
+
+async def _send(method, path, json=None):
+    async with _client() as client:
+        response = await client.request(method, path, json=json)
+    if response.status_code >= 500:
+        raise _ServerError(f'Gateway responded with {response.status_code}')
+
+    payload = response.json()
+    if response.status_code >= 400:
+        error = payload.get('error', {}) if isinstance(payload, dict) else {}
+        if str(error.get('code', '')).upper() == 'GATEWAY_ERROR':
+            # Upstream (bank / network) failure, same as the SDK's GatewayError
+            raise _ServerError(error.get('description') or 'Gateway error')
+        raise PaymentGatewayError(error.get('description') or f'Gateway responded with {response.status_code}')
+    return payload
+
+
+async def _call(method, path, json=None, idempotent=False):
+    """Send a request with retries (idempotent calls only) and the circuit breaker."""
+    breaker = get_breaker()
+    if not breaker.allow():
+        raise GatewayUnavailable('Payment gateway is temporarily unavailable')
+
+    attempts = 1 + (settings.RAZORPAY_MAX_RETRIES if idempotent else 0)
+    for attempt in range(attempts):
+        try:
+            result = await _send(method, path, json=json)
+        except PaymentGatewayError:
+            # The gateway answered, it just refused the request
+            breaker.record_success()
+            raise
+        except (_ServerError, *TRANSIENT_ERRORS) as e:
+            error = e
+            if attempt + 1 < attempts:
+                await asyncio.sleep(backoff_delay(attempt))
+        else:
+            breaker.record_success()
+            return result
+
+    breaker.record_failure()
+    raise GatewayUnavailable(f"Payment gateway request failed: {str(error) or type(error).__name__}") from error
+
+
+async def create_order(amount, currency='INR', receipt=None):
+    """Async counterpart of razorpay_client.create_order (not retried)."""
+    order_data = {
+        'amount': amount,
+        'currency': currency,
+    }
+    if receipt:
+        order_data['receipt'] = receipt
+
+    return await _call('POST', '/orders', json=order_data)
+
+
+async def get_payment_details(payment_id):
+    """Async counterpart of razorpay_client.get_payment_details."""
+    return await _call('GET', f'/payments/{payment_id}', idempotent=True)
+
+
+async def get_order_payments(razorpay_order_id):
+    """Async counterpart of razorpay_client.get_order_payments."""
+    response = await _call('GET', f'/orders/{razorpay_order_id}/payments', idempotent=True)
+    return response.get('items', [])
@@ -0,0 +1,156 @@
+"""
+Async versions of the Razorpay create-order and verify-payment endpoints.
+
+These are native Django async views (DRF function views are sync only), so
+under an ASGI server (e.g. ``gunicorn ecommerce.asgi:application -k
+uvicorn.workers.UvicornWorker``) the outbound gateway call no longer holds a
+worker for the whole round trip. Request and response bodies match the sync
+endpoints.
+"""
+
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from orders.models import Order
+from .async_client import create_order
+from .models import Payment
+from .razorpay_client import GatewayUnavailable, verify_payment_signature
+from .serializers import CreateOrderSerializer, VerifyPaymentSerializer
+from .services import amount_error, mark_payment_captured, mark_payment_failed, payable_amount
+
+
+async def _authenticate(request):
+    """Return the JWT-authenticated user, or None."""
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def _unauthorized():
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+def _parse_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+@csrf_exempt
+@require_POST
+async def create_razorpay_order(request):
+    """
+    Create a Razorpay order for payment processing.
+    Same payload as the sync create-order endpoint.
+    """
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+
+    serializer = CreateOrderSerializer(data=_parse_body(request))
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    currency = serializer.validated_data.get('currency', 'INR')
+    order_id = serializer.validated_data.get('order_id')
+
+    order_instance = None
+    if order_id:
+        try:
+            order_instance = await Order.objects.aget(id=order_id, user=user)
+        except Order.DoesNotExist:
+            return JsonResponse({'error': 'Order not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    amount = await sync_to_async(payable_amount)(user, order_instance)
+    error = amount_error(amount, serializer.validated_data.get('amount'))
+    if error:
+        return JsonResponse(error, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        razorpay_order = await create_order(
+            amount=int(amount * 100),
+            currency=currency,
+            receipt=f"receipt_{uuid.uuid4().hex[:8]}"
+        )
+    except GatewayUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as e:
+        return JsonResponse(
+            {'error': f'Failed to create order: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    payment = await Payment.objects.acreate(
+        razorpay_order_id=razorpay_order['id'],
+        amount=amount,
+        currency=currency,
+        user=user,
+        order=order_instance
+    )
+
+    return JsonResponse({
+        'order_id': razorpay_order['id'],
+        'amount': razorpay_order['amount'],
+        'currency': razorpay_order['currency'],
+        'receipt': razorpay_order['receipt'],
+        'status': razorpay_order['status'],
+        'payment_id': payment.id
+    }, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+async def verify_payment(request):
+    """
+    Verify Razorpay payment signature and update payment status.
+    Same payload as the sync verify-payment endpoint.
+    """
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+
+    serializer = VerifyPaymentSerializer(data=_parse_body(request))
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    razorpay_order_id = serializer.validated_data['razorpay_order_id']
+    razorpay_payment_id = serializer.validated_data['razorpay_payment_id']
+    razorpay_signature = serializer.validated_data['razorpay_signature']
+
+    try:
+        payment = await Payment.objects.aget(razorpay_order_id=razorpay_order_id, user=user)
+    except Payment.DoesNotExist:
+        return JsonResponse({'error': 'Payment not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Local HMAC check, no gateway round trip
+    if verify_payment_signature(razorpay_order_id, razorpay_payment_id, razorpay_signature):
+        await sync_to_async(mark_payment_captured)(payment.id, razorpay_payment_id, razorpay_signature)
+        await payment.arefresh_from_db()
+        return JsonResponse({
+            'success': True,
+            'message': 'Payment verified successfully',
+            'payment_id': payment.id,
+            'status': payment.status
+        }, status=status.HTTP_200_OK)
+
+    await sync_to_async(mark_payment_failed)(payment.id)
+    await payment.arefresh_from_db()
+    return JsonResponse({
+        'success': False,
+        'message': 'Payment verification failed',
+        'status': payment.status
+    }, status=status.HTTP_400_BAD_REQUEST)
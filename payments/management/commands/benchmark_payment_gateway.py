@@ -0,0 +1,94 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from payments import async_client, razorpay_client
+from payments.stub_server import StubRazorpayServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare create-order throughput of the sync client (one call per worker) '
+        'and the async client (many calls in flight on one event loop) against '
+        'the stub gateway with simulated latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Orders to create per run')
+        parser.add_argument('--latency', type=float, default=0.5, help='Simulated gateway latency in seconds')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Sync workers, i.e. blocking gateway calls in flight at once'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=100,
+            help='Gateway calls in flight at once on the single async event loop'
+        )
+
+    def handle(self, *args, **options):
+        with StubRazorpayServer(latency=options['latency']) as stub, override_settings(
+            RAZORPAY_BASE_URL=stub.base_url,
+            RAZORPAY_POOL_SIZE=max(options['workers'], 10),
+            RAZORPAY_ASYNC_MAX_CONNECTIONS=options['concurrency'],
+        ):
+            razorpay_client.reset_client()
+            try:
+                self.stdout.write(
+                    f"Creating {options['requests']} orders against the stub gateway "
+                    f"({options['latency'] * 1000:.0f} ms latency)\n"
+                )
+                sync_result = self.run_sync(options['requests'], options['workers'])
+                self.report(f"sync, {options['workers']} workers", *sync_result)
+
+                async_result = asyncio.run(self.run_async(options['requests'], options['concurrency']))
+                self.report(f"async, 1 process, {options['concurrency']} in flight", *async_result)
+            finally:
+                razorpay_client.reset_client()
+
+        speedup = sync_result[0] / async_result[0] if async_result[0] else 0
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Async throughput is {speedup:.1f}x the sync workers'))
+
+    def run_sync(self, total, workers):
+        def timed_call(_):
+            started = time.perf_counter()
+            razorpay_client.create_order(amount=10000)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(timed_call, range(total)))
+        return time.perf_counter() - started, latencies
+
+    async def run_async(self, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed_call():
+            async with semaphore:
+                started = time.perf_counter()
+                await async_client.create_order(amount=10000)
+                return time.perf_counter() - started
+
+        await async_client.open_client()
+        started = time.perf_counter()
+        try:
+            latencies = await asyncio.gather(*(timed_call() for _ in range(total)))
+        finally:
+            await async_client.close_client()
+        return time.perf_counter() - started, latencies
+
+    def report(self, label, elapsed, latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f'{label:<34} {len(latencies) / elapsed:8.1f} req/s   '
+            f'total {elapsed:6.2f}s   p50 {statistics.median(latencies) * 1000:6.0f} ms   '
+            f'p95 {p95 * 1000:6.0f} ms'
+        )
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.reconciliation import reconcile_payments
+
+
+class Command(BaseCommand):
+    help = 'Reconcile stale pending payments with their status on Razorpay'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=settings.PAYMENT_RECONCILE_AFTER_MINUTES,
+            help='Only check payments pending for at least this many minutes'
+        )
+        parser.add_argument('--chunk-size', type=int, default=100, help='Payments fetched per database query')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.PAYMENT_RECONCILE_CONCURRENCY,
+            help='Maximum concurrent gateway requests'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without saving them')
+
+    def handle(self, *args, **options):
+        report = reconcile_payments(
+            older_than_minutes=options['older_than'],
+            chunk_size=options['chunk_size'],
+            concurrency=options['concurrency'],
+            dry_run=options['dry_run'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Checked {report['checked']} pending payments: "
+            f"{report['completed']} completed, {report['failed']} failed, "
+            f"{report['unchanged']} still pending, {report['errors']} errors"
+        ))
+
+        if report['mismatches']:
+            self.stdout.write(self.style.WARNING(f"\n⚠️  {len(report['mismatches'])} mismatches:"))
+            for payment, reason in report['mismatches']:
+                self.stdout.write(f"  Payment #{payment.id} ({payment.razorpay_order_id}): {reason}")
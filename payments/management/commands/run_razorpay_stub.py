@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from payments.stub_server import StubRazorpayServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local stub of the Razorpay API for tests and load runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=9010, help='Port to listen on (default: 9010)')
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds to delay every response')
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.0,
+            help='Share of requests (0-1) answered with a 503'
+        )
+        parser.add_argument('--verbose-requests', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        stub = StubRazorpayServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            failure_rate=options['failure_rate'],
+            verbose=options['verbose_requests'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'🧪 Razorpay stub listening on {stub.base_url}'))
+        self.stdout.write(f'Set RAZORPAY_BASE_URL={stub.base_url} to use it')
+
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('\nStopping stub server')
+        finally:
+            stub.httpd.server_close()
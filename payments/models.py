@@ -39,6 +39,9 @@ class Payment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='payment_status_created_idx'),
+        ]
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
     
@@ -48,4 +51,34 @@ class Payment(models.Model):
     @property
     def amount_in_paise(self):
         """Convert amount to paise for Razorpay."""
-        return int(self.amount * 100)
\ No newline at end of file
+        return int(self.amount * 100)
+
+class PaymentWebhookEvent(models.Model):
+    """
+    Raw Razorpay webhook delivery, stored before processing.
+    The unique event_id makes redeliveries of the same event a no-op.
+    """
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    event_id = models.CharField(max_length=255, unique=True)
+    event = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Payment Webhook Event'
+        verbose_name_plural = 'Payment Webhook Events'
+
+    def __str__(self):
+        return f"Webhook {self.event_id} ({self.event}) - {self.status}"
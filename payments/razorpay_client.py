@@ -1,85 +1,243 @@
 """
 Razorpay client wrapper for Django application.
 Handles Razorpay API interactions for payment processing.
+
+The underlying ``razorpay.Client`` is created lazily and shares one pooled
+``requests.Session``. Every call gets explicit connect/read timeouts,
+idempotent (GET) calls are retried with jittered exponential backoff, and a
+circuit breaker fails fast while the gateway is unhealthy.
 """
 
+import logging
+import random
+import threading
+import time
+
 import razorpay
+import requests
 from django.conf import settings
 from decouple import config
+from razorpay.errors import BadRequestError, GatewayError, ServerError, SignatureVerificationError
+from requests.adapters import HTTPAdapter
 
-# Initialize Razorpay client with environment variables
+logger = logging.getLogger(__name__)
+
+# Razorpay credentials from environment variables
 RAZORPAY_KEY_ID = config('RAZORPAY_KEY_ID', default='rzp_live_RLH4P9d5sBsA4S')
 RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='oNikoihBTX45Q45wnRWO5QUc')
 
-# Create Razorpay client instance
-client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+# Failures worth retrying (for idempotent calls) and counting towards the breaker.
+# JSONDecodeError covers non-JSON error pages from proxies in front of the API;
+# GatewayError is Razorpay's upstream (bank / network) failure.
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.JSONDecodeError, ServerError, GatewayError)
+
+
+class PaymentGatewayError(Exception):
+    """Raised when Razorpay rejects a request."""
+
+
+class GatewayUnavailable(PaymentGatewayError):
+    """Raised when Razorpay is unreachable, times out or the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``cooldown`` seconds. Afterwards a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the trial call still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning('Razorpay circuit opened after %s failures', self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_client = None
+_breaker = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared Razorpay client, creating it on first use."""
+    global _client, _breaker
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.RAZORPAY_POOL_SIZE,
+                    max_retries=0,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+
+                _breaker = CircuitBreaker(
+                    failure_threshold=settings.RAZORPAY_BREAKER_THRESHOLD,
+                    cooldown=settings.RAZORPAY_BREAKER_COOLDOWN,
+                )
+                _client = razorpay.Client(
+                    session=session,
+                    auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET),
+                    base_url=settings.RAZORPAY_BASE_URL,
+                )
+    return _client
+
+
+def get_breaker():
+    get_client()
+    return _breaker
+
+
+def reset_client():
+    """Drop the shared client and breaker (used after settings change, e.g. in tests)."""
+    global _client, _breaker
+    with _client_lock:
+        if _client is not None:
+            _client.session.close()
+        _client = None
+        _breaker = None
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff delay for the given retry attempt."""
+    ceiling = settings.RAZORPAY_RETRY_BACKOFF * (2 ** attempt)
+    return random.uniform(0, min(ceiling, settings.RAZORPAY_RETRY_BACKOFF_MAX))
+
+
+def _call(method, *args, idempotent=False, **kwargs):
+    """
+    Invoke a Razorpay resource method with timeouts, retries (idempotent
+    calls only) and the circuit breaker.
+    """
+    breaker = get_breaker()
+    if not breaker.allow():
+        raise GatewayUnavailable('Payment gateway is temporarily unavailable')
+
+    timeout = (settings.RAZORPAY_CONNECT_TIMEOUT, settings.RAZORPAY_READ_TIMEOUT)
+    attempts = 1 + (settings.RAZORPAY_MAX_RETRIES if idempotent else 0)
+
+    for attempt in range(attempts):
+        try:
+            result = method(*args, timeout=timeout, **kwargs)
+        except BadRequestError as e:
+            # The gateway answered, it just refused the request
+            breaker.record_success()
+            raise PaymentGatewayError(str(e))
+        except TRANSIENT_ERRORS as e:
+            error = e
+            if attempt + 1 < attempts:
+                time.sleep(backoff_delay(attempt))
+        except Exception as e:
+            # Anything else from the SDK must not reach the views as a raw exception
+            breaker.record_failure()
+            raise GatewayUnavailable(f"Payment gateway request failed: {str(e) or type(e).__name__}") from e
+        else:
+            breaker.record_success()
+            return result
+
+    breaker.record_failure()
+    raise GatewayUnavailable(f"Payment gateway request failed: {str(error) or type(error).__name__}") from error
+
 
 def create_order(amount, currency='INR', receipt=None):
     """
     Create a Razorpay order.
-    
+
     Args:
         amount (int): Amount in paise (e.g., 10000 for ₹100)
         currency (str): Currency code (default: INR)
         receipt (str): Receipt ID for the order
-    
+
     Returns:
         dict: Razorpay order response
     """
-    try:
-        order_data = {
-            'amount': amount,
-            'currency': currency,
-        }
-        
-        if receipt:
-            order_data['receipt'] = receipt
-            
-        order = client.order.create(data=order_data)
-        return order
-    except Exception as e:
-        raise Exception(f"Failed to create Razorpay order: {str(e)}")
+    order_data = {
+        'amount': amount,
+        'currency': currency,
+    }
+
+    if receipt:
+        order_data['receipt'] = receipt
+
+    # Not retried: a timed out create may still have created the order
+    return _call(get_client().order.create, data=order_data)
 
 def verify_payment_signature(razorpay_order_id, razorpay_payment_id, razorpay_signature):
     """
     Verify Razorpay payment signature.
-    
+
     Args:
         razorpay_order_id (str): Order ID from Razorpay
         razorpay_payment_id (str): Payment ID from Razorpay
         razorpay_signature (str): Signature from Razorpay
-    
+
     Returns:
         bool: True if signature is valid, False otherwise
     """
+    # Local HMAC check, no network call involved
     try:
-        # Create the signature string
-        signature_data = f"{razorpay_order_id}|{razorpay_payment_id}"
-        
-        # Verify the signature
-        is_valid = client.utility.verify_payment_signature({
+        return get_client().utility.verify_payment_signature({
             'razorpay_order_id': razorpay_order_id,
             'razorpay_payment_id': razorpay_payment_id,
             'razorpay_signature': razorpay_signature
         })
-        
-        return is_valid
-    except Exception as e:
-        print(f"Signature verification failed: {str(e)}")
+    except SignatureVerificationError as e:
+        logger.warning('Signature verification failed: %s', e)
         return False
 
 def get_payment_details(payment_id):
     """
     Get payment details from Razorpay.
-    
+
     Args:
         payment_id (str): Payment ID from Razorpay
-    
+
     Returns:
         dict: Payment details from Razorpay
     """
-    try:
-        payment = client.payment.fetch(payment_id)
-        return payment
-    except Exception as e:
-        raise Exception(f"Failed to fetch payment details: {str(e)}")
+    return _call(get_client().payment.fetch, payment_id, idempotent=True)
+
+def get_order_payments(razorpay_order_id):
+    """
+    Get the payments made against a Razorpay order.
+
+    Args:
+        razorpay_order_id (str): Order ID from Razorpay
+
+    Returns:
+        list: Payment dicts for the order
+    """
+    response = _call(get_client().order.payments, razorpay_order_id, idempotent=True)
+    return response.get('items', [])
@@ -0,0 +1,152 @@
+"""
+Reconcile stale pending payments with Razorpay.
+
+Pending payments older than a cutoff are paged through by primary key
+(keyset pagination) in chunks. For each chunk the Razorpay order's payments
+are fetched concurrently on a bounded thread pool, and the resulting status
+changes are written back with one bulk update per table. Orders moved to
+paid get the same ``order_status`` stream event a save would send.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.signals import announce_order_statuses
+from orders.models import Order
+from .models import Payment
+from .razorpay_client import PaymentGatewayError, get_order_payments
+
+logger = logging.getLogger(__name__)
+
+
+def _fetch(payment):
+    try:
+        return payment, get_order_payments(payment.razorpay_order_id), None
+    except PaymentGatewayError as e:
+        return payment, None, str(e)
+    except Exception as e:
+        # One bad answer must not abort the whole run
+        logger.exception('Unexpected error fetching Razorpay order %s', payment.razorpay_order_id)
+        return payment, None, str(e) or type(e).__name__
+
+
+def _resolve(payment, gateway_payments, report):
+    """Decide the new status of a payment from the gateway's view of its order."""
+    captured = [item for item in gateway_payments if item.get('status') == 'captured']
+    if captured:
+        if len(captured) > 1:
+            report['mismatches'].append((payment, f'{len(captured)} captured payments for one order'))
+        item = captured[0]
+        if item.get('amount') != payment.amount_in_paise:
+            report['mismatches'].append(
+                (payment, f"captured {item.get('amount')} paise, expected {payment.amount_in_paise}")
+            )
+            return None
+        return 'completed', item['id']
+
+    if gateway_payments and all(item.get('status') == 'failed' for item in gateway_payments):
+        return 'failed', gateway_payments[-1]['id']
+
+    # No attempt yet, or one still in progress (created / authorized)
+    return None
+
+
+def reconcile_payments(older_than_minutes=30, chunk_size=100, concurrency=8, dry_run=False, log=None):
+    """
+    Bring stale pending payments in line with Razorpay.
+
+    Returns a report dict with counts and a ``mismatches`` list of
+    (payment, reason) tuples that need a human look.
+    """
+    cutoff = timezone.now() - timedelta(minutes=older_than_minutes)
+    report = {'checked': 0, 'completed': 0, 'failed': 0, 'unchanged': 0, 'errors': 0, 'mismatches': []}
+    affected_days = set()
+    affected_orders = set()
+    last_id = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            chunk = list(
+                Payment.objects.filter(status='pending', created_at__lt=cutoff, id__gt=last_id)
+                .order_by('id')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            changed = []
+            for payment, gateway_payments, error in executor.map(_fetch, chunk):
+                report['checked'] += 1
+                if error:
+                    report['errors'] += 1
+                    report['mismatches'].append((payment, f'gateway error: {error}'))
+                    continue
+
+                outcome = _resolve(payment, gateway_payments, report)
+                if outcome is None:
+                    report['unchanged'] += 1
+                    continue
+
+                payment.status, payment.razorpay_payment_id = outcome
+                payment.updated_at = timezone.now()
+                changed.append(payment)
+
+            if changed and not dry_run:
+                with transaction.atomic():
+                    # Skip rows the webhook or verify endpoint settled meanwhile
+                    still_pending = set(
+                        Payment.objects.select_for_update()
+                        .filter(id__in=[payment.id for payment in changed], status='pending')
+                        .values_list('id', flat=True)
+                    )
+                    report['unchanged'] += sum(1 for payment in changed if payment.id not in still_pending)
+                    changed = [payment for payment in changed if payment.id in still_pending]
+                    paid_order_ids = [
+                        payment.order_id for payment in changed
+                        if payment.status == 'completed' and payment.order_id
+                    ]
+                    Payment.objects.bulk_update(changed, ['status', 'razorpay_payment_id', 'updated_at'])
+                    paid_orders = list(
+                        Order.objects.select_for_update()
+                        .filter(id__in=paid_order_ids, status='pending')
+                        .values_list('id', 'user_id')
+                    )
+                    Order.objects.filter(id__in=[order_id for order_id, _ in paid_orders]).update(
+                        status='paid', updated_at=timezone.now()
+                    )
+                    # The bulk update skips the post_save receiver that pushes these
+                    announce_order_statuses([(order_id, user_id, 'paid') for order_id, user_id in paid_orders])
+                affected_orders.update(paid_order_ids)
+
+            for payment in changed:
+                report[payment.status] += 1
+                affected_days.add(timezone.localtime(payment.created_at).date())
+
+            if log:
+                log(f"Checked {report['checked']} payments (last id {last_id})")
+
+    if not dry_run and affected_days:
+        _refresh_dashboard_figures(affected_days, affected_orders)
+
+    return report
+
+
+def _refresh_dashboard_figures(days, order_ids):
+    """
+    Bulk updates bypass the signals that maintain the dashboard rollups and
+    leaderboards, so rebuild the days touched by this run.
+    """
+    from admin_dashboard.leaderboards import rebuild_leaderboards
+    from admin_dashboard.rollups import rebuild_rollups
+
+    for created_at in Order.objects.filter(id__in=order_ids).values_list('created_at', flat=True):
+        days.add(timezone.localtime(created_at).date())
+
+    for day in sorted(days):
+        rebuild_rollups(day, day)
+    if order_ids:
+        rebuild_leaderboards()
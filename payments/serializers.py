@@ -7,10 +7,34 @@ from .models import Payment
 
 class CreateOrderSerializer(serializers.Serializer):
     """Serializer for creating Razorpay orders."""
-    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=1)
+    amount = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=1,
+        required=False,
+        help_text="Optional; must match the server-side amount when given"
+    )
     currency = serializers.CharField(max_length=3, default='INR')
     order_id = serializers.IntegerField(required=False, help_text="Order ID to associate with payment")
 
+class CheckoutSerializer(serializers.Serializer):
+    """Serializer for the one-shot checkout."""
+    address_id = serializers.IntegerField()
+    amount = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=1,
+        required=False,
+        help_text="Optional; must match the cart total when given"
+    )
+    currency = serializers.CharField(max_length=3, default='INR')
+
+    def validate_address_id(self, value):
+        user = self.context['request'].user
+        if not user.addresses.filter(id=value).exists():
+            raise serializers.ValidationError("Invalid address for this user.")
+        return value
+
 class VerifyPaymentSerializer(serializers.Serializer):
     """Serializer for verifying Razorpay payments."""
     razorpay_order_id = serializers.CharField(max_length=255)
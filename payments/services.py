@@ -0,0 +1,79 @@
+"""
+Payment helpers shared by the sync and async views and the webhook worker.
+
+The state transitions lock the payment row and are idempotent, so the
+browser callback and a webhook for the same payment can race safely.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+
+from carts.models import Cart
+from carts.quotes import get_cart_quote
+from .models import Payment
+
+
+def payable_amount(user, order=None):
+    """
+    Amount to charge, computed server-side: the order total when paying for
+    an existing order, otherwise the quoted total of the user's cart.
+    """
+    if order is not None:
+        amount = order.total
+    else:
+        cart = Cart.objects.filter(user=user).first()
+        amount = get_cart_quote(cart)['total'] if cart else Decimal('0')
+    return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def amount_error(amount, claimed_amount=None):
+    """Error payload if the amount can't be charged or differs from the client's, else None."""
+    if amount <= 0:
+        return {'error': 'Nothing to pay: the cart is empty'}
+    if claimed_amount is not None and claimed_amount != amount:
+        return {'error': 'Amount does not match the order total', 'expected_amount': str(amount)}
+    return None
+
+
+@transaction.atomic
+def mark_payment_captured(payment_id, razorpay_payment_id, razorpay_signature=None):
+    """
+    Mark a payment completed and its order paid.
+    Returns False if the payment was already completed.
+    """
+    payment = Payment.objects.select_for_update().select_related('order').get(pk=payment_id)
+    if payment.status == 'completed':
+        return False
+
+    payment.razorpay_payment_id = razorpay_payment_id
+    if razorpay_signature:
+        payment.razorpay_signature = razorpay_signature
+    payment.status = 'completed'
+    payment.save()
+
+    # Only move pending orders forward; never undo shipping or a cancellation
+    order = payment.order
+    if order and order.status == 'pending':
+        order.status = 'paid'
+        order.save()
+
+    return True
+
+
+@transaction.atomic
+def mark_payment_failed(payment_id, razorpay_payment_id=None):
+    """
+    Mark a payment failed unless it already completed (a failed attempt can be
+    followed by a successful retry on the same Razorpay order).
+    Returns False if nothing changed.
+    """
+    payment = Payment.objects.select_for_update().get(pk=payment_id)
+    if payment.status in ('completed', 'failed'):
+        return False
+
+    if razorpay_payment_id and not payment.razorpay_payment_id:
+        payment.razorpay_payment_id = razorpay_payment_id
+    payment.status = 'failed'
+    payment.save()
+    return True
@@ -0,0 +1,222 @@
+"""
+Local stand-in for the Razorpay API, for tests and load runs.
+
+Implements the endpoints the client layer uses:
+
+    POST /v1/orders
+    GET  /v1/orders/<order_id>
+    GET  /v1/orders/<order_id>/payments
+    GET  /v1/payments/<payment_id>
+
+Latency and failures can be injected: ``latency`` delays every response,
+``failure_rate`` answers a random share of requests with a 503 and
+``fail_next`` answers the next N requests with a 503. Injected failures carry
+the error code ``failure_code`` (``SERVER_ERROR``, or e.g. ``GATEWAY_ERROR``
+to mimic an upstream bank failure, answered with a 400 like Razorpay does).
+
+Run it with ``python manage.py run_razorpay_stub`` and point
+RAZORPAY_BASE_URL at ``http://127.0.0.1:<port>/v1``, or start it in-process:
+
+    with StubRazorpayServer(latency=0.5) as stub:
+        ...  # stub.base_url
+"""
+
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ORDER_PATH = re.compile(r'^/v1/orders/(?P<order_id>[\w-]+)$')
+ORDER_PAYMENTS_PATH = re.compile(r'^/v1/orders/(?P<order_id>[\w-]+)/payments$')
+PAYMENT_PATH = re.compile(r'^/v1/payments/(?P<payment_id>[\w-]+)$')
+
+
+def sign_payment(razorpay_order_id, razorpay_payment_id, secret):
+    """Signature Razorpay Checkout returns for a successful payment."""
+    message = f"{razorpay_order_id}|{razorpay_payment_id}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'RazorpayStub/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        stub = self.server.stub
+        path = self.path.split('?', 1)[0]
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        stub.count_request(method, path)
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.should_fail():
+            status_code = 503 if stub.failure_code == 'SERVER_ERROR' else 400
+            return self._error(status_code, stub.failure_code, 'Injected failure from the stub server')
+
+        if method == 'POST' and path == '/v1/orders':
+            try:
+                data = json.loads(body or b'{}')
+            except ValueError:
+                return self._error(400, 'BAD_REQUEST_ERROR', 'Invalid JSON body')
+            if not isinstance(data.get('amount'), int) or data['amount'] < 100:
+                return self._error(400, 'BAD_REQUEST_ERROR', 'The amount must be atleast INR 1.00')
+            return self._send(200, stub.create_order(data))
+
+        if method == 'GET':
+            match = ORDER_PAYMENTS_PATH.match(path)
+            if match:
+                payments = stub.order_payments(match['order_id'])
+                if payments is None:
+                    return self._error(400, 'BAD_REQUEST_ERROR', 'The id provided does not exist')
+                return self._send(200, {'entity': 'collection', 'count': len(payments), 'items': payments})
+
+            match = ORDER_PATH.match(path)
+            if match:
+                return self._send_object(stub.orders.get(match['order_id']))
+
+            match = PAYMENT_PATH.match(path)
+            if match:
+                return self._send_object(stub.payments.get(match['payment_id']))
+
+        return self._error(404, 'BAD_REQUEST_ERROR', 'The requested URL was not found on the server.')
+
+    def _send(self, status_code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting (e.g. read timeout)
+            pass
+
+    def _send_object(self, obj):
+        if obj is None:
+            return self._error(400, 'BAD_REQUEST_ERROR', 'The id provided does not exist')
+        return self._send(200, obj)
+
+    def _error(self, status_code, code, description):
+        self._send(status_code, {'error': {'code': code, 'description': description}})
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for load runs that open many connections at once
+    request_queue_size = 256
+
+
+class StubRazorpayServer:
+    """In-memory Razorpay API served from a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, verbose=False):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_next = 0
+        self.failure_code = 'SERVER_ERROR'
+        self.verbose = verbose
+        self.orders = {}
+        self.payments = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+        self.httpd = StubHTTPServer((host, port), StubRequestHandler)
+        self.httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count_request(self, method, path):
+        with self._lock:
+            self.requests.append((method, path))
+
+    def should_fail(self):
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return True
+        return bool(self.failure_rate) and random.random() < self.failure_rate
+
+    def create_order(self, data):
+        order = {
+            'id': f'order_{uuid.uuid4().hex[:14]}',
+            'entity': 'order',
+            'amount': data['amount'],
+            'amount_paid': 0,
+            'amount_due': data['amount'],
+            'currency': data.get('currency', 'INR'),
+            'receipt': data.get('receipt'),
+            'status': 'created',
+            'attempts': 0,
+            'notes': data.get('notes', []),
+            'created_at': int(time.time()),
+        }
+        with self._lock:
+            self.orders[order['id']] = order
+        return order
+
+    def order_payments(self, order_id):
+        with self._lock:
+            if order_id not in self.orders:
+                return None
+            return [payment for payment in self.payments.values() if payment['order_id'] == order_id]
+
+    def add_payment(self, order_id, status='captured', amount=None):
+        """Record a payment against an order, as if the customer paid at checkout."""
+        with self._lock:
+            order = self.orders[order_id]
+            payment = {
+                'id': f'pay_{uuid.uuid4().hex[:14]}',
+                'entity': 'payment',
+                'amount': amount if amount is not None else order['amount'],
+                'currency': order['currency'],
+                'status': status,
+                'order_id': order_id,
+                'method': 'upi',
+                'captured': status == 'captured',
+                'created_at': int(time.time()),
+            }
+            self.payments[payment['id']] = payment
+            order['attempts'] += 1
+            if status == 'captured':
+                order['status'] = 'paid'
+                order['amount_paid'] = payment['amount']
+                order['amount_due'] = order['amount'] - payment['amount']
+            return payment
@@ -0,0 +1,76 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Payment, PaymentWebhookEvent
+from .services import mark_payment_captured, mark_payment_failed
+
+logger = logging.getLogger(__name__)
+
+HANDLED_EVENTS = ('payment.captured', 'payment.failed')
+
+
+@shared_task
+def process_webhook_event(event_pk):
+    """Apply a stored Razorpay webhook event to its Payment and Order"""
+    with transaction.atomic():
+        try:
+            event = PaymentWebhookEvent.objects.select_for_update().get(pk=event_pk)
+        except PaymentWebhookEvent.DoesNotExist:
+            return 'Event not found'
+
+        if event.status in ('processed', 'ignored'):
+            return f'Event {event.event_id} already {event.status}'
+
+        event.attempts += 1
+        try:
+            with transaction.atomic():
+                event.status, event.error = _apply_event(event)
+        except Exception as e:
+            logger.exception('Failed to process Razorpay webhook %s', event.event_id)
+            event.status, event.error = 'failed', str(e)
+        event.processed_at = timezone.now()
+        event.save(update_fields=['status', 'error', 'attempts', 'processed_at'])
+
+    return f'Event {event.event_id} {event.status}'
+
+
+def _apply_event(event):
+    """Return the (status, error) the event ends up in."""
+    if event.event not in HANDLED_EVENTS:
+        return 'ignored', f'Unhandled event type {event.event}'
+
+    entity = event.payload.get('payload', {}).get('payment', {}).get('entity', {})
+    payment = Payment.objects.filter(razorpay_order_id=entity.get('order_id')).first()
+    if payment is None:
+        return 'ignored', f"No payment for Razorpay order {entity.get('order_id')}"
+
+    if event.event == 'payment.failed':
+        mark_payment_failed(payment.pk, entity.get('id'))
+        return 'processed', ''
+
+    if entity.get('amount') != payment.amount_in_paise:
+        return 'failed', f"Captured amount {entity.get('amount')} does not match {payment.amount_in_paise}"
+
+    mark_payment_captured(payment.pk, entity.get('id'))
+    return 'processed', ''
+
+
+@shared_task
+def reconcile_pending_payments():
+    """Settle payments left pending by dropped checkouts and missed webhooks"""
+    from .reconciliation import reconcile_payments
+
+    report = reconcile_payments(
+        older_than_minutes=settings.PAYMENT_RECONCILE_AFTER_MINUTES,
+        concurrency=settings.PAYMENT_RECONCILE_CONCURRENCY,
+    )
+    for payment, reason in report['mismatches']:
+        logger.warning('Payment %s (%s) mismatch: %s', payment.id, payment.razorpay_order_id, reason)
+    return (
+        f"Checked {report['checked']}: {report['completed']} completed, "
+        f"{report['failed']} failed, {len(report['mismatches'])} mismatches"
+    )
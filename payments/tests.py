@@ -1,3 +1,524 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from carts.models import Cart, CartItem
+from orders.models import Order
+from products.models import Product
+from users.models import Address, User
+from . import async_client, razorpay_client, reconciliation
+from .models import Payment, PaymentWebhookEvent
+from .reconciliation import reconcile_payments
+from .razorpay_client import GatewayUnavailable, PaymentGatewayError
+from .stub_server import StubRazorpayServer, sign_payment
+from .tasks import process_webhook_event
+
+
+class StubGatewayMixin:
+    """Point the Razorpay client at a fresh in-process stub server."""
+
+    def start_stub(self):
+        self.stub = StubRazorpayServer().start()
+        self.addCleanup(self.stub.stop)
+
+        overrides = override_settings(
+            RAZORPAY_BASE_URL=self.stub.base_url,
+            RAZORPAY_READ_TIMEOUT=0.5,
+            RAZORPAY_MAX_RETRIES=2,
+            RAZORPAY_RETRY_BACKOFF=0.01,
+            RAZORPAY_BREAKER_THRESHOLD=2,
+            RAZORPAY_BREAKER_COOLDOWN=60,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        razorpay_client.reset_client()
+        self.addCleanup(razorpay_client.reset_client)
+
+
+class RazorpayClientTests(StubGatewayMixin, SimpleTestCase):
+    """Client layer against the local stub server."""
+
+    def setUp(self):
+        self.start_stub()
+
+    def test_create_order_and_fetch_payments(self):
+        order = razorpay_client.create_order(amount=10000, receipt='receipt_1')
+        self.assertEqual(order['amount'], 10000)
+        self.assertEqual(order['status'], 'created')
+
+        payment = self.stub.add_payment(order['id'])
+        self.assertEqual(razorpay_client.get_order_payments(order['id']), [payment])
+        self.assertEqual(razorpay_client.get_payment_details(payment['id'])['status'], 'captured')
+
+    def test_bad_request_is_not_retried(self):
+        with self.assertRaises(PaymentGatewayError) as ctx:
+            razorpay_client.get_payment_details('pay_missing')
+
+        self.assertNotIsInstance(ctx.exception, GatewayUnavailable)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_idempotent_calls_are_retried(self):
+        order = razorpay_client.create_order(amount=10000)
+        self.stub.fail_next = 2
+
+        self.assertEqual(razorpay_client.get_order_payments(order['id']), [])
+        self.assertEqual(len(self.stub.requests), 4)
+
+    def test_create_order_is_not_retried(self):
+        self.stub.fail_next = 1
+
+        with self.assertRaises(GatewayUnavailable):
+            razorpay_client.create_order(amount=10000)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_timeout_raises_gateway_unavailable(self):
+        self.stub.latency = 1
+
+        with self.assertRaises(GatewayUnavailable):
+            razorpay_client.create_order(amount=10000)
+
+    def test_circuit_opens_and_fails_fast(self):
+        self.stub.fail_next = 2
+        for _ in range(2):
+            with self.assertRaises(GatewayUnavailable):
+                razorpay_client.create_order(amount=10000)
+
+        with self.assertRaises(GatewayUnavailable):
+            razorpay_client.create_order(amount=10000)
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_half_open_trial_closes_circuit(self):
+        breaker = razorpay_client.get_breaker()
+        self.stub.fail_next = 2
+        for _ in range(2):
+            with self.assertRaises(GatewayUnavailable):
+                razorpay_client.create_order(amount=10000)
+        self.assertEqual(breaker.state, breaker.OPEN)
+
+        breaker.opened_at -= breaker.cooldown
+        razorpay_client.create_order(amount=10000)
+        self.assertEqual(breaker.state, breaker.CLOSED)
+
+    def test_gateway_error_counts_as_failure(self):
+        self.stub.failure_code = 'GATEWAY_ERROR'
+        self.stub.fail_next = 1
+
+        with self.assertRaises(GatewayUnavailable):
+            razorpay_client.create_order(amount=10000)
+        self.assertEqual(razorpay_client.get_breaker().failures, 1)
+
+        # Retried like any transient failure on idempotent calls
+        order = razorpay_client.create_order(amount=10000)
+        self.stub.fail_next = 1
+        self.assertEqual(razorpay_client.get_order_payments(order['id']), [])
+
+    def test_unexpected_sdk_error_is_mapped(self):
+        method = mock.Mock(side_effect=razorpay_client.SignatureVerificationError('unexpected'))
+
+        with self.assertRaises(GatewayUnavailable):
+            razorpay_client._call(method)
+        self.assertEqual(razorpay_client.get_breaker().failures, 1)
+
+    def test_verify_payment_signature(self):
+        signature = sign_payment('order_1', 'pay_1', razorpay_client.RAZORPAY_KEY_SECRET)
+
+        self.assertTrue(razorpay_client.verify_payment_signature('order_1', 'pay_1', signature))
+        self.assertFalse(razorpay_client.verify_payment_signature('order_1', 'pay_2', signature))
+
+
+@override_settings(RAZORPAY_WEBHOOK_SECRET='webhook-secret')
+class RazorpayWebhookTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='buyer@example.com', name='Buyer', password='password')
+        address = Address.objects.create(
+            user=self.user, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+        self.order = Order.objects.create(user=self.user, address=address, total=Decimal('250.00'))
+        self.payment = Payment.objects.create(
+            razorpay_order_id='order_test1', amount=Decimal('250.00'), user=self.user, order=self.order
+        )
+
+        # Run the task inline instead of sending it to the broker
+        patcher = mock.patch.object(process_webhook_event, 'delay', side_effect=process_webhook_event)
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post_event(self, event, event_id='evt_1', amount=25000, secret='webhook-secret'):
+        body = json.dumps({
+            'event': event,
+            'payload': {'payment': {'entity': {
+                'id': 'pay_test1', 'order_id': 'order_test1', 'amount': amount, 'status': event.split('.')[1],
+            }}},
+        }).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('razorpay_webhook'), body, content_type='application/json',
+                HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id,
+            )
+
+    def test_invalid_signature_is_rejected(self):
+        response = self.post_event('payment.captured', secret='wrong')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaymentWebhookEvent.objects.exists())
+        self.delay.assert_not_called()
+
+    def test_captured_event_marks_payment_and_order_paid(self):
+        response = self.post_event('payment.captured')
+
+        self.assertEqual(response.status_code, 200)
+        self.payment.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.payment.status, 'completed')
+        self.assertEqual(self.payment.razorpay_payment_id, 'pay_test1')
+        self.assertEqual(self.order.status, 'paid')
+        self.assertEqual(PaymentWebhookEvent.objects.get().status, 'processed')
+
+    def test_redelivered_event_is_deduplicated(self):
+        self.post_event('payment.captured')
+        response = self.post_event('payment.captured')
+
+        self.assertEqual(response.data['status'], 'duplicate')
+        self.assertEqual(self.delay.call_count, 1)
+        self.assertEqual(PaymentWebhookEvent.objects.get().attempts, 1)
+
+    def test_failed_event_after_capture_keeps_payment_completed(self):
+        self.post_event('payment.captured')
+        self.post_event('payment.failed', event_id='evt_2')
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'completed')
+
+    def test_amount_mismatch_is_not_captured(self):
+        self.post_event('payment.captured', amount=100)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'pending')
+        self.assertEqual(PaymentWebhookEvent.objects.get().status, 'failed')
+
+
+class ReconcilePaymentsTests(StubGatewayMixin, TestCase):
+
+    def setUp(self):
+        self.start_stub()
+        self.user = User.objects.create_user(email='buyer@example.com', name='Buyer', password='password')
+        self.address = Address.objects.create(
+            user=self.user, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+
+    def create_pending(self, amount=Decimal('100.00'), minutes_ago=60):
+        order = Order.objects.create(user=self.user, address=self.address, total=amount)
+        gateway_order = self.stub.create_order({'amount': int(amount * 100)})
+        payment = Payment.objects.create(
+            razorpay_order_id=gateway_order['id'], amount=amount, user=self.user, order=order
+        )
+        Payment.objects.filter(pk=payment.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return payment
+
+    def test_reconciles_captured_failed_and_unpaid(self):
+        captured = self.create_pending()
+        failed = self.create_pending()
+        unpaid = self.create_pending()
+        recent = self.create_pending(minutes_ago=1)
+        self.stub.add_payment(captured.razorpay_order_id)
+        self.stub.add_payment(failed.razorpay_order_id, status='failed')
+        self.stub.add_payment(recent.razorpay_order_id)
+
+        report = reconcile_payments(older_than_minutes=30, chunk_size=2, concurrency=2)
+
+        self.assertEqual(report['checked'], 3)
+        self.assertEqual((report['completed'], report['failed'], report['unchanged']), (1, 1, 1))
+        statuses = dict(Payment.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[captured.id], 'completed')
+        self.assertEqual(statuses[failed.id], 'failed')
+        self.assertEqual(statuses[unpaid.id], 'pending')
+        self.assertEqual(statuses[recent.id], 'pending')
+        self.assertEqual(Order.objects.get(pk=captured.order_id).status, 'paid')
+
+    def test_unexpected_error_does_not_abort_the_run(self):
+        broken = self.create_pending()
+        captured = self.create_pending()
+        self.stub.add_payment(captured.razorpay_order_id)
+        real_fetch = razorpay_client.get_order_payments
+
+        def fetch(razorpay_order_id):
+            if razorpay_order_id == broken.razorpay_order_id:
+                raise razorpay_client.GatewayError('upstream failure')
+            return real_fetch(razorpay_order_id)
+
+        with mock.patch('payments.reconciliation.get_order_payments', side_effect=fetch):
+            report = reconcile_payments(concurrency=1)
+
+        self.assertEqual((report['errors'], report['completed']), (1, 1))
+        self.assertEqual(Payment.objects.get(pk=captured.pk).status, 'completed')
+
+    def test_payments_settled_meanwhile_count_as_unchanged(self):
+        settled = self.create_pending()
+        self.stub.add_payment(settled.razorpay_order_id)
+        real_resolve = reconciliation._resolve
+
+        def resolve(payment, gateway_payments, report):
+            # The webhook settles the payment while the run is in flight
+            Payment.objects.filter(pk=payment.pk).update(status='completed')
+            return real_resolve(payment, gateway_payments, report)
+
+        with mock.patch('payments.reconciliation._resolve', side_effect=resolve):
+            report = reconcile_payments()
+
+        self.assertEqual((report['checked'], report['completed'], report['unchanged']), (1, 0, 1))
+
+    def test_paid_orders_are_pushed_to_streams(self):
+        payment = self.create_pending()
+        self.stub.add_payment(payment.razorpay_order_id)
+
+        with mock.patch('notifications.bus.publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            reconcile_payments()
+
+        publish.assert_called_once_with(
+            self.user.id, 'order_status', {'order_id': payment.order_id, 'status': 'paid'}
+        )
+
+    def test_amount_mismatch_is_reported_not_applied(self):
+        payment = self.create_pending()
+        self.stub.add_payment(payment.razorpay_order_id, amount=500)
+
+        report = reconcile_payments()
+
+        self.assertEqual(len(report['mismatches']), 1)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+
+    def test_dry_run_does_not_write(self):
+        payment = self.create_pending()
+        self.stub.add_payment(payment.razorpay_order_id)
+
+        report = reconcile_payments(dry_run=True)
+
+        self.assertEqual(report['completed'], 1)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+
+
+class AsyncPaymentViewTests(StubGatewayMixin, TestCase):
+
+    def setUp(self):
+        self.start_stub()
+        self.user = User.objects.create_user(email='buyer@example.com', name='Buyer', password='password')
+        product = Product.objects.create(title='Cold pressed oil', description='1 litre', price=Decimal('50.00'), stock=10)
+        CartItem.objects.create(cart=Cart.objects.create(user=self.user), product=product, quantity=2)
+        self.auth_headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def post(self, name, data, headers=None):
+        return self.async_client.post(
+            reverse(name), data, content_type='application/json',
+            headers=self.auth_headers if headers is None else headers,
+        )
+
+    async def test_create_order_requires_authentication(self):
+        response = await self.post('async_create_razorpay_order', {'amount': '100.00'}, headers={})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_create_and_verify_payment(self):
+        response = await self.post('async_create_razorpay_order', {'amount': '100.00'})
+        self.assertEqual(response.status_code, 201)
+        razorpay_order_id = response.json()['order_id']
+        self.assertEqual(response.json()['amount'], 10000)
+
+        signature = sign_payment(razorpay_order_id, 'pay_async1', razorpay_client.RAZORPAY_KEY_SECRET)
+        response = await self.post('async_verify_payment', {
+            'razorpay_order_id': razorpay_order_id,
+            'razorpay_payment_id': 'pay_async1',
+            'razorpay_signature': signature,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        payment = await Payment.objects.aget(razorpay_order_id=razorpay_order_id)
+        self.assertEqual(payment.status, 'completed')
+
+    async def test_gateway_outage_returns_503(self):
+        self.stub.fail_next = 1
+        response = await self.post('async_create_razorpay_order', {'amount': '100.00'})
+        self.assertEqual(response.status_code, 503)
+
+    async def test_gateway_error_returns_503(self):
+        self.stub.failure_code = 'GATEWAY_ERROR'
+        self.stub.fail_next = 1
+        response = await self.post('async_create_razorpay_order', {'amount': '100.00'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(razorpay_client.get_breaker().failures, 1)
+
+
+class AsyncClientLifetimeTests(StubGatewayMixin, SimpleTestCase):
+    """One pooled client under the ASGI lifespan, one closed client per call otherwise."""
+
+    def setUp(self):
+        self.start_stub()
+        self.created = []
+        new_client = async_client._new_client
+
+        def record():
+            self.created.append(new_client())
+            return self.created[-1]
+
+        patcher = mock.patch.object(async_client, '_new_client', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_calls_without_a_lifespan_close_their_client(self):
+        await async_client.create_order(amount=100)
+        await async_client.create_order(amount=200)
+
+        self.assertEqual(len(self.created), 2)
+        self.assertTrue(all(client.is_closed for client in self.created))
+
+    async def test_lifespan_shares_one_client_for_the_app(self):
+        from ecommerce.asgi import application
+
+        events, sent = asyncio.Queue(), []
+
+        async def send(message):
+            sent.append(message['type'])
+
+        server = asyncio.create_task(application({'type': 'lifespan'}, events.get, send))
+        await events.put({'type': 'lifespan.startup'})
+        while not sent:
+            await asyncio.sleep(0)
+
+        await async_client.create_order(amount=100)
+        await async_client.create_order(amount=200)
+        self.assertEqual(len(self.created), 1)
+        self.assertFalse(self.created[0].is_closed)
+
+        await events.put({'type': 'lifespan.shutdown'})
+        await server
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertTrue(self.created[0].is_closed)
+
+
+class CartQuotePaymentTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='buyer@example.com', name='Buyer', password='password')
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(
+            title='Cold pressed oil', description='1 litre', price=Decimal('50.00'), stock=10
+        )
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+
+    def test_quote_follows_cart_and_price_changes(self):
+        self.assertEqual(self.cart.total, Decimal('100.00'))
+
+        self.product.price = Decimal('40.00')
+        self.product.save()
+        self.assertEqual(self.cart.total, Decimal('80.00'))
+
+        item = self.cart.cart_items.get()
+        item.quantity = 3
+        item.save()
+        self.assertEqual(self.cart.total, Decimal('120.00'))
+
+    def test_client_amount_must_match_quote(self):
+        with mock.patch('payments.views.create_order') as create_order:
+            response = self.client.post(reverse('create_razorpay_order'), {'amount': '1.00'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['expected_amount'], '100.00')
+        create_order.assert_not_called()
+
+    def test_amount_is_computed_server_side(self):
+        gateway_order = {'id': 'order_q1', 'amount': 10000, 'currency': 'INR', 'receipt': 'r', 'status': 'created'}
+        with mock.patch('payments.views.create_order', return_value=gateway_order) as create_order:
+            response = self.client.post(reverse('create_razorpay_order'), {}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(create_order.call_args.kwargs['amount'], 10000)
+        self.assertEqual(Payment.objects.get().amount, Decimal('100.00'))
+
+
+class CheckoutTests(StubGatewayMixin, TestCase):
+
+    def setUp(self):
+        self.start_stub()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='buyer@example.com', name='Buyer', password='password')
+        self.client.force_authenticate(self.user)
+        self.address = Address.objects.create(
+            user=self.user, street_address='1 Main St', city='Chennai', state='TN', postal_code='600001'
+        )
+        self.product = Product.objects.create(
+            title='Cold pressed oil', description='1 litre', price=Decimal('50.00'), stock=10
+        )
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+
+    def checkout(self, **data):
+        return self.client.post(reverse('checkout'), {'address_id': self.address.id, **data}, format='json')
+
+    def test_checkout_creates_order_payment_and_gateway_order(self):
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        payment = Payment.objects.get()
+        self.assertEqual(order.total, Decimal('100.00'))
+        self.assertEqual(payment.order, order)
+        self.assertEqual(response.data['razorpay_order']['amount'], 10000)
+        self.assertIn(payment.razorpay_order_id, self.stub.orders)
+        self.assertFalse(self.cart.cart_items.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 8)
+
+    def test_order_items_record_what_was_charged(self):
+        loose = Product.objects.create(title='Loose rice', description='Per kg', price=Decimal('33.34'), stock=10)
+        CartItem.objects.create(cart=self.cart, product=loose, quantity=2, custom_quantity=Decimal('1.5'), custom_unit='kg')
+
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        items = order.order_items.order_by('id')
+        self.assertEqual(
+            [(item.quantity, item.price, item.subtotal) for item in items],
+            [(2, Decimal('50.00'), Decimal('100.00')), (2, Decimal('33.34'), Decimal('50.01'))]
+        )
+        # The quoted total, not one rebuilt from rounded unit prices
+        self.assertEqual(order.total, Decimal('150.01'))
+        self.assertEqual(response.data['razorpay_order']['amount'], 15001)
+
+    def test_gateway_failure_cancels_order_and_keeps_cart(self):
+        self.stub.fail_next = 1
+
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(Order.objects.get().status, 'cancelled')
+        self.assertFalse(Payment.objects.exists())
+        self.assertTrue(self.cart.cart_items.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 10)
+
+    def test_insufficient_stock_places_nothing(self):
+        Product.objects.filter(pk=self.product.pk).update(stock=1)
+
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(len(self.stub.requests), 0)
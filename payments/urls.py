@@ -3,11 +3,15 @@ Payment URLs for Razorpay integration.
 """
 
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('create-order/', views.create_razorpay_order, name='create_razorpay_order'),
+    path('checkout/', views.checkout, name='checkout'),
     path('verify-payment/', views.verify_payment, name='verify_payment'),
+    path('async/create-order/', async_views.create_razorpay_order, name='async_create_razorpay_order'),
+    path('async/verify-payment/', async_views.verify_payment, name='async_verify_payment'),
+    path('webhook/', views.razorpay_webhook, name='razorpay_webhook'),
     path('details/<int:payment_id>/', views.get_payment_details, name='get_payment_details'),
     path('user-payments/', views.get_user_payments, name='get_user_payments'),
 ]
@@ -2,18 +2,27 @@
 Payment views for Razorpay integration.
 """
 
+import hashlib
+import hmac
+import json
 import uuid
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from django.conf import settings
+from django.db import transaction
 from decouple import config
 
-from .models import Payment
-from .serializers import CreateOrderSerializer, VerifyPaymentSerializer, PaymentSerializer
-from .razorpay_client import create_order, verify_payment_signature
+from .models import Payment, PaymentWebhookEvent
+from .serializers import CheckoutSerializer, CreateOrderSerializer, VerifyPaymentSerializer, PaymentSerializer
+from .razorpay_client import GatewayUnavailable, PaymentGatewayError, create_order, verify_payment_signature
+from .services import amount_error, mark_payment_captured, mark_payment_failed, payable_amount
+from .tasks import process_webhook_event
+from carts.models import Cart
 from orders.models import Order
+from orders.serializers import OrderSerializer
+from orders.services import CheckoutError, cancel_order, place_order
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -21,9 +30,12 @@ def create_razorpay_order(request):
     """
     Create a Razorpay order for payment processing.
     
+    The amount is computed server-side from the order total (when order_id
+    is given) or the user's cart quote.
+    
     Expected payload:
     {
-        "amount": 100.00,
+        "amount": 100.00 (optional, rejected if it differs),
         "currency": "INR",
         "order_id": 123 (optional)
     }
@@ -34,10 +46,25 @@ def create_razorpay_order(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        amount = serializer.validated_data['amount']
         currency = serializer.validated_data.get('currency', 'INR')
         order_id = serializer.validated_data.get('order_id')
         
+        # Get order instance if order_id provided
+        order_instance = None
+        if order_id:
+            try:
+                order_instance = Order.objects.get(id=order_id, user=request.user)
+            except Order.DoesNotExist:
+                return Response(
+                    {'error': 'Order not found'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        
+        amount = payable_amount(request.user, order_instance)
+        error = amount_error(amount, serializer.validated_data.get('amount'))
+        if error:
+            return Response(error, status=status.HTTP_400_BAD_REQUEST)
+        
         # Convert amount to paise for Razorpay
         amount_in_paise = int(amount * 100)
         
@@ -51,17 +78,6 @@ def create_razorpay_order(request):
             receipt=receipt_id
         )
         
-        # Get order instance if order_id provided
-        order_instance = None
-        if order_id:
-            try:
-                order_instance = Order.objects.get(id=order_id, user=request.user)
-            except Order.DoesNotExist:
-                return Response(
-                    {'error': 'Order not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        
         # Create payment record
         payment = Payment.objects.create(
             razorpay_order_id=razorpay_order['id'],
@@ -83,12 +99,100 @@ def create_razorpay_order(request):
         
         return Response(response_data, status=status.HTTP_201_CREATED)
         
+    except GatewayUnavailable as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
     except Exception as e:
         return Response(
             {'error': f'Failed to create order: {str(e)}'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def checkout(request):
+    """
+    Place an order from the user's cart and create its Razorpay order in one
+    request.
+    
+    The order, its items and the stock decrements are committed first; the
+    gateway call runs outside that transaction. If it fails the order is
+    cancelled and restocked, and the cart is left untouched for a retry.
+    
+    Expected payload:
+    {
+        "address_id": 1,
+        "amount": 100.00 (optional, rejected if it differs from the cart total),
+        "currency": "INR"
+    }
+    """
+    serializer = CheckoutSerializer(data=request.data, context={'request': request})
+    
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    user = request.user
+    currency = serializer.validated_data['currency']
+    cart = Cart.objects.filter(user=user).first()
+    
+    amount = payable_amount(user)
+    error = amount_error(amount, serializer.validated_data.get('amount'))
+    if error:
+        return Response(error, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        address = user.addresses.get(id=serializer.validated_data['address_id'])
+        order = place_order(user, address, cart, clear_cart=False)
+    except CheckoutError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Charge exactly what the order was placed for
+    amount = payable_amount(user, order)
+    
+    try:
+        razorpay_order = create_order(
+            amount=int(amount * 100),
+            currency=currency,
+            receipt=f"order_{order.id}"
+        )
+    except Exception as e:
+        # Compensate: release the stock and keep the cart for a retry
+        cancel_order(order)
+        if isinstance(e, GatewayUnavailable):
+            status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        elif isinstance(e, PaymentGatewayError):
+            status_code = status.HTTP_502_BAD_GATEWAY
+        else:
+            status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return Response(
+            {'error': f'Failed to create payment: {str(e)}', 'order_id': order.id}, 
+            status=status_code
+        )
+    
+    with transaction.atomic():
+        payment = Payment.objects.create(
+            razorpay_order_id=razorpay_order['id'],
+            amount=amount,
+            currency=currency,
+            user=user,
+            order=order
+        )
+        cart.cart_items.all().delete()
+    
+    return Response({
+        'order': OrderSerializer(order).data,
+        'payment_id': payment.id,
+        'razorpay_order': {
+            'order_id': razorpay_order['id'],
+            'amount': razorpay_order['amount'],
+            'currency': razorpay_order['currency'],
+            'receipt': razorpay_order['receipt'],
+            'status': razorpay_order['status'],
+        }
+    }, status=status.HTTP_201_CREATED)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def verify_payment(request):
@@ -132,16 +236,8 @@ def verify_payment(request):
         )
         
         if is_signature_valid:
-            # Update payment record
-            payment.razorpay_payment_id = razorpay_payment_id
-            payment.razorpay_signature = razorpay_signature
-            payment.status = 'completed'
-            payment.save()
-            
-            # Update order status if payment is associated with an order
-            if payment.order:
-                payment.order.status = 'confirmed'
-                payment.order.save()
+            mark_payment_captured(payment.id, razorpay_payment_id, razorpay_signature)
+            payment.refresh_from_db()
             
             return Response({
                 'success': True,
@@ -150,9 +246,8 @@ def verify_payment(request):
                 'status': payment.status
             }, status=status.HTTP_200_OK)
         else:
-            # Update payment status to failed
-            payment.status = 'failed'
-            payment.save()
+            mark_payment_failed(payment.id)
+            payment.refresh_from_db()
             
             return Response({
                 'success': False,
@@ -166,6 +261,60 @@ def verify_payment(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def razorpay_webhook(request):
+    """
+    Receive Razorpay webhooks.
+    
+    The X-Razorpay-Signature header must be the HMAC-SHA256 of the raw body
+    with RAZORPAY_WEBHOOK_SECRET. The event is stored and acknowledged right
+    away; a Celery worker applies it. Redeliveries are deduplicated on the
+    X-Razorpay-Event-Id header.
+    """
+    body = request.body
+    secret = settings.RAZORPAY_WEBHOOK_SECRET
+    received_signature = request.headers.get('X-Razorpay-Signature', '')
+    
+    if not secret:
+        return Response(
+            {'error': 'Webhook secret not configured'}, 
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    
+    expected_signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected_signature, received_signature):
+        return Response(
+            {'error': 'Invalid signature'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return Response(
+            {'error': 'Invalid JSON payload'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Fall back to a digest of the body if the event id header is missing
+    event_id = request.headers.get('X-Razorpay-Event-Id') or hashlib.sha256(body).hexdigest()
+    
+    with transaction.atomic():
+        event, created = PaymentWebhookEvent.objects.get_or_create(
+            event_id=event_id,
+            defaults={'event': payload.get('event', ''), 'payload': payload}
+        )
+        # Re-enqueue redeliveries of events that have not been applied yet
+        if created or event.status in ('received', 'failed'):
+            transaction.on_commit(lambda: process_webhook_event.delay(event.id))
+    
+    return Response(
+        {'status': 'received' if created else 'duplicate'}, 
+        status=status.HTTP_200_OK
+    )
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_payment_details(request, payment_id):
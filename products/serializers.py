@@ -17,13 +17,16 @@ class ProductSerializer(serializers.ModelSerializer):
     category_id = serializers.IntegerField(write_only=True)
     image_url = serializers.SerializerMethodField()
     default_variation = serializers.SerializerMethodField()
+    # Only present when the view annotates it (?with_wishlist=true)
+    is_wishlisted = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Product
         fields = [
             'id', 'title', 'description', 'price', 'original_price', 'offer_price',
             'stock', 'unit', 'product_type', 'is_in_stock', 'image', 'image_url', 'category', 'category_id', 
-            'created_at', 'updated_at', 'has_offer', 'discount_percentage', 'default_variation'
+            'created_at', 'updated_at', 'has_offer', 'discount_percentage', 'default_variation',
+            'is_wishlisted'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'has_offer', 'discount_percentage', 'default_variation']
     
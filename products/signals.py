@@ -0,0 +1,51 @@
+"""
+Purge the CDN / proxy copies of product, category and variation responses
+when those objects change (see ecommerce/surrogate.py).
+
+The category a product was loaded with is remembered on the instance
+(post_init), so moving a product purges the responses of both categories.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from ecommerce import surrogate
+from .models import Category, Product, ProductVariation
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category(sender, instance, created=False, **kwargs):
+    keys = [surrogate.category_key(instance.pk)]
+    if created or kwargs['signal'] is post_delete:
+        keys.append(surrogate.CATEGORIES)
+    surrogate.purge(keys)
+
+
+@receiver(post_init, sender=Product)
+def remember_loaded_category(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred category_id is not loaded
+    instance._surrogate_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def purge_product(sender, instance, created=False, **kwargs):
+    keys = [surrogate.product_key(instance.pk)]
+    if created or kwargs['signal'] is post_delete:
+        keys.append(surrogate.PRODUCTS)
+    previous_category_id = getattr(instance, '_surrogate_category_id', None)
+    if instance.category_id != previous_category_id:
+        keys += [surrogate.category_key(previous_category_id), surrogate.category_key(instance.category_id)]
+        instance._surrogate_category_id = instance.category_id
+    surrogate.purge(keys)
+
+
+@receiver(post_save, sender=ProductVariation)
+@receiver(post_delete, sender=ProductVariation)
+def purge_variation(sender, instance, created=False, **kwargs):
+    # Product responses embed the default variation
+    keys = [surrogate.variation_key(instance.pk), surrogate.product_key(instance.product_id)]
+    if created or kwargs['signal'] is post_delete:
+        keys.append(surrogate.VARIATIONS)
+    surrogate.purge(keys)
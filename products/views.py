@@ -6,9 +6,12 @@ from django.db.models import Q, F
 from .models import Category, Product, ProductVariation
 from .serializers import CategorySerializer, ProductSerializer, ProductVariationSerializer, ProductWithVariationsSerializer
 from .permissions import IsAdminUser
+from wishlist.models import WishlistItem
+from ecommerce import surrogate
+from ecommerce.surrogate import SurrogateKeyMixin
 
 
-class CategoryViewSet(generics.ListCreateAPIView):
+class CategoryViewSet(SurrogateKeyMixin, generics.ListCreateAPIView):
     """Category views equivalent to Rails CategoriesController"""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -16,6 +19,10 @@ class CategoryViewSet(generics.ListCreateAPIView):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    surrogate_collection_key = surrogate.CATEGORIES
+
+    def object_surrogate_keys(self, obj):
+        return [surrogate.category_key(obj.pk)]
     
     def get_permissions(self):
         if self.request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
@@ -23,10 +30,13 @@ class CategoryViewSet(generics.ListCreateAPIView):
         return [permissions.AllowAny()]
 
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(SurrogateKeyMixin, generics.RetrieveUpdateDestroyAPIView):
     """Category detail view"""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+
+    def object_surrogate_keys(self, obj):
+        return [surrogate.category_key(obj.pk)]
     
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
@@ -34,7 +44,7 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.AllowAny()]
 
 
-class ProductViewSet(generics.ListCreateAPIView):
+class ProductViewSet(SurrogateKeyMixin, generics.ListCreateAPIView):
     """Product views equivalent to Rails ProductsController"""
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -43,6 +53,10 @@ class ProductViewSet(generics.ListCreateAPIView):
     search_fields = ['title', 'description', 'category__name']
     ordering_fields = ['title', 'price', 'created_at', 'stock', 'original_price']
     ordering = ['-created_at']
+    surrogate_collection_key = surrogate.PRODUCTS
+
+    def object_surrogate_keys(self, obj):
+        return [surrogate.product_key(obj.pk), surrogate.category_key(obj.category_id)]
     
     def get_queryset(self):
         queryset = Product.objects.select_related('category').all()
@@ -95,19 +109,40 @@ class ProductViewSet(generics.ListCreateAPIView):
                 Q(category__name__icontains=search_query)
             )
         
+        # Opt-in wishlist flag, one EXISTS subquery instead of a check request per card
+        if self.with_wishlist:
+            queryset = queryset.annotate(is_wishlisted=WishlistItem.is_wishlisted_annotation(self.request))
+        
         return queryset
     
+    @property
+    def with_wishlist(self):
+        return self.request.query_params.get('with_wishlist', '').lower() == 'true'
+    
+    def surrogate_keys(self):
+        # Per-user answers must not be shared by a proxy
+        return [] if self.with_wishlist else super().surrogate_keys()
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method == 'GET' and self.with_wishlist:
+            response['Cache-Control'] = 'private'
+        return response
+    
     def get_permissions(self):
         if self.request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
             return [IsAdminUser()]
         return [permissions.AllowAny()]
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailView(SurrogateKeyMixin, generics.RetrieveUpdateDestroyAPIView):
     """Product detail view"""
     queryset = Product.objects.select_related('category').all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def object_surrogate_keys(self, obj):
+        return [surrogate.product_key(obj.pk), surrogate.category_key(obj.category_id)]
     
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
@@ -115,14 +150,17 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.AllowAny()]
 
 
-class ProductWithVariationsDetailView(generics.RetrieveAPIView):
+class ProductWithVariationsDetailView(SurrogateKeyMixin, generics.RetrieveAPIView):
     """Product detail view with variations"""
     queryset = Product.objects.select_related('category').prefetch_related('variations').all()
     serializer_class = ProductWithVariationsSerializer
     permission_classes = [permissions.AllowAny]
 
+    def object_surrogate_keys(self, obj):
+        return [surrogate.product_key(obj.pk), surrogate.category_key(obj.category_id)]
+
 
-class ProductVariationViewSet(generics.ListCreateAPIView):
+class ProductVariationViewSet(SurrogateKeyMixin, generics.ListCreateAPIView):
     """Product variation views"""
     serializer_class = ProductVariationSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -130,6 +168,10 @@ class ProductVariationViewSet(generics.ListCreateAPIView):
     filterset_fields = ['product', 'unit', 'is_active']
     ordering_fields = ['quantity', 'price', 'created_at']
     ordering = ['quantity', 'unit']
+    surrogate_collection_key = surrogate.VARIATIONS
+
+    def object_surrogate_keys(self, obj):
+        return [surrogate.variation_key(obj.pk), surrogate.product_key(obj.product_id)]
     
     def get_queryset(self):
         queryset = ProductVariation.objects.select_related('product').all()
@@ -147,11 +189,14 @@ class ProductVariationViewSet(generics.ListCreateAPIView):
         return [permissions.AllowAny()]
 
 
-class ProductVariationDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductVariationDetailView(SurrogateKeyMixin, generics.RetrieveUpdateDestroyAPIView):
     """Product variation detail view"""
     queryset = ProductVariation.objects.select_related('product').all()
     serializer_class = ProductVariationSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def object_surrogate_keys(self, obj):
+        return [surrogate.variation_key(obj.pk), surrogate.product_key(obj.product_id)]
     
     def get_permissions(self):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:31
+
+from django.db import migrations
+
+
+def copy_wishlists_to_items(apps, schema_editor):
+    """
+    Make sure every product id in the User.wishlist JSON mirror has a
+    WishlistItem row before the column is dropped. Ids of deleted products
+    are skipped.
+    """
+    User = apps.get_model('users', 'User')
+    Product = apps.get_model('products', 'Product')
+    WishlistItem = apps.get_model('wishlist', 'WishlistItem')
+
+    users = User.objects.exclude(wishlist=[]).exclude(wishlist__isnull=True).only('id', 'wishlist')
+    for user in users.iterator(chunk_size=500):
+        wanted = {int(product_id) for product_id in user.wishlist if str(product_id).isdigit()}
+        if not wanted:
+            continue
+        existing = set(WishlistItem.objects.filter(user_id=user.id).values_list('product_id', flat=True))
+        missing = Product.objects.filter(id__in=wanted - existing).values_list('id', flat=True)
+        WishlistItem.objects.bulk_create([
+            WishlistItem(user_id=user.id, product_id=product_id) for product_id in missing
+        ])
+
+
+def copy_items_to_wishlists(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    WishlistItem = apps.get_model('wishlist', 'WishlistItem')
+
+    product_ids = {}
+    for user_id, product_id in WishlistItem.objects.filter(user__isnull=False).values_list('user_id', 'product_id'):
+        product_ids.setdefault(user_id, []).append(product_id)
+    for user_id, ids in product_ids.items():
+        User.objects.filter(id=user_id).update(wishlist=ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_username'),
+        ('products', '0010_product_is_in_stock'),
+        ('wishlist', '0003_wishlistitem_session_product_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_wishlists_to_items, copy_items_to_wishlists),
+        migrations.RemoveField(
+            model_name='user',
+            name='wishlist',
+        ),
+    ]
@@ -0,0 +1,86 @@
+"""
+Carry an anonymous shopper's session cart and wishlist over to their account
+when they log in or register.
+"""
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+
+from carts.models import Cart, CartItem
+from wishlist.models import WishlistItem
+
+
+@transaction.atomic
+def merge_session_into_user(session_key, user):
+    """
+    Move the cart items and wishlist entries of ``session_key`` to ``user``.
+
+    Everything is done with set-based statements, so the number of queries
+    does not depend on how many items the session holds. Rows are moved
+    rather than copied; where the user already has the product:
+
+    - cart: the quantities are added up when both rows are the same line
+      (same variation, or same product without a variation, and no custom
+      quantity), otherwise the user's row is kept;
+    - wishlist: the user's entry is kept.
+
+    The session's leftovers are deleted.
+    """
+    if not session_key:
+        return
+    _merge_cart(session_key, user)
+    _merge_wishlist(session_key, user)
+
+
+def _merge_cart(session_key, user):
+    session_cart_id = Cart.objects.filter(session_key=session_key, user=None).values_list('id', flat=True).first()
+    if session_cart_id is None:
+        return
+
+    user_cart_id = Cart.objects.filter(user=user).values_list('id', flat=True).first()
+    if user_cart_id is None:
+        # No cart yet: the session cart becomes the user's
+        Cart.objects.filter(id=session_cart_id).update(user=user, session_key=None, updated_at=timezone.now())
+        return
+
+    session_items = CartItem.objects.filter(cart_id=session_cart_id)
+    user_items = CartItem.objects.filter(cart_id=user_cart_id)
+    now = timezone.now()
+
+    # Same line in both carts: add the session quantity to the user's row.
+    # Variation rows are keyed on the variation (the cart API leaves their
+    # product empty), plain rows on the product.
+    variation_lines = session_items.filter(
+        product_variation=OuterRef('product_variation'), custom_quantity__isnull=True
+    )
+    plain_lines = session_items.filter(
+        product=OuterRef('product'), product_variation__isnull=True, custom_quantity__isnull=True
+    )
+    for rows, same_line in (
+        (user_items.filter(product_variation__isnull=False), variation_lines),
+        (user_items.filter(product_variation__isnull=True, product__isnull=False), plain_lines),
+    ):
+        rows.filter(Exists(same_line), custom_quantity__isnull=True).update(
+            quantity=F('quantity') + Subquery(same_line.values('quantity')[:1]),
+            updated_at=now,
+        )
+
+    # A cart holds one row per variation and per product; the user's row has
+    # absorbed the session one or wins over it
+    session_items.filter(
+        product_variation__in=user_items.filter(product_variation__isnull=False).values('product_variation')
+    ).delete()
+    session_items.filter(
+        product__in=user_items.filter(product__isnull=False).values('product')
+    ).delete()
+    session_items.update(cart_id=user_cart_id, updated_at=now)
+    Cart.objects.filter(id=session_cart_id).delete()
+
+
+def _merge_wishlist(session_key, user):
+    session_entries = WishlistItem.objects.filter(session_key=session_key, user=None)
+    session_entries.exclude(
+        product__in=WishlistItem.objects.filter(user=user).values('product')
+    ).update(user=user, session_key=None)
+    session_entries.delete()
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login, logout
 from .models import User, Address
+from .services import merge_session_into_user
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, UserUpdateSerializer,
     LoginSerializer, AddressSerializer
@@ -16,6 +17,7 @@ def register_view(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
+        merge_session_into_user(request.session.session_key, user)
         refresh = RefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
@@ -30,7 +32,10 @@ def login_view(request):
     serializer = LoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
+        # login() rotates the session key, read it first
+        session_key = request.session.session_key
         login(request, user)
+        merge_session_into_user(session_key, user)
         refresh = RefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
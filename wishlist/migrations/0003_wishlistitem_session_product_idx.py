@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-19 02:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_is_in_stock'),
+        ('wishlist', '0002_alter_wishlistitem_unique_together_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wishlistitem',
+            index=models.Index(fields=['session_key', 'product'], name='wishlist_session_product_idx'),
+        ),
+    ]
@@ -10,6 +10,10 @@ class WishlistItem(models.Model):
     class Meta:
         unique_together = ['user', 'product', 'session_key']
         ordering = ['-added_at']
+        indexes = [
+            # Anonymous lookups (the unique index above leads with user)
+            models.Index(fields=['session_key', 'product'], name='wishlist_session_product_idx'),
+        ]
     
     def __str__(self):
         if self.user:
@@ -17,6 +21,18 @@ class WishlistItem(models.Model):
         else:
             return f"Anonymous - {self.product.title}"
     
+    @classmethod
+    def owner_filter(cls, request):
+        """
+        Filter kwargs selecting the current user's or session's items, or
+        None for an anonymous visitor without a session (nothing saved yet).
+        """
+        if request.user.is_authenticated:
+            return {'user': request.user}
+        if request.session.session_key:
+            return {'session_key': request.session.session_key}
+        return None
+    
     @classmethod
     def get_or_create_wishlist_item(cls, request, product):
         """Get or create wishlist item for authenticated or anonymous user"""
@@ -57,13 +73,28 @@ class WishlistItem(models.Model):
     @classmethod
     def check_wishlist_status(cls, request, product_id):
         """Check if a product is in user's wishlist"""
-        if request.user.is_authenticated:
-            return cls.objects.filter(user=request.user, product_id=product_id).exists()
-        else:
-            # Ensure session exists and is saved
-            if not request.session.session_key:
-                request.session.create()
-                request.session.save()
-            
-            session_key = request.session.session_key
-            return cls.objects.filter(session_key=session_key, product_id=product_id).exists()
+        owner = cls.owner_filter(request)
+        if owner is None:
+            return False
+        return cls.objects.filter(product_id=product_id, **owner).exists()
+    
+    @classmethod
+    def wishlisted_product_ids(cls, request, product_ids):
+        """Return the subset of product_ids in the user's wishlist (one query)"""
+        owner = cls.owner_filter(request)
+        if owner is None or not product_ids:
+            return set()
+        return set(
+            cls.objects.filter(product_id__in=product_ids, **owner).values_list('product_id', flat=True)
+        )
+    
+    @classmethod
+    def is_wishlisted_annotation(cls, request, product_ref='pk'):
+        """
+        Exists() expression telling whether the product at ``product_ref``
+        (an OuterRef name) is in the user's wishlist, for queryset annotations.
+        """
+        owner = cls.owner_filter(request)
+        if owner is None:
+            return models.Value(False, output_field=models.BooleanField())
+        return models.Exists(cls.objects.filter(product=models.OuterRef(product_ref), **owner))
@@ -24,11 +24,6 @@ class WishlistItemSerializer(serializers.ModelSerializer):
         product = Product.objects.get(id=product_id)
         wishlist_item = WishlistItem.get_or_create_wishlist_item(request, product)
         
-        # Update user's wishlist field if authenticated
-        if request.user.is_authenticated and product_id not in request.user.wishlist:
-            request.user.wishlist.append(product_id)
-            request.user.save()
-        
         return wishlist_item
     
     def to_representation(self, instance):
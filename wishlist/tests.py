@@ -1,3 +1,214 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from carts.models import Cart, CartItem
+from products.models import Category, Product, ProductVariation
+from users.models import User
+from users.services import merge_session_into_user
+from .models import WishlistItem
+
+
+class WishlistBulkCheckTests(TestCase):
+    """Bulk wishlist status check and the opt-in is_wishlisted product flag."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='shopper@example.com', name='Shopper', password='password')
+        category = Category.objects.create(name='Oils')
+        self.products = [
+            Product.objects.create(title=f'Oil {i}', description='Cold pressed', price=100, stock=10, category=category)
+            for i in range(4)
+        ]
+        self.url = reverse('check_wishlist_status_bulk')
+
+    def test_bulk_check_for_user(self):
+        self.client.force_authenticate(self.user)
+        for product in self.products[:2]:
+            WishlistItem.objects.create(user=self.user, product=product)
+
+        ids = ','.join(str(product.id) for product in self.products)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'product_ids': ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['wishlisted'], sorted(p.id for p in self.products[:2]))
+
+    def test_bulk_check_for_anonymous_session(self):
+        # No session yet: nothing is wishlisted and no session is created
+        response = self.client.get(self.url, {'product_ids': str(self.products[0].id)})
+        self.assertEqual(response.data['wishlisted'], [])
+        self.assertNotIn('sessionid', response.cookies)
+
+        self.client.post(reverse('add_to_wishlist', args=[self.products[1].id]))
+        response = self.client.get(self.url, {'product_ids': f'{self.products[0].id},{self.products[1].id}'})
+        self.assertEqual(response.data['wishlisted'], [self.products[1].id])
+
+    def test_bulk_check_validation(self):
+        self.assertEqual(self.client.get(self.url, {'product_ids': '1,x'}).status_code, 400)
+        too_many = ','.join(str(i) for i in range(200))
+        self.assertEqual(self.client.get(self.url, {'product_ids': too_many}).status_code, 400)
+
+    def test_product_list_annotation_is_opt_in(self):
+        self.client.force_authenticate(self.user)
+        WishlistItem.objects.create(user=self.user, product=self.products[0])
+
+        response = self.client.get(reverse('products'))
+        self.assertNotIn('is_wishlisted', response.data['results'][0])
+        self.assertIn('Surrogate-Key', response)
+
+        response = self.client.get(reverse('products'), {'with_wishlist': 'true'})
+        flags = {item['id']: item['is_wishlisted'] for item in response.data['results']}
+        self.assertEqual(flags, {p.id: p == self.products[0] for p in self.products})
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertEqual(response['Cache-Control'], 'private')
+
+
+class WishlistToggleTests(TestCase):
+    """WishlistItem rows are the only record of a wishlist."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='shopper@example.com', name='Shopper', password='password')
+        category = Category.objects.create(name='Oils')
+        self.product = Product.objects.create(
+            title='Oil', description='Cold pressed', price=100, stock=10, category=category
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_remove_is_a_single_delete(self):
+        WishlistItem.objects.create(user=self.user, product=self.product)
+        with self.assertNumQueries(1):
+            response = self.client.delete(reverse('remove_from_wishlist', args=[self.product.id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(WishlistItem.objects.filter(user=self.user).exists())
+
+    def test_remove_missing_item(self):
+        response = self.client.delete(reverse('remove_from_wishlist', args=[self.product.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_add_does_not_touch_user_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('add_to_wishlist', args=[self.product.id]))
+        self.assertEqual(response.status_code, 201)
+        writes = [q['sql'] for q in queries if not q['sql'].startswith(('SELECT', 'SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('INSERT INTO "wishlist_wishlistitem"'))
+        self.assertTrue(WishlistItem.objects.filter(user=self.user, product=self.product).exists())
+
+
+class SessionMergeTests(TestCase):
+    """Session cart and wishlist move to the account at login / registration."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='shopper@example.com', name='Shopper', password='password')
+        category = Category.objects.create(name='Oils')
+        self.products = [
+            Product.objects.create(title=f'Oil {i}', description='Cold pressed', price=100, stock=10, category=category)
+            for i in range(3)
+        ]
+
+    def _anonymous_session(self):
+        # Wishlisting as a visitor creates the session
+        for product in self.products[:2]:
+            self.client.post(reverse('add_to_wishlist', args=[product.id]))
+        session_key = self.client.session.session_key
+        cart = Cart.objects.create(session_key=session_key)
+        for product in self.products[:2]:
+            CartItem.objects.create(cart=cart, product=product, quantity=2)
+        return session_key
+
+    def test_login_merges_into_existing_records(self):
+        self._anonymous_session()
+        WishlistItem.objects.create(user=self.user, product=self.products[0])
+        user_cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=user_cart, product=self.products[0], quantity=1)
+        CartItem.objects.create(cart=user_cart, product=self.products[2], quantity=1)
+
+        response = self.client.post(reverse('login'), {'email': 'shopper@example.com', 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+
+        quantities = dict(user_cart.cart_items.values_list('product_id', 'quantity'))
+        self.assertEqual(quantities, {self.products[0].id: 3, self.products[1].id: 2, self.products[2].id: 1})
+        self.assertEqual(Cart.objects.count(), 1)
+        self.assertEqual(
+            sorted(WishlistItem.objects.filter(user=self.user).values_list('product_id', flat=True)),
+            [self.products[0].id, self.products[1].id],
+        )
+        self.assertFalse(WishlistItem.objects.filter(user=None).exists())
+
+    def test_register_adopts_session_cart(self):
+        session_key = self._anonymous_session()
+        response = self.client.post(reverse('register'), {
+            'email': 'new@example.com', 'name': 'New', 'password': 'long-password-1',
+            'password_confirmation': 'long-password-1',
+        })
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email='new@example.com')
+        cart = Cart.objects.get(user=user)
+        self.assertIsNone(cart.session_key)
+        self.assertEqual(cart.cart_items.count(), 2)
+        self.assertEqual(WishlistItem.objects.filter(user=user).count(), 2)
+        self.assertFalse(Cart.objects.filter(session_key=session_key).exists())
+
+    def _variations(self):
+        return [
+            ProductVariation.objects.create(product=self.products[0], quantity=quantity, unit='ml', price=price, stock=10)
+            for quantity, price in ((250, 120), (500, 220))
+        ]
+
+    def test_merge_variation_rows(self):
+        # The cart API stores variation rows without a product
+        first, second = self._variations()
+        user_cart = Cart.objects.create(user=self.user)
+        session_cart = Cart.objects.create(session_key='visitor')
+        CartItem.objects.create(cart=user_cart, product_variation=first, quantity=1)
+        CartItem.objects.create(cart=session_cart, product_variation=first, quantity=2)
+        CartItem.objects.create(cart=session_cart, product_variation=second, quantity=1)
+
+        merge_session_into_user('visitor', self.user)
+
+        quantities = dict(user_cart.cart_items.values_list('product_variation_id', 'quantity'))
+        self.assertEqual(quantities, {first.id: 3, second.id: 1})
+        self.assertFalse(Cart.objects.filter(session_key='visitor').exists())
+
+    def test_login_with_same_variation_in_both_carts(self):
+        first, _ = self._variations()
+        response = self.client.post(reverse('cart_items'), {'product_variation_id': first.id, 'quantity': 2})
+        self.assertEqual(response.status_code, 201)
+        user_cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=user_cart, product_variation=first, quantity=1)
+
+        response = self.client.post(reverse('login'), {'email': 'shopper@example.com', 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+        item = user_cart.cart_items.get()
+        self.assertEqual((item.product_variation_id, item.quantity), (first.id, 3))
+
+    def test_register_with_variation_in_session_cart(self):
+        first, _ = self._variations()
+        self.client.post(reverse('cart_items'), {'product_variation_id': first.id, 'quantity': 2})
+        response = self.client.post(reverse('register'), {
+            'email': 'new@example.com', 'name': 'New', 'password': 'long-password-1',
+            'password_confirmation': 'long-password-1',
+        })
+        self.assertEqual(response.status_code, 201)
+        item = Cart.objects.get(user__email='new@example.com').cart_items.get()
+        self.assertEqual((item.product_variation_id, item.quantity), (first.id, 2))
+
+    def test_query_count_does_not_grow_with_items(self):
+        def queries_for(count):
+            session_key = f'session-{count}'
+            user = User.objects.create_user(email=f'{count}@example.com', name='Shopper', password='password')
+            user_cart = Cart.objects.create(user=user)
+            session_cart = Cart.objects.create(session_key=session_key)
+            for product in self.products[:count]:
+                CartItem.objects.create(cart=user_cart, product=product, quantity=1)
+                CartItem.objects.create(cart=session_cart, product=product, quantity=1)
+                WishlistItem.objects.create(session_key=session_key, product=product)
+            with CaptureQueriesContext(connection) as queries:
+                merge_session_into_user(session_key, user)
+            return len(queries)
+
+        self.assertEqual(queries_for(1), queries_for(3))
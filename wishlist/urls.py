@@ -5,5 +5,6 @@ urlpatterns = [
     path('', views.get_wishlist, name='get_wishlist'),
     path('add/<int:product_id>/', views.add_to_wishlist, name='add_to_wishlist'),
     path('remove/<int:product_id>/', views.remove_from_wishlist, name='remove_from_wishlist'),
+    path('check/', views.check_wishlist_status_bulk, name='check_wishlist_status_bulk'),
     path('check/<int:product_id>/', views.check_wishlist_status, name='check_wishlist_status'),
 ]
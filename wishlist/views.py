@@ -7,6 +7,9 @@ from .models import WishlistItem
 from .serializers import WishlistItemSerializer
 from products.models import Product
 
+# Upper bound on product ids per bulk status check (a few pages of product cards)
+MAX_BULK_CHECK_IDS = 100
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_wishlist(request):
@@ -33,11 +36,6 @@ def add_to_wishlist(request, product_id):
         # Create wishlist item
         wishlist_item = WishlistItem.get_or_create_wishlist_item(request, product)
         
-        # Update user's wishlist field if authenticated
-        if request.user.is_authenticated and product_id not in request.user.wishlist:
-            request.user.wishlist.append(product_id)
-            request.user.save()
-        
         serializer = WishlistItemSerializer(wishlist_item)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
         
@@ -52,33 +50,17 @@ def add_to_wishlist(request, product_id):
 def remove_from_wishlist(request, product_id):
     """Remove product from wishlist (authenticated or anonymous)"""
     try:
-        # Find and delete wishlist item
-        if request.user.is_authenticated:
-            wishlist_item = get_object_or_404(
-                WishlistItem, 
-                user=request.user, 
-                product_id=product_id
-            )
-        else:
-            # Ensure session exists and is saved
-            if not request.session.session_key:
-                request.session.create()
-                request.session.save()
-            
-            session_key = request.session.session_key
-            wishlist_item = get_object_or_404(
-                WishlistItem, 
-                session_key=session_key, 
-                product_id=product_id
+        # One DELETE statement, matched on the user or the session
+        owner = WishlistItem.owner_filter(request)
+        deleted = 0
+        if owner is not None:
+            deleted, _ = WishlistItem.objects.filter(product_id=product_id, **owner).delete()
+        if not deleted:
+            return Response(
+                {"detail": "Product is not in your wishlist"},
+                status=status.HTTP_404_NOT_FOUND
             )
         
-        wishlist_item.delete()
-        
-        # Update user's wishlist field if authenticated
-        if request.user.is_authenticated and product_id in request.user.wishlist:
-            request.user.wishlist.remove(product_id)
-            request.user.save()
-        
         return Response(status=status.HTTP_204_NO_CONTENT)
         
     except Exception as e:
@@ -93,3 +75,29 @@ def check_wishlist_status(request, product_id):
     """Check if a product is in user's wishlist (authenticated or anonymous)"""
     is_in_wishlist = WishlistItem.check_wishlist_status(request, product_id)
     return Response({"is_in_wishlist": is_in_wishlist})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def check_wishlist_status_bulk(request):
+    """
+    Check which of several products are in the user's wishlist, e.g. for the
+    heart icons of a product grid: ?product_ids=1,2,3
+    """
+    raw_ids = request.query_params.get('product_ids', '')
+    try:
+        product_ids = {int(value) for value in raw_ids.split(',') if value.strip()}
+    except ValueError:
+        return Response(
+            {"detail": "product_ids must be a comma-separated list of integers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if len(product_ids) > MAX_BULK_CHECK_IDS:
+        return Response(
+            {"detail": f"At most {MAX_BULK_CHECK_IDS} product ids can be checked at once"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    wishlisted = WishlistItem.wishlisted_product_ids(request, product_ids)
+    return Response({"wishlisted": sorted(wishlisted)})